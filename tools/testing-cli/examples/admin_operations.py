@@ -1,78 +1,98 @@
 #!/usr/bin/env python
 """
 Example script demonstrating Keycloak Admin API operations
+
+Uses AsyncKeycloakAdmin, whose adaptive limiter decides how many of the
+concurrent requests below are in flight at once.
 """
 
-from src.keycloak_client import KeycloakAdmin, get_token
+import asyncio
+
+from kc_test.async_keycloak_client import AsyncKeycloakAdmin
+from kc_test.keycloak_client import UserExistsError, get_token
 
 # Configuration
 KEYCLOAK_URL = "http://localhost:8080"
 REALM = "kong-realm"
 ADMIN_USER = "admin"
 ADMIN_PASSWORD = "admin"  # Change this!
+TEST_USERS = [f"apitest{i}" for i in range(1, 6)]
+
+
+async def create(admin, username):
+    try:
+        user_id = await admin.create_user(
+            realm=REALM,
+            username=username,
+            password=f"{username}-pass",
+            email=f"{username}@example.com",
+        )
+        print(f"   ✓ {username} created with ID: {user_id}")
+    except UserExistsError:
+        print(f"   Note: {username} already exists")
 
 
-def main():
+async def main():
     print("=== Keycloak Admin Operations Example ===\n")
 
     # Initialize admin client
     print("1. Authenticating as admin...")
-    admin = KeycloakAdmin(KEYCLOAK_URL, ADMIN_USER, ADMIN_PASSWORD)
-    print("   ✓ Admin authenticated\n")
-
-    # List existing users
-    print("2. Listing users in realm...")
-    users = admin.list_users(REALM)
-    print(f"   Found {len(users)} users:")
-    for user in users[:5]:  # Show first 5
-        print(f"   - {user['username']} ({user.get('email', 'no email')})")
-    print()
-
-    # Create a new test user
-    print("3. Creating test user...")
-    try:
-        user_id = admin.create_user(
-            realm=REALM, username="apitest", password="apitest123", email="apitest@example.com"
-        )
-        print(f"   ✓ User created with ID: {user_id}\n")
-    except Exception as e:
-        print(f"   Note: {e} (user may already exist)\n")
-
-    # Get roles
-    print("4. Listing realm roles...")
-    roles = admin.get_realm_roles(REALM)
-    print(f"   Found {len(roles)} roles:")
-    for role in roles[:5]:  # Show first 5
-        print(f"   - {role['name']}")
-    print()
-
-    # Assign role to user
-    print("5. Assigning 'user' role to apitest...")
-    try:
-        admin.assign_role(REALM, "apitest", "user")
-        print("   ✓ Role assigned\n")
-    except Exception as e:
-        print(f"   Error: {e}\n")
+    async with AsyncKeycloakAdmin(KEYCLOAK_URL, ADMIN_USER, ADMIN_PASSWORD) as admin:
+        print("   ✓ Admin authenticated\n")
 
-    # Get user roles
-    print("6. Getting roles for apitest...")
-    try:
-        user_roles = admin.get_user_roles(REALM, "apitest")
-        print(f"   User has roles: {', '.join(user_roles)}\n")
-    except Exception as e:
-        print(f"   Error: {e}\n")
+        # List existing users
+        print("2. Listing users in realm...")
+        users = await admin.list_users(REALM)
+        print(f"   Found {len(users)} users:")
+        for user in users[:5]:  # Show first 5
+            print(f"   - {user['username']} ({user.get('email', 'no email')})")
+        print()
 
-    # Test getting token for new user
-    print("7. Testing token acquisition for new user...")
-    try:
-        token_data = get_token(KEYCLOAK_URL, REALM, "apitest", "apitest123")
-        print("   ✓ Token acquired successfully")
-        print(f"   Token expires in: {token_data['expires_in']} seconds\n")
-    except Exception as e:
-        print(f"   Error: {e}\n")
+        # Create test users concurrently
+        print(f"3. Creating {len(TEST_USERS)} test users concurrently...")
+        await asyncio.gather(*(create(admin, username) for username in TEST_USERS))
+        print(f"   Concurrency limit now: {admin.limiter.limit:.1f}\n")
+
+        # Get roles
+        print("4. Listing realm roles...")
+        roles = await admin.get_realm_roles(REALM)
+        print(f"   Found {len(roles)} roles:")
+        for role in roles[:5]:  # Show first 5
+            print(f"   - {role['name']}")
+        print()
+
+        # Assign role to every test user
+        print("5. Assigning 'user' role to the test users...")
+        errors = await admin.assign_roles(REALM, {username: ["user"] for username in TEST_USERS})
+        print(f"   ✓ Role assigned to {len(TEST_USERS) - len(errors)} users")
+        for username, error in errors.items():
+            print(f"   Error ({username}): {error}")
+        print()
+
+        # Get user roles
+        print(f"6. Getting roles for {TEST_USERS[0]}...")
+        try:
+            user_roles = await admin.get_user_roles(REALM, TEST_USERS[0])
+            print(f"   User has roles: {', '.join(user_roles)}\n")
+        except Exception as e:
+            print(f"   Error: {e}\n")
+
+        # Test getting token for new user
+        print("7. Testing token acquisition for new user...")
+        try:
+            token_data = get_token(KEYCLOAK_URL, REALM, TEST_USERS[0], f"{TEST_USERS[0]}-pass")
+            print("   ✓ Token acquired successfully")
+            print(f"   Token expires in: {token_data['expires_in']} seconds\n")
+        except Exception as e:
+            print(f"   Error: {e}\n")
+
+        # Log the test users out again
+        print("8. Logging out the test users...")
+        errors = await admin.logout_users(REALM, TEST_USERS)
+        print(f"   ✓ Logged out {len(TEST_USERS) - len(errors)} users\n")
 
     print("=== Admin operations completed ===")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+#!/bin/bash
+# Run the built-in scenario suites against the in-memory fake stack
+
+set -e
+
+PORT=${PORT:-8080}
+URL="http://localhost:$PORT"
+
+echo "Starting fake stack on $URL..."
+uv run kc-test fake serve --port "$PORT" &
+FAKE_PID=$!
+trap 'kill $FAKE_PID' EXIT
+
+until curl -sf "$URL/health" > /dev/null; do
+  sleep 0.5
+done
+
+for suite in smoke integration; do
+  echo "Running $suite suite..."
+  uv run kc-test suite scenarios "$suite" --kong-url "$URL" --keycloak-url "$URL" --no-history
+done
+
+echo "✓ Fake stack passes the smoke and integration suites"
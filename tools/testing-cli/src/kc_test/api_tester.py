@@ -1,9 +1,16 @@
 """API testing utilities"""
 
+import httpx
 import requests
 import time
-from typing import Optional, Dict, Any, List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from .keycloak_client import get_token
+from .phases import traced_request
+from .result_store import ResultStore
+
+# Per-request timeout for comprehensive suite checks (seconds)
+CHECK_TIMEOUT = 5
 
 
 def call_api(
@@ -12,6 +19,7 @@ def call_api(
     method: str = "GET",
     token: Optional[str] = None,
     data: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
 ) -> requests.Response:
     """
     Call API endpoint through Kong
@@ -22,6 +30,7 @@ def call_api(
         method: HTTP method
         token: JWT token (optional)
         data: Request body data (optional)
+        timeout: Request timeout in seconds (optional)
 
     Returns:
         Response object
@@ -32,37 +41,64 @@ def call_api(
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    response = requests.request(method=method, url=url, headers=headers, json=data)
+    response = requests.request(method=method, url=url, headers=headers, json=data, timeout=timeout)
 
     return response
 
 
+def call_api_traced(
+    kong_url: str,
+    endpoint: str,
+    method: str = "GET",
+    token: Optional[str] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    client: Optional[httpx.Client] = None,
+) -> Tuple[httpx.Response, Dict[str, Any]]:
+    """
+    Call API endpoint through Kong and break its latency down by phase
+
+    Args:
+        kong_url: Kong gateway URL
+        endpoint: API endpoint path
+        method: HTTP method
+        token: JWT token (optional)
+        data: Request body data (optional)
+        timeout: Request timeout in seconds (optional)
+        client: httpx client to reuse connections from (optional)
+
+    Returns:
+        Response and its breakdown (see phases.traced_request)
+    """
+    url = f"{kong_url}/{endpoint.lstrip("/")}"
+    headers = {}
+
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    if client is not None:
+        return traced_request(client, method, url, headers=headers, json=data, timeout=timeout)
+    with httpx.Client() as client:
+        return traced_request(client, method, url, headers=headers, json=data, timeout=timeout)
+
+
 def run_test_suite(suite_name: str, kong_url: str = "http://localhost:8000") -> Dict[str, int]:
     """
     Run test suite
 
     Args:
-        suite_name: Test suite name
+        suite_name: Built-in suite name (smoke, integration) or scenario YAML file
         kong_url: Kong gateway URL
 
     Returns:
         Test results summary
     """
-    tests = {
-        "integration": [
-            lambda: test_public_endpoint(kong_url),
-        ],
-        "smoke": [
-            lambda: test_public_endpoint(kong_url),
-        ],
-    }
+    from .scenarios import compile_plan, load_scenarios, run_plan
 
-    suite_tests = tests.get(suite_name, [])
-    passed = sum(1 for test in suite_tests if test())
-    total = len(suite_tests)
-    failed = total - passed
+    plan = compile_plan(load_scenarios(suite_name), kong_url=kong_url)
+    results = run_plan(plan)
 
-    return {"passed": passed, "failed": failed, "total": total}
+    return {"passed": results["passed"], "failed": results["failed"], "total": results["total"]}
 
 
 def test_public_endpoint(kong_url: str = "http://localhost:8000") -> bool:
@@ -89,156 +125,215 @@ def test_admin_endpoint(kong_url: str = "http://localhost:8000", token: str = No
     return response.status_code in [200, 403]  # 403 if not admin role
 
 
-def run_comprehensive_suite(keycloak_url: str, kong_url: str, env: str = "dev") -> Dict[str, Any]:
+def _run_check_graph(
+    checks: List[Tuple[str, Callable[..., Tuple[bool, str, Any]], List[str]]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run checks concurrently, starting each one as soon as its dependencies finish
+
+    Args:
+        checks: (name, function, dependency names) tuples. The function receives
+            the values produced by its dependencies as positional arguments and
+            returns (passed, message, value).
+
+    Returns:
+        Check results keyed by name. Checks whose dependencies failed are skipped.
+    """
+    pending = {name: (func, deps) for name, func, deps in checks}
+    unknown = sorted({dep for _, _, deps in checks for dep in deps} - set(pending))
+    if unknown:
+        raise Exception(f"Checks depend on unknown check(s): {', '.join(unknown)}")
+    results: Dict[str, Dict[str, Any]] = {}
+    running: Dict[Future, str] = {}
+    suite_start = time.time()
+
+    def timed(func, args):
+        started = time.time()
+        try:
+            passed, message, value = func(*args)
+        except Exception as e:
+            passed, message, value = False, str(e), None
+        return {
+            "passed": passed,
+            "message": message,
+            "value": value,
+            "started": started - suite_start,
+            "duration": time.time() - started,
+        }
+
+    with ThreadPoolExecutor(max_workers=max(len(checks), 1)) as pool:
+        while pending or running:
+            for name, (func, deps) in list(pending.items()):
+                if not all(dep in results for dep in deps):
+                    continue
+                del pending[name]
+                if all(results[dep]["passed"] for dep in deps):
+                    args = [results[dep]["value"] for dep in deps]
+                    running[pool.submit(timed, func, args)] = name
+                else:
+                    results[name] = {"skipped": True, "passed": False, "duration": 0.0}
+
+            if not running:
+                if pending:
+                    raise Exception(f"Circular check dependencies: {', '.join(sorted(pending))}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return results
+
+
+def _critical_path(
+    checks: List[Tuple[str, Callable[..., Tuple[bool, str, Any]], List[str]]],
+    results: Dict[str, Dict[str, Any]],
+) -> Tuple[List[str], float]:
+    """Find the dependency chain with the largest summed duration"""
+    finish: Dict[str, Tuple[float, List[str]]] = {}
+
+    for name, _, deps in checks:  # checks are listed in dependency order
+        before = max((finish[dep] for dep in deps), default=(0.0, []), key=lambda f: f[0])
+        finish[name] = (before[0] + results[name]["duration"], before[1] + [name])
+
+    duration, path = max(finish.values(), key=lambda f: f[0], default=(0.0, []))
+    return path, duration
+
+
+def run_comprehensive_suite(
+    keycloak_url: str,
+    kong_url: str,
+    env: str = "dev",
+    kong_admin_url: Optional[str] = None,
+    realm: str = "kong-realm",
+    username: str = "testuser",
+    password: str = "user123",
+    client_id: str = "kong-client",
+    public_path: str = "/api/public",
+    protected_path: str = "/api/protected",
+) -> Dict[str, Any]:
     """
     Run comprehensive test suite
 
+    Independent checks run concurrently; the protected endpoint check only
+    waits for token acquisition.
+
     Args:
         keycloak_url: Keycloak URL
         kong_url: Kong URL
         env: Environment name
+        kong_admin_url: Kong admin API URL (default: the proxy URL on port 8001)
+        realm: Realm the gateway validates tokens against
+        username: Test user in the realm
+        password: Test user's password
+        client_id: Client the test user logs in with
+        public_path: Route that needs no token
+        protected_path: Route that needs the realm's token
 
     Returns:
         Comprehensive test results
     """
-    results: List[Dict[str, Any]] = []
     start_time = time.time()
+    # Latency breakdowns of the checks that go through Kong to the backend
+    breakdowns: Dict[str, Dict[str, Any]] = {}
 
-    # Test 1: Kong is accessible
-    test_start = time.time()
-    try:
-        response = requests.get(f"{kong_url}/", timeout=5)
-        passed = response.status_code in [200, 404]  # 404 is ok, means Kong is running
-        message = f"Kong accessible at {kong_url}"
-    except Exception as e:
-        passed = False
-        message = f"Kong not accessible: {e}"
-
-    results.append(
-        {
-            "name": "Kong Accessibility",
-            "passed": passed,
-            "duration": time.time() - test_start,
-            "message": message,
-        }
-    )
-
-    # Test 2: Keycloak is accessible
-    test_start = time.time()
-    try:
-        response = requests.get(f"{keycloak_url}/", timeout=5)
-        passed = response.status_code in [200, 404]
-        message = f"Keycloak accessible at {keycloak_url}"
-    except Exception as e:
-        passed = False
-        message = f"Keycloak not accessible: {e}"
-
-    results.append(
-        {
-            "name": "Keycloak Accessibility",
-            "passed": passed,
-            "duration": time.time() - test_start,
-            "message": message,
-        }
-    )
-
-    # Test 3: Can get token from Keycloak
-    test_start = time.time()
-    user_token = None
-    try:
-        # Try with default test user (password from realm configuration)
-        token_data = get_token(keycloak_url, "kong-realm", "testuser", "user123")
-        user_token = token_data.get("access_token")
-        passed = user_token is not None
-        message = "Successfully obtained token for testuser"
-    except Exception as e:
-        passed = False
-        message = f"Token acquisition failed: {e}"
-
-    results.append(
-        {
-            "name": "Token Acquisition",
-            "passed": passed,
-            "duration": time.time() - test_start,
-            "message": message,
-        }
-    )
-
-    # Test 4: Public endpoint through Kong
-    test_start = time.time()
-    try:
-        response = call_api(kong_url, "/api/public", "GET")
-        # Accept both 200 (success) and 404 (route not configured yet)
-        passed = response.status_code in [200, 404, 503]
-        message = f"Public endpoint returned {response.status_code}"
-    except Exception as e:
-        passed = False
-        message = f"Public endpoint test failed: {e}"
-
-    results.append(
-        {
-            "name": "Public Endpoint",
-            "passed": passed,
-            "duration": time.time() - test_start,
-            "message": message,
-        }
-    )
+    def kong_accessible():
+        try:
+            response = requests.get(f"{kong_url}/", timeout=CHECK_TIMEOUT)
+            passed = response.status_code in [200, 404]  # 404 is ok, means Kong is running
+            return passed, f"Kong accessible at {kong_url}", None
+        except Exception as e:
+            return False, f"Kong not accessible: {e}", None
+
+    def keycloak_accessible():
+        try:
+            response = requests.get(f"{keycloak_url}/", timeout=CHECK_TIMEOUT)
+            passed = response.status_code in [200, 404]
+            return passed, f"Keycloak accessible at {keycloak_url}", None
+        except Exception as e:
+            return False, f"Keycloak not accessible: {e}", None
+
+    def token_acquisition():
+        try:
+            token_data = get_token(
+                keycloak_url, realm, username, password, client_id, timeout=CHECK_TIMEOUT
+            )
+            user_token = token_data.get("access_token")
+            return user_token is not None, f"Successfully obtained token for {username}", user_token
+        except Exception as e:
+            return False, f"Token acquisition failed: {e}", None
 
-    # Test 5: Protected endpoint with token (if we have one)
-    if user_token:
-        test_start = time.time()
+    def public_endpoint():
         try:
-            response = call_api(kong_url, "/api/protected", "GET", token=user_token)
+            response, breakdowns["Public Endpoint"] = call_api_traced(
+                kong_url, public_path, "GET", timeout=CHECK_TIMEOUT
+            )
+            # Accept both 200 (success) and 404 (route not configured yet)
+            passed = response.status_code in [200, 404, 503]
+            return passed, f"Public endpoint returned {response.status_code}", None
+        except Exception as e:
+            return False, f"Public endpoint test failed: {e}", None
+
+    def protected_endpoint(user_token):
+        try:
+            response, breakdowns["Protected Endpoint"] = call_api_traced(
+                kong_url, protected_path, "GET", token=user_token, timeout=CHECK_TIMEOUT
+            )
             # Accept 200 (success), 401 (auth configured but endpoint missing), 404 (not configured)
             passed = response.status_code in [200, 401, 404, 503]
-            message = f"Protected endpoint returned {response.status_code}"
+            return passed, f"Protected endpoint returned {response.status_code}", None
         except Exception as e:
-            passed = False
-            message = f"Protected endpoint test failed: {e}"
-
-        results.append(
-            {
-                "name": "Protected Endpoint",
-                "passed": passed,
-                "duration": time.time() - test_start,
-                "message": message,
-            }
-        )
-
-    # Test 6: Kong Admin API health check
-    test_start = time.time()
-    try:
-        # Kong's admin API is typically on port 8001
-        admin_url = kong_url.replace(":8000", ":8001")
-        response = requests.get(f"{admin_url}/status", timeout=5)
-        passed = response.status_code == 200
-        message = f"Kong admin API health check {'passed' if passed else 'failed'} (status: {response.status_code})"
-    except Exception as e:
-        passed = False
-        message = f"Kong admin API health check failed: {e}"
-
-    results.append(
-        {
-            "name": "Kong Health Check",
-            "passed": passed,
-            "duration": time.time() - test_start,
-            "message": message,
-        }
-    )
+            return False, f"Protected endpoint test failed: {e}", None
+
+    def kong_health():
+        try:
+            # Without an explicit admin URL, assume Kong's default ports
+            admin_url = kong_admin_url or kong_url.replace(":8000", ":8001")
+            response = requests.get(f"{admin_url}/status", timeout=CHECK_TIMEOUT)
+            passed = response.status_code == 200
+            message = f"Kong admin API health check {'passed' if passed else 'failed'} (status: {response.status_code})"
+            return passed, message, None
+        except Exception as e:
+            return False, f"Kong admin API health check failed: {e}", None
+
+    checks = [
+        ("Kong Accessibility", kong_accessible, []),
+        ("Keycloak Accessibility", keycloak_accessible, []),
+        ("Token Acquisition", token_acquisition, []),
+        ("Public Endpoint", public_endpoint, []),
+        ("Protected Endpoint", protected_endpoint, ["Token Acquisition"]),
+        ("Kong Health Check", kong_health, []),
+    ]
+
+    outcomes = _run_check_graph(checks)
+    critical_path, critical_path_duration = _critical_path(checks, outcomes)
+
+    # Protected endpoint is only reported when a token was obtained
+    results = ResultStore()
+    for name, _, _ in checks:
+        outcome = outcomes[name]
+        if not outcome.get("skipped"):
+            results.append(
+                name,
+                outcome["passed"],
+                outcome["duration"],
+                outcome["started"],
+                message=outcome["message"],
+            )
 
     # Calculate summary
-    total = len(results)
-    passed_count = sum(1 for r in results if r["passed"])
-    failed_count = total - passed_count
+    counts = results.counts()
     total_duration = time.time() - start_time
 
     return {
         "tests": results,
-        "total": total,
-        "passed": passed_count,
-        "failed": failed_count,
+        **counts,
         "duration": total_duration,
+        "critical_path": critical_path,
+        "critical_path_duration": critical_path_duration,
+        "phases": breakdowns,
         "environment": env,
         "keycloak_url": keycloak_url,
         "kong_url": kong_url,
+        "realm": realm,
     }
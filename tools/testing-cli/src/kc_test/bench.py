@@ -0,0 +1,253 @@
+"""Keycloak token endpoint throughput benchmark"""
+
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .load import summarize
+
+GRANT_TYPES = ("password", "refresh_token", "client_credentials")
+
+# Width of timeline buckets in the report (seconds)
+TIMELINE_BUCKET = 5
+
+
+def ramp_concurrency(elapsed: float, start: int, peak: int, ramp_time: float) -> int:
+    """
+    Target concurrency at a point in a linear ramp
+
+    Args:
+        elapsed: Seconds since the benchmark started
+        start: Concurrency at t=0
+        peak: Concurrency reached at the end of the ramp and held afterwards
+        ramp_time: Length of the ramp in seconds
+
+    Returns:
+        Number of workers that should be active
+    """
+    if ramp_time <= 0 or elapsed >= ramp_time:
+        return peak
+    return start + int((peak - start) * elapsed / ramp_time)
+
+
+def classify_error(response: Optional[requests.Response], error: Optional[Exception]) -> str:
+    """
+    Name the error class of a failed token request
+
+    Args:
+        response: Response, if one was received
+        error: Exception raised instead of a response
+
+    Returns:
+        Error class such as "timeout", "connection" or "400 invalid_grant"
+    """
+    if error is not None:
+        if isinstance(error, requests.Timeout):
+            return "timeout"
+        if isinstance(error, requests.ConnectionError):
+            return "connection"
+        return type(error).__name__
+
+    try:
+        reason = response.json().get("error", "")
+    except ValueError:
+        reason = ""
+    return f"{response.status_code} {reason}".strip()
+
+
+def run_token_benchmark(
+    keycloak_url: str,
+    realm: str,
+    grants: List[str],
+    client_id: str = "kong-client",
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    client_secret: Optional[str] = None,
+    user_pool=None,
+    start_concurrency: int = 1,
+    peak_concurrency: int = 16,
+    ramp_time: float = 30.0,
+    hold_time: float = 30.0,
+    timeout: float = 10.0,
+) -> Dict[str, Any]:
+    """
+    Drive token grants concurrently with a linear ramp followed by a hold
+
+    Workers are assigned to grant types round-robin. Refresh workers log in
+    once (untimed) when the ramp reaches them and then keep rotating their
+    refresh token, so setup logins follow the ramp instead of bursting at t=0.
+
+    Args:
+        keycloak_url: Keycloak base URL
+        realm: Realm name
+        grants: Grant types to exercise (password, refresh_token, client_credentials)
+        client_id: Client ID
+        username: User for password/refresh grants (when no pool is given)
+        password: Password for username
+        client_secret: Secret for client_credentials (confidential client)
+        user_pool: UserPool whose accounts password/refresh workers spread over
+        start_concurrency: Active workers at the start of the ramp
+        peak_concurrency: Active workers at the end of the ramp
+        ramp_time: Ramp length in seconds
+        hold_time: Time at peak concurrency in seconds
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Per-grant throughput, latency percentiles and error classes, plus a timeline
+    """
+    unknown = set(grants) - set(GRANT_TYPES)
+    if unknown:
+        raise ValueError(f"Unsupported grant type(s): {', '.join(sorted(unknown))}")
+    if "client_credentials" in grants and not client_secret:
+        raise ValueError("client_credentials needs --client-secret for a confidential client")
+    if {"password", "refresh_token"} & set(grants) and not (user_pool or username):
+        raise ValueError("password/refresh_token grants need --user or a user pool")
+
+    endpoint = f"{keycloak_url}/realms/{realm}/protocol/openid-connect/token"
+
+    def credentials(worker: int) -> Tuple[str, str]:
+        if user_pool:
+            return user_pool.usernames[worker % len(user_pool)], user_pool.password
+        return username, password
+
+    samples: Dict[str, List[Tuple[float, float, int]]] = defaultdict(list)
+    error_classes: Dict[str, Counter] = defaultdict(Counter)
+    lock = threading.Lock()
+    duration = ramp_time + hold_time
+    start = time.monotonic()
+
+    def await_slot(index: int) -> bool:
+        """Block until the ramp activates the worker; False once the run is over"""
+        while True:
+            elapsed = time.monotonic() - start
+            if elapsed >= duration:
+                return False
+            if index < ramp_concurrency(elapsed, start_concurrency, peak_concurrency, ramp_time):
+                return True
+            time.sleep(0.05)
+
+    def worker(index: int):
+        grant = grants[index % len(grants)]
+        user, secret = credentials(index)
+        current_refresh = None
+        local: List[Tuple[float, float, int]] = []
+        errors: Counter = Counter()
+
+        if not await_slot(index):
+            return
+        session = requests.Session()
+
+        if grant == "refresh_token":
+            response, error = None, None
+            try:
+                response = session.post(
+                    endpoint,
+                    data={
+                        "grant_type": "password",
+                        "client_id": client_id,
+                        "username": user,
+                        "password": secret,
+                    },
+                    timeout=timeout,
+                )
+            except Exception as e:
+                error = e
+            if response is None or response.status_code != 200:
+                session.close()
+                with lock:
+                    error_classes[grant][f"setup {classify_error(response, error)}"] += 1
+                return
+            current_refresh = response.json().get("refresh_token")
+
+        while True:
+            now = time.monotonic()
+            elapsed = now - start
+            if elapsed >= duration:
+                break
+            if index >= ramp_concurrency(elapsed, start_concurrency, peak_concurrency, ramp_time):
+                time.sleep(0.05)
+                continue
+
+            data = {"grant_type": grant, "client_id": client_id}
+            if grant == "password":
+                data.update(username=user, password=secret)
+            elif grant == "refresh_token":
+                data["refresh_token"] = current_refresh
+            else:
+                data["client_secret"] = client_secret
+
+            response, error = None, None
+            try:
+                response = session.post(endpoint, data=data, timeout=timeout)
+            except Exception as e:
+                error = e
+            latency = time.monotonic() - now
+
+            if response is not None and response.status_code == 200:
+                local.append((elapsed, latency, 200))
+                if grant == "refresh_token":
+                    current_refresh = response.json().get("refresh_token", current_refresh)
+            else:
+                local.append(
+                    (elapsed, latency, response.status_code if response is not None else 0)
+                )
+                errors[classify_error(response, error)] += 1
+
+        session.close()
+        with lock:
+            samples[grant].extend(local)
+            error_classes[grant].update(errors)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(peak_concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - start
+
+    grant_results = {}
+    for grant in grants:
+        summary = summarize(samples[grant], elapsed)
+        summary["issued"] = summary["requests"] - summary["errors"]
+        summary["issuance_rate"] = summary["issued"] / elapsed if elapsed > 0 else 0.0
+        summary["error_classes"] = dict(error_classes[grant])
+        grant_results[grant] = summary
+
+    timeline: Dict[int, Dict[str, Any]] = {}
+    for grant_samples in samples.values():
+        for offset, _, status in grant_samples:
+            bucket = int(offset // TIMELINE_BUCKET) * TIMELINE_BUCKET
+            entry = timeline.setdefault(
+                bucket,
+                {
+                    "t": bucket,
+                    "concurrency": ramp_concurrency(
+                        bucket, start_concurrency, peak_concurrency, ramp_time
+                    ),
+                    "issued": 0,
+                    "errors": 0,
+                },
+            )
+            entry["issued" if status == 200 else "errors"] += 1
+
+    for entry in timeline.values():
+        # The last bucket is usually cut short by the end of the run
+        span = min(TIMELINE_BUCKET, elapsed - entry["t"])
+        entry["rate"] = entry["issued"] / span if span > 0 else 0.0
+
+    return {
+        "keycloak_url": keycloak_url,
+        "realm": realm,
+        "client_id": client_id,
+        "duration": elapsed,
+        "start_concurrency": start_concurrency,
+        "peak_concurrency": peak_concurrency,
+        "ramp_time": ramp_time,
+        "hold_time": hold_time,
+        "grants": grant_results,
+        "timeline": [timeline[t] for t in sorted(timeline)],
+    }
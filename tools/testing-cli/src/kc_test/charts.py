@@ -0,0 +1,201 @@
+"""Inline SVG charts for reports, drawn from pre-aggregated data"""
+
+import base64
+import math
+from html import escape
+from typing import Dict, List, Sequence, Tuple
+
+from .histogram import LatencyHistogram
+
+CHART_WIDTH = 720
+CHART_HEIGHT = 220
+
+# Bars in a latency histogram chart
+HISTOGRAM_BINS = 40
+
+# Margins around the plot area: left, right, top, bottom
+_MARGIN = (60, 15, 15, 30)
+
+_STATUS_COLORS = {"0": "#9e9e9e", "2": "#4CAF50", "3": "#2196F3", "4": "#FF9800", "5": "#f44336"}
+
+
+def format_ms(seconds: float) -> str:
+    """Latency in milliseconds with three significant digits"""
+    return f"{seconds * 1000:.3g}ms"
+
+
+def _svg(width: int, height: int, body: List[str], label: str) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" role="img" aria-label="{escape(label)}" '
+        f'font-family="Arial, sans-serif" font-size="11">' + "".join(body) + "</svg>"
+    )
+
+
+def _axes(width: int, height: int) -> List[str]:
+    left, right, top, bottom = _MARGIN
+    return [
+        f'<line x1="{left}" y1="{top}" x2="{left}" y2="{height - bottom}" stroke="#999"/>',
+        f'<line x1="{left}" y1="{height - bottom}" x2="{width - right}" '
+        f'y2="{height - bottom}" stroke="#999"/>',
+    ]
+
+
+def _text(x: float, y: float, text: str, anchor: str = "middle", color: str = "#666") -> str:
+    return (
+        f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" fill="{color}">'
+        f"{escape(text)}</text>"
+    )
+
+
+def histogram_svg(
+    histogram: LatencyHistogram,
+    bins: int = HISTOGRAM_BINS,
+    markers: Sequence[Tuple[str, float]] = (),
+    width: int = CHART_WIDTH,
+    height: int = CHART_HEIGHT,
+) -> str:
+    """
+    Latency histogram on a logarithmic latency axis
+
+    Args:
+        histogram: Latency histogram
+        bins: Number of bars
+        markers: (label, latency) pairs drawn as vertical lines (e.g. percentiles)
+        width: Chart width in pixels
+        height: Chart height in pixels
+
+    Returns:
+        SVG document
+    """
+    left, right, top, bottom = _MARGIN
+    plot_w, plot_h = width - left - right, height - top - bottom
+    grouped = histogram.bins(bins)
+    body = _axes(width, height)
+    if not grouped:
+        return _svg(width, height, body + [_text(width / 2, height / 2, "No samples")], "Latency")
+
+    low, high = grouped[0][0], grouped[-1][1]
+    peak = max(count for _, _, count in grouped)
+    bar_w = plot_w / len(grouped)
+
+    for i, (lower, upper, count) in enumerate(grouped):
+        if not count:
+            continue
+        bar_h = count / peak * plot_h
+        body.append(
+            f'<rect x="{left + i * bar_w:.1f}" y="{top + plot_h - bar_h:.1f}" '
+            f'width="{max(bar_w - 1, 1):.1f}" height="{bar_h:.1f}" fill="#4CAF50">'
+            f"<title>{format_ms(lower)}–{format_ms(upper)}: {count}</title></rect>"
+        )
+
+    def x_of(value: float) -> float:
+        return left + math.log(value / low) / math.log(high / low) * plot_w
+
+    for label, value in markers:
+        if low <= value <= high:
+            x = x_of(value)
+            body.append(
+                f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{top + plot_h}" '
+                f'stroke="#333" stroke-dasharray="4 3"/>'
+            )
+            body.append(_text(x + 3, top + 10, f"{label} {format_ms(value)}", "start", "#333"))
+
+    for i in range(5):
+        value = low * (high / low) ** (i / 4)
+        body.append(_text(x_of(value), height - bottom + 16, format_ms(value)))
+    body.append(_text(left - 6, top + 10, str(peak), "end"))
+    body.append(_text(left - 6, top + plot_h, "0", "end"))
+
+    return _svg(width, height, body, "Latency histogram")
+
+
+def line_chart_svg(
+    xs: Sequence[float],
+    series: Dict[str, Tuple[Sequence[float], str]],
+    y_format=format_ms,
+    width: int = CHART_WIDTH,
+    height: int = CHART_HEIGHT,
+) -> str:
+    """
+    One or more series over time
+
+    Args:
+        xs: X values (seconds since start)
+        series: Label -> (y values, color)
+        y_format: Formats y axis labels
+        width: Chart width in pixels
+        height: Chart height in pixels
+
+    Returns:
+        SVG document
+    """
+    left, right, top, bottom = _MARGIN
+    plot_w, plot_h = width - left - right, height - top - bottom
+    body = _axes(width, height)
+    if not xs:
+        return _svg(width, height, body + [_text(width / 2, height / 2, "No samples")], "Series")
+
+    x_max = max(xs) or 1
+    y_max = max((max(values) for values, _ in series.values() if values), default=0) or 1
+
+    for label, (values, color) in series.items():
+        points = " ".join(
+            f"{left + x / x_max * plot_w:.1f},{top + plot_h - (y or 0) / y_max * plot_h:.1f}"
+            for x, y in zip(xs, values)
+        )
+        body.append(
+            f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.5">'
+            f"<title>{escape(label)}</title></polyline>"
+        )
+
+    for i, (label, (_, color)) in enumerate(series.items()):
+        x = left + 10 + i * 80
+        body.append(f'<rect x="{x}" y="{top}" width="10" height="10" fill="{color}"/>')
+        body.append(_text(x + 14, top + 9, label, "start", "#333"))
+
+    body.append(_text(left - 6, top + 10, y_format(y_max), "end"))
+    body.append(_text(left - 6, top + plot_h, y_format(0), "end"))
+    for i in range(5):
+        body.append(_text(left + i / 4 * plot_w, height - bottom + 16, f"{x_max * i / 4:.0f}s"))
+
+    return _svg(width, height, body, " / ".join(series))
+
+
+def status_svg(status_codes: Dict[str, int], width: int = CHART_WIDTH, height: int = 60) -> str:
+    """
+    Status codes as one stacked bar, colored by class (transport errors as 0)
+
+    Args:
+        status_codes: Count per status code
+        width: Chart width in pixels
+        height: Chart height in pixels
+
+    Returns:
+        SVG document
+    """
+    total = sum(status_codes.values()) or 1
+    body: List[str] = []
+    x = 0.0
+    for status, count in sorted(status_codes.items()):
+        bar_w = count / total * width
+        color = _STATUS_COLORS.get(str(status)[0], "#9e9e9e")
+        body.append(
+            f'<rect x="{x:.1f}" y="0" width="{bar_w:.1f}" height="24" fill="{color}" '
+            f'stroke="white"><title>{escape(str(status))}: {count}</title></rect>'
+        )
+        if bar_w > 60:
+            body.append(_text(x + bar_w / 2, 16, f"{status}: {count}", color="white"))
+        x += bar_w
+
+    for i, (code, color) in enumerate(_STATUS_COLORS.items()):
+        label = "error" if code == "0" else f"{code}xx"
+        body.append(f'<rect x="{i * 70}" y="36" width="10" height="10" fill="{color}"/>')
+        body.append(_text(i * 70 + 14, 45, label, "start", "#333"))
+
+    return _svg(width, height, body, "Status codes")
+
+
+def data_uri(svg: str) -> str:
+    """SVG as a data URI, for Markdown image links"""
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
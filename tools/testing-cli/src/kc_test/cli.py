@@ -49,27 +49,99 @@ def get(user, password, realm, keycloak_url):
 
 
 @token.command()
-@click.argument("token")
-def decode(token):
-    """Decode JWT token"""
-    from kc_test.keycloak_client import decode_token
+@click.argument("token", required=False)
+@click.option("--input", "source", default=None, help="Decode every token in a file ('-': stdin)")
+@click.option("--verify", is_flag=True, help="Check signatures against the realm JWKS")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--jwks-url", default=None, help="JWKS URL (default: the realm's certs endpoint)")
+@click.option("--workers", default=None, type=int, help="Decoding processes in batch mode")
+@click.option(
+    "--keep-duplicates",
+    is_flag=True,
+    help="Emit repeated tokens every time (default: skip repeats among the last 100k tokens)",
+)
+@click.option("--output", default=None, help="Write NDJSON here instead of stdout")
+def decode(token, source, verify, realm, keycloak_url, jwks_url, workers, keep_duplicates, output):
+    """Decode JWT token (without TOKEN: every token on stdin, as NDJSON)"""
+    from kc_test.token_batch import KeyCache, inspect_token
+    from kc_test.token_batch import jwks_url as realm_jwks_url
+
+    try:
+        keys = KeyCache(url=jwks_url or realm_jwks_url(keycloak_url, realm)) if verify else None
+    except Exception as e:
+        console.print(f"[red]✗ Error fetching JWKS:[/red] {e}")
+        raise click.Abort()
+
+    if token is None or token == "-" or source:
+        _decode_batch(source or "-", keys, workers, not keep_duplicates, output)
+        return
 
     try:
-        payload = decode_token(token)
+        record = inspect_token(token, keys)
+        if "error" in record:
+            raise ValueError(record["error"])
 
         table = Table(title="JWT Payload")
         table.add_column("Claim", style="cyan")
         table.add_column("Value", style="yellow")
 
-        for key, value in payload.items():
+        for key, value in record["claims"].items():
             table.add_row(key, str(value))
 
         console.print(table)
+        if keys is not None:
+            color = "green" if record["signature"] == "valid" else "red"
+            console.print(f"[blue]Signature:[/blue] [{color}]{record['signature']}[/{color}]")
     except Exception as e:
         console.print(f"[red]✗ Error decoding token:[/red] {e}")
         raise click.Abort()
 
 
+def _decode_batch(source, keys, workers, dedupe, output):
+    """Stream NDJSON records for every token in source; the summary goes to stderr"""
+    import json
+    import sys
+    from kc_test.token_batch import decode_stream, default_workers
+
+    errors = Console(stderr=True)
+    stats = {}
+    counts = {"valid": 0, "invalid": 0, "unknown_kid": 0, "malformed": 0}
+    workers = workers or default_workers(keys is not None)
+
+    try:
+        lines = sys.stdin if source == "-" else open(source)
+        sink = open(output, "w") if output else sys.stdout
+        try:
+            for record in decode_stream(lines, keys, workers, dedupe, stats):
+                if "error" in record:
+                    counts["malformed"] += 1
+                elif "signature" in record:
+                    counts[record["signature"]] += 1
+                sink.write(json.dumps(record) + "\n")
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+            if sink is not sys.stdout:
+                sink.close()
+    except BrokenPipeError:
+        return
+    except Exception as e:
+        errors.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+    summary = (
+        f"{stats['tokens']} tokens, {stats['unique']} unique, {stats['duplicates']} duplicates, "
+        f"{counts['malformed']} malformed"
+    )
+    if keys is not None:
+        summary += (
+            f"; signatures: {counts['valid']} valid, {counts['invalid']} invalid, "
+            f"{counts['unknown_kid']} unknown kid"
+        )
+    errors.print(f"[green]✓ Decoded[/green] {summary}")
+
+
 @token.command()
 @click.argument("refresh_token_str")
 @click.option("--realm", default="kong-realm", help="Keycloak realm")
@@ -93,6 +165,200 @@ def refresh(refresh_token_str, realm, keycloak_url):
         raise click.Abort()
 
 
+@token.command()
+@click.option("--user", "username", default="testuser", help="preferred_username of a single token")
+@click.option("--role", "roles", multiple=True, default=["user"], help="Realm role (repeatable)")
+@click.option("--count", default=1, help="Tokens to mint (users <prefix>00000, ...)")
+@click.option("--prefix", default="kc-load-", help="Username prefix when --count > 1")
+@click.option("--ttl", default=300, help="Token lifetime in seconds")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL (for iss)")
+@click.option("--issuer", default=None, help="iss claim (default: <keycloak-url>/realms/<realm>)")
+@click.option("--client-id", default="kong-client", help="azp claim")
+@click.option("--key-file", default="kc-test-signing-key.pem", help="Signing key (made if absent)")
+@click.option("--workers", default=None, type=int, help="Signing processes (default: CPU count)")
+@click.option("--output", default=None, help="Write tokens to this file, one per line")
+def mint(
+    username,
+    roles,
+    count,
+    prefix,
+    ttl,
+    realm,
+    keycloak_url,
+    issuer,
+    client_id,
+    key_file,
+    workers,
+    output,
+):
+    """Mint locally signed test tokens (no Keycloak needed)"""
+    import time
+    from kc_test.token_mint import load_or_create_key, mint_bulk
+
+    issuer = issuer or f"{keycloak_url}/realms/{realm}"
+
+    try:
+        private_pem = load_or_create_key(key_file)
+        usernames = [username] if count == 1 else [f"{prefix}{i:05d}" for i in range(count)]
+
+        start = time.monotonic()
+        tokens = mint_bulk(private_pem, issuer, usernames, list(roles), client_id, ttl, workers)
+        elapsed = time.monotonic() - start
+
+        if output:
+            with open(output, "w") as f:
+                f.writelines(f"{t}\n" for t in tokens)
+            console.print(
+                f"[green]✓ Minted {len(tokens)} tokens[/green] in {elapsed:.1f}s "
+                f"({len(tokens) / elapsed if elapsed > 0 else 0:.0f}/s) → {output}"
+            )
+        else:
+            for t in tokens:
+                click.echo(t)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@token.command()
+@click.option("--key-file", default="kc-test-signing-key.pem", help="Signing key (made if absent)")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL (for iss)")
+@click.option("--issuer", default=None, help="iss claim (default: <keycloak-url>/realms/<realm>)")
+@click.option("--host", default="127.0.0.1", help="Bind address")
+@click.option("--port", default=8099, help="Bind port")
+@click.option("--public-key-out", default=None, help="Also write the public key PEM here")
+def jwks(key_file, realm, keycloak_url, issuer, host, port, public_key_out):
+    """Serve the JWKS that verifies minted tokens"""
+    from kc_test.token_mint import jwks_server, load_or_create_key, public_jwk, public_pem
+
+    issuer = issuer or f"{keycloak_url}/realms/{realm}"
+
+    try:
+        private_pem = load_or_create_key(key_file)
+        if public_key_out:
+            with open(public_key_out, "w") as f:
+                f.write(public_pem(private_pem))
+            console.print(f"[green]✓ Public key saved to:[/green] {public_key_out}")
+
+        server = jwks_server({"keys": [public_jwk(private_pem)]}, issuer, host, port)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+    console.print(f"[blue]Serving JWKS on:[/blue] http://{host}:{port}/jwks.json (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@token.command()
+@click.option(
+    "--user", "users", multiple=True, required=True, help="USER:PASSWORD, or USER with --mint"
+)
+@click.option("--mint", is_flag=True, help="Mint tokens locally instead of logging in")
+@click.option("--role", "roles", multiple=True, default=["user"], help="Realm role for --mint")
+@click.option("--key-file", default=None, help="Signing key for --mint (default: a fresh key)")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--client-id", default="kong-client", help="Client ID")
+@click.option("--realm-file", default=None, help="Realm export with the client's mappers")
+@click.option("--keep", "keep_claims", multiple=True, help="Claim that must stay (repeatable)")
+@click.option("--iterations", default=1000, help="Decodes per token when timing")
+@click.option("--output", default=None, help="Write the profile as JSON to this file")
+def profile(
+    users,
+    mint,
+    roles,
+    key_file,
+    realm,
+    keycloak_url,
+    client_id,
+    realm_file,
+    keep_claims,
+    iterations,
+    output,
+):
+    """Profile token size per claim and flag mappers that could move out"""
+    import json
+    from kc_test.keycloak_client import get_token
+    from kc_test.token_profile import REQUIRED_CLAIMS, find_realm_file, profile_tokens
+    from kc_test.token_profile import realm_mappers
+
+    try:
+        tokens = {}
+        if mint:
+            from kc_test.token_mint import TokenMinter, generate_key, load_or_create_key
+
+            private_pem = load_or_create_key(key_file) if key_file else generate_key()
+            minter = TokenMinter(private_pem, f"{keycloak_url}/realms/{realm}", client_id)
+            for user in users:
+                tokens[user.split(":")[0]] = minter.mint(user.split(":")[0], list(roles))
+        else:
+            for user in users:
+                username, _, password = user.partition(":")
+                if not password:
+                    raise Exception(f"No password for {username} (use USER:PASSWORD or --mint)")
+                token_data = get_token(keycloak_url, realm, username, password, client_id)
+                tokens[username] = token_data["access_token"]
+
+        realm_file = find_realm_file(realm_file)
+        mappers = realm_mappers(realm_file, client_id) if realm_file else []
+        if not realm_file:
+            console.print("[yellow]⚠ Realm file not found, mapper attribution skipped[/yellow]")
+
+        results = profile_tokens(
+            tokens, mappers, tuple(REQUIRED_CLAIMS) + tuple(keep_claims), iterations
+        )
+
+        table = Table(title="Token Footprint")
+        table.add_column("User", style="cyan")
+        table.add_column("Encoded", justify="right")
+        table.add_column("Header/Payload/Sig", justify="right")
+        table.add_column("Claims", justify="right")
+        table.add_column("Decode", justify="right")
+        for t in results["tokens"]:
+            table.add_row(
+                t["username"],
+                f"{t['encoded_bytes']} B",
+                f"{t['header_bytes']}/{t['payload_bytes']}/{t['signature_bytes']}",
+                str(t["claims"]),
+                f"{t['decode_us']:.1f} µs",
+            )
+        console.print(table)
+
+        table = Table(title="Bytes per Claim")
+        table.add_column("Claim", style="cyan")
+        table.add_column("Source")
+        table.add_column("Bytes", justify="right")
+        table.add_column("Share", justify="right")
+        table.add_column("Movable", justify="center")
+        for c in results["claims"]:
+            table.add_row(
+                c["claim"],
+                c["source"],
+                f"{c['mean_bytes']:.0f}",
+                f"{c['share'] * 100:.1f}%",
+                "[yellow]yes[/yellow]" if c["movable"] else "",
+            )
+        console.print(table)
+
+        for recommendation in results["recommendations"]:
+            console.print(f"[yellow]→[/yellow] {recommendation}")
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Profile saved to:[/green] {output}")
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
 @main.group()
 def api():
     """API testing operations"""
@@ -104,13 +370,19 @@ def api():
 @click.option("--token", help="JWT token")
 @click.option("--kong-url", default="http://localhost:8000", help="Kong URL")
 @click.option("--method", default="GET", help="HTTP method")
-def call(endpoint, token, kong_url, method):
+@click.option("--phases", is_flag=True, help="Break latency down by phase and component")
+@click.option("--repeat", default=1, help="Requests to send over one connection (with --phases)")
+def call(endpoint, token, kong_url, method, phases, repeat):
     """Call API endpoint"""
     from kc_test.api_tester import call_api
 
     console.print(f"[blue]Calling:[/blue] {method} {kong_url}/{endpoint}")
 
     try:
+        if phases:
+            _call_with_phases(kong_url, endpoint, method, token, repeat)
+            return
+
         response = call_api(kong_url, endpoint, method, token)
         console.print(f"[green]✓ Status:[/green] {response.status_code}")
         console.print(f"\n[yellow]Response:[/yellow]")
@@ -120,16 +392,47 @@ def call(endpoint, token, kong_url, method):
         raise click.Abort()
 
 
+def _call_with_phases(kong_url, endpoint, method, token, repeat):
+    """Send requests over one client and print their latency breakdown"""
+    import httpx
+    from collections import Counter
+    from kc_test.api_tester import call_api_traced
+    from kc_test.phases import summarize_breakdowns
+    from kc_test.reporter import print_phase_breakdown, print_phase_summary
+
+    breakdowns = []
+    statuses = Counter()
+    with httpx.Client() as client:
+        for _ in range(max(repeat, 1)):
+            response, breakdown = call_api_traced(kong_url, endpoint, method, token, client=client)
+            statuses[response.status_code] += 1
+            breakdowns.append(breakdown)
+
+    console.print(
+        "[green]✓ Status:[/green] "
+        + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+        + f" ({breakdowns[0]['http_version']})"
+    )
+    if len(breakdowns) == 1:
+        print_phase_breakdown({f"{method} {endpoint}": breakdowns[0]})
+    else:
+        print_phase_breakdown({"first request": breakdowns[0], "last request": breakdowns[-1]})
+        print_phase_summary(summarize_breakdowns(breakdowns))
+    if not breakdowns[0]["kong_headers"]:
+        console.print("[yellow]⚠ No Kong latency headers; server time is unattributed[/yellow]")
+
+
 @api.command()
-@click.option("--suite", default="integration", help="Test suite name")
-def test(suite):
+@click.option("--suite", default="integration", help="Test suite name or scenario YAML file")
+@click.option("--kong-url", default="http://localhost:8000", help="Kong URL")
+def test(suite, kong_url):
     """Run API test suite"""
     from kc_test.api_tester import run_test_suite
 
     console.print(f"[blue]Running test suite:[/blue] {suite}")
 
     try:
-        results = run_test_suite(suite)
+        results = run_test_suite(suite, kong_url)
         console.print(f"[green]✓ Tests passed:[/green] {results['passed']}")
         console.print(f"[red]✗ Tests failed:[/red] {results['failed']}")
     except Exception as e:
@@ -137,6 +440,32 @@ def test(suite):
         raise click.Abort()
 
 
+def _record_history(results, kind, kong_url, history_db, kong_admin_url=None):
+    """Store a run in the history database; a failure to record only warns"""
+    from kc_test.history import (
+        DEFAULT_HISTORY_DB,
+        RunHistory,
+        git_sha,
+        keycloak_version,
+        kong_version,
+    )
+
+    path = history_db or DEFAULT_HISTORY_DB
+    # Reports may be going to stdout
+    status = Console(stderr=True)
+    try:
+        tags = {
+            "git_sha": git_sha(),
+            "kong_version": kong_version(kong_url, kong_admin_url) if kong_url else None,
+            "keycloak_version": keycloak_version(),
+        }
+        with RunHistory(path) as history:
+            run_id = history.record(results, kind, tags)
+        status.print(f"[green]✓ Recorded run {run_id} in:[/green] {path}")
+    except Exception as e:
+        status.print(f"[yellow]⚠ Run not recorded in history:[/yellow] {e}")
+
+
 @main.group()
 def suite():
     """Test suite operations"""
@@ -147,6 +476,8 @@ def suite():
 @click.option("--env", default="dev", help="Environment")
 @click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
 @click.option("--kong-url", default="http://localhost:8000", help="Kong URL")
+@click.option("--kong-admin-url", default=None, help="Kong admin URL (default: Kong URL on :8001)")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
 @click.option("--output", default=None, help="Output file for report")
 @click.option(
     "--format",
@@ -154,15 +485,134 @@ def suite():
     type=click.Choice(["console", "json", "html", "markdown"]),
     help="Report format",
 )
-def run(env, keycloak_url, kong_url, output, format):
+@click.option("--history/--no-history", default=True, help="Record the run in the run history")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def run(env, keycloak_url, kong_url, kong_admin_url, realm, output, format, history, history_db):
     """Run comprehensive test suite"""
     from kc_test.api_tester import run_comprehensive_suite
-    from kc_test.reporter import generate_report
+    from kc_test.reporter import generate_report, write_report
 
     console.print(f"[blue]Running comprehensive tests for environment:[/blue] {env}")
 
     try:
-        results = run_comprehensive_suite(keycloak_url, kong_url, env)
+        results = run_comprehensive_suite(
+            keycloak_url, kong_url, env, kong_admin_url=kong_admin_url, realm=realm
+        )
+
+        if format == "console":
+            from kc_test.reporter import print_test_results, print_summary
+
+            print_test_results(results["tests"])
+            print_summary(
+                results["passed"],
+                results["failed"],
+                results["total"],
+                results.get("critical_path"),
+                results.get("critical_path_duration"),
+            )
+            if results.get("phases"):
+                from kc_test.reporter import print_phase_breakdown
+
+                print_phase_breakdown(results["phases"])
+        else:
+            if output:
+                with open(output, "w") as f:
+                    write_report(results, format, f)
+                console.print(f"[green]✓ Report saved to:[/green] {output}")
+            else:
+                console.print(generate_report(results, format))
+
+        if history:
+            _record_history(results, "suite", kong_url, history_db, kong_admin_url)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@suite.command("matrix")
+@click.argument("topology_file")
+@click.option("--env", default="dev", help="Environment")
+@click.option("--output", default=None, help="Write results as JSON to this file")
+def suite_matrix(topology_file, env, output):
+    """Run the comprehensive suite against every gateway of a topology at once"""
+    import json
+    from kc_test.reporter import print_suite_matrix
+    from kc_test.topology import load_topology, suite_matrix as run_suite_matrix
+
+    try:
+        gateways = load_topology(topology_file)
+        console.print(
+            f"[blue]Running comprehensive tests on {len(gateways)} gateways:[/blue] "
+            + ", ".join(f"{g['name']} ({g['realm']})" for g in gateways)
+        )
+
+        def on_result(name, run):
+            if "error" in run:
+                console.print(f"[red]✗ {name}:[/red] {run['error']}")
+            else:
+                color = "green" if not run["failed"] else "red"
+                console.print(
+                    f"[{color}]{'✓' if not run['failed'] else '✗'} {name}:[/{color}] "
+                    f"{run['passed']}/{run['total']} passed in {run['duration']:.2f}s"
+                )
+
+        results = run_suite_matrix(gateways, env, on_result)
+        print_suite_matrix(results)
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2, default=list)
+            console.print(f"[green]✓ Results saved to:[/green] {output}")
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@suite.command()
+@click.argument("scenario_file")
+@click.option("--env", default="dev", help="Environment")
+@click.option("--keycloak-url", default=None, help="Keycloak URL (overrides scenario file)")
+@click.option("--kong-url", default=None, help="Kong URL (overrides scenario file)")
+@click.option("--concurrency", default=16, help="Maximum requests in flight")
+@click.option("--shard-index", default=0, help="Zero-based shard to run")
+@click.option("--shard-count", default=1, help="Total number of shards")
+@click.option("--output", default=None, help="Output file for report")
+@click.option(
+    "--format",
+    default="console",
+    type=click.Choice(["console", "json", "html", "markdown"]),
+    help="Report format",
+)
+@click.option("--history/--no-history", default=True, help="Record the run in the run history")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def scenarios(
+    scenario_file,
+    env,
+    keycloak_url,
+    kong_url,
+    concurrency,
+    shard_index,
+    shard_count,
+    output,
+    format,
+    history,
+    history_db,
+):
+    """Run declarative YAML scenarios"""
+    from kc_test.scenarios import compile_plan, load_scenarios, run_plan, shard_plan
+    from kc_test.reporter import generate_report, write_report
+
+    try:
+        plan = compile_plan(load_scenarios(scenario_file), kong_url, keycloak_url)
+        total_steps = len(plan["steps"])
+        plan = shard_plan(plan, shard_index, shard_count)
+
+        console.print(
+            f"[blue]Running {len(plan['steps'])}/{total_steps} scenarios[/blue] "
+            f"(shard {shard_index + 1}/{shard_count}, concurrency {concurrency})"
+        )
+
+        results = run_plan(plan, concurrency, env)
 
         if format == "console":
             from kc_test.reporter import print_test_results, print_summary
@@ -170,17 +620,54 @@ def run(env, keycloak_url, kong_url, output, format):
             print_test_results(results["tests"])
             print_summary(results["passed"], results["failed"], results["total"])
         else:
-            report = generate_report(results, format)
             if output:
                 with open(output, "w") as f:
-                    f.write(report)
+                    write_report(results, format, f)
                 console.print(f"[green]✓ Report saved to:[/green] {output}")
             else:
-                console.print(report)
+                console.print(generate_report(results, format))
+
+        if history:
+            _record_history(results, "scenarios", results.get("kong_url"), history_db)
     except Exception as e:
         console.print(f"[red]✗ Error:[/red] {e}")
         raise click.Abort()
 
+    if results["failed"]:
+        raise SystemExit(1)
+
+
+def _cleanup_sessions(
+    keycloak_url, realm, admin_user, admin_password, usernames, client_id=None, concurrency=8
+):
+    """Log out users' (and optionally a client's) sessions and report the outcome"""
+    from kc_test.keycloak_client import KeycloakAdmin
+
+    if not usernames and not client_id:
+        console.print("[yellow]⚠ No users or client to clean up; no sessions logged out[/yellow]")
+        return
+
+    try:
+        admin = KeycloakAdmin(keycloak_url, admin_user, admin_password)
+
+        if usernames:
+            console.print(f"[blue]Logging out {len(usernames)} user(s) in realm:[/blue] {realm}")
+            errors = admin.logout_users(realm, usernames, concurrency)
+            console.print(
+                f"[green]✓ Logged out {len(usernames) - len(errors)} user(s)[/green]"
+                + (f", [red]{len(errors)} failed[/red]" if errors else "")
+            )
+
+        if client_id:
+            console.print(f"[blue]Deleting sessions of client:[/blue] {client_id}")
+            result = admin.logout_client_sessions(realm, client_id, concurrency)
+            console.print(
+                f"[green]✓ Deleted {result['deleted']} session(s)[/green]"
+                + (f", [red]{len(result['errors'])} failed[/red]" if result["errors"] else "")
+            )
+    except Exception as e:
+        console.print(f"[red]✗ Session cleanup failed:[/red] {e}")
+
 
 @main.group()
 def keycloak():
@@ -192,16 +679,36 @@ def keycloak():
 @click.option("--realm", default="kong-realm", help="Keycloak realm")
 @click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
 @click.option("--admin-user", default="admin", help="Admin username")
-def list_users(realm, keycloak_url, admin_user):
+@click.option(
+    "--format",
+    default="table",
+    type=click.Choice(["table", "ndjson"]),
+    help="Output format (ndjson streams one user per line)",
+)
+@click.option("--page-size", default=100, help="Users fetched per request")
+@click.option("--prefetch/--no-prefetch", default=True, help="Fetch the next page in background")
+def list_users(realm, keycloak_url, admin_user, format, page_size, prefetch):
     """List users in realm"""
+    import json
     from kc_test.keycloak_client import KeycloakAdmin
 
-    console.print(f"[blue]Listing users in realm:[/blue] {realm}")
-    admin_password = click.prompt("Admin Password", hide_input=True)
+    # Keep stdout clean for machine-readable output
+    status = Console(stderr=True) if format == "ndjson" else console
+
+    status.print(f"[blue]Listing users in realm:[/blue] {realm}")
+    admin_password = click.prompt("Admin Password", hide_input=True, err=True)
 
     try:
         admin = KeycloakAdmin(keycloak_url, admin_user, admin_password)
-        users = admin.list_users(realm)
+        users = admin.iter_users(realm, page_size=page_size, prefetch=prefetch)
+
+        if format == "ndjson":
+            count = 0
+            for user in users:
+                click.echo(json.dumps(user, separators=(",", ":")))
+                count += 1
+            status.print(f"[green]✓ {count} users[/green]")
+            return
 
         table = Table(title=f"Users in {realm}")
         table.add_column("Username", style="cyan")
@@ -219,7 +726,7 @@ def list_users(realm, keycloak_url, admin_user):
 
         console.print(table)
     except Exception as e:
-        console.print(f"[red]✗ Error:[/red] {e}")
+        status.print(f"[red]✗ Error:[/red] {e}")
         raise click.Abort()
 
 
@@ -247,23 +754,807 @@ def create_user(realm, username, email, keycloak_url, admin_user):
         raise click.Abort()
 
 
+@keycloak.command("cleanup-sessions")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--username", multiple=True, help="User whose sessions to log out (repeatable)")
+@click.option("--pool-size", default=0, help="Log out this many pool users")
+@click.option("--pool-prefix", default="kc-load-", help="Pool username prefix")
+@click.option("--client", "client_id", default=None, help="Delete every session of this client")
+@click.option("--concurrency", default=8, help="Logouts in parallel")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--admin-user", default="admin", help="Admin username")
+def cleanup_sessions(
+    realm, username, pool_size, pool_prefix, client_id, concurrency, keycloak_url, admin_user
+):
+    """Log out sessions left behind by load runs"""
+    from kc_test.user_pool import UserPool
+
+    usernames = list(username)
+    if pool_size:
+        usernames += UserPool(keycloak_url, realm, pool_size, pool_prefix).usernames
+
+    if not usernames and not client_id:
+        console.print("[red]✗ Error:[/red] give --username, --pool-size or --client")
+        raise click.Abort()
+
+    admin_password = click.prompt("Admin Password", hide_input=True)
+    _cleanup_sessions(
+        keycloak_url, realm, admin_user, admin_password, usernames, client_id, concurrency
+    )
+
+
+@keycloak.command("bulk-create")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--input", "source", required=True, help="Users file (CSV with header, or JSONL)")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--admin-user", default="admin", help="Admin username")
+@click.option("--batch-size", default=500, help="Users per batch")
+@click.option(
+    "--concurrency",
+    default=4,
+    help="Batches in flight (in create mode, each batch creates its users one at a time)",
+)
+@click.option(
+    "--mode",
+    default="auto",
+    type=click.Choice(["auto", "partial-import", "create"]),
+    help="Use realm partialImport, individual creates, or detect",
+)
+@click.option("--default-password", default=None, help="Password for rows without one")
+@click.option("--checkpoint", default=None, help="Progress file (default: <input>.checkpoint.json)")
+def bulk_create(
+    realm,
+    source,
+    keycloak_url,
+    admin_user,
+    batch_size,
+    concurrency,
+    mode,
+    default_password,
+    checkpoint,
+):
+    """Create users in bulk from a CSV/JSONL file"""
+    from kc_test.keycloak_client import KeycloakAdmin
+    from kc_test.provisioning import bulk_create_users
+
+    console.print(f"[blue]Provisioning users from {source} into realm:[/blue] {realm}")
+    admin_password = click.prompt("Admin Password", hide_input=True)
+
+    def on_progress(progress):
+        console.print(
+            f"  {progress['completed']} rows "
+            f"(created {progress['created']}, skipped {progress['skipped']}, "
+            f"failed {progress['failed']})"
+        )
+
+    try:
+        admin = KeycloakAdmin(keycloak_url, admin_user, admin_password, auto_refresh=True)
+        result = bulk_create_users(
+            admin,
+            realm,
+            source,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            mode=mode,
+            default_password=default_password,
+            checkpoint_file=checkpoint,
+            on_progress=on_progress,
+        )
+        admin.stop_auto_refresh()
+
+        table = Table(title="Bulk Provisioning")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="yellow")
+        table.add_row("Mode", result["mode"])
+        table.add_row("Resumed from row", str(result["resumed_from"]))
+        table.add_row("Processed this run", str(result["processed"]))
+        table.add_row("Created", str(result["created"]))
+        table.add_row("Skipped (existing)", str(result["skipped"]))
+        table.add_row("Failed", str(result["failed"]))
+        table.add_row("Elapsed", f"{result['elapsed']:.2f}s")
+        table.add_row("Throughput", f"{result['throughput']:.1f} users/s")
+        console.print(table)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
 @keycloak.command("assign-role")
 @click.option("--realm", default="kong-realm", help="Keycloak realm")
-@click.option("--username", required=True, help="Username")
-@click.option("--role", required=True, help="Role name")
+@click.option("--username", required=True, multiple=True, help="Username (repeatable)")
+@click.option("--role", required=True, multiple=True, help="Role name (repeatable)")
 @click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
 @click.option("--admin-user", default="admin", help="Admin username")
-def assign_role(realm, username, role, keycloak_url, admin_user):
-    """Assign role to user"""
+@click.option("--concurrency", default=8, help="Users processed in parallel")
+def assign_role(realm, username, role, keycloak_url, admin_user, concurrency):
+    """Assign role(s) to user(s)"""
     from kc_test.keycloak_client import KeycloakAdmin
 
-    console.print(f"[blue]Assigning role '{role}' to user '{username}' in realm:[/blue] {realm}")
+    console.print(
+        f"[blue]Assigning role(s) '{', '.join(role)}' to {len(username)} user(s) in realm:[/blue] "
+        f"{realm}"
+    )
     admin_password = click.prompt("Admin Password", hide_input=True)
 
     try:
         admin = KeycloakAdmin(keycloak_url, admin_user, admin_password)
-        admin.assign_role(realm, username, role)
+        errors = admin.assign_roles(realm, {u: list(role) for u in username}, concurrency)
+
+        for user, error in errors.items():
+            console.print(f"[red]✗ {user}:[/red] {error}")
+        if errors:
+            raise click.Abort()
+
         console.print(f"[green]✓ Role assigned successfully[/green]")
+    except click.Abort:
+        raise
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@main.group()
+def pool():
+    """Virtual user pool operations"""
+    pass
+
+
+@pool.command("provision")
+@click.option("--size", default=100, help="Number of pool users")
+@click.option("--prefix", default="kc-load-", help="Username prefix")
+@click.option("--password", default="load-test-123", help="Password for pool users")
+@click.option("--role", multiple=True, help="Realm role for every pool user (repeatable)")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--admin-user", default="admin", help="Admin username")
+def pool_provision(size, prefix, password, role, realm, keycloak_url, admin_user):
+    """Create (or reuse) synthetic load-test users"""
+    from kc_test.keycloak_client import KeycloakAdmin
+    from kc_test.user_pool import UserPool
+
+    console.print(f"[blue]Provisioning {size} pool users in realm:[/blue] {realm}")
+    admin_password = click.prompt("Admin Password", hide_input=True)
+
+    try:
+        admin = KeycloakAdmin(keycloak_url, admin_user, admin_password, auto_refresh=True)
+        user_pool = UserPool(keycloak_url, realm, size, prefix, password)
+        counts = user_pool.provision(admin, list(role))
+        admin.stop_auto_refresh()
+
+        console.print(
+            f"[green]✓ Pool ready:[/green] created {counts['created']}, "
+            f"reused {counts['skipped']}, failed {counts['failed']}"
+        )
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@main.group()
+def load():
+    """Load testing operations"""
+    pass
+
+
+@load.command("run")
+@click.option("--endpoint", required=True, help="API endpoint")
+@click.option("--kong-url", default="http://localhost:8000", help="Kong URL")
+@click.option("--method", default="GET", help="HTTP method")
+@click.option("--vus", default=10, help="Concurrent virtual users")
+@click.option("--duration", default=30.0, help="Run time in seconds")
+@click.option("--token", default=None, help="Static JWT token for every request")
+@click.option("--token-file", default=None, help="Tokens (one per line) spread over virtual users")
+@click.option("--pool-size", default=0, help="Spread tokens across this many pool users")
+@click.option("--pool-prefix", default="kc-load-", help="Pool username prefix")
+@click.option("--pool-password", default="load-test-123", help="Pool user password")
+@click.option(
+    "--pool-mode",
+    default="per-user",
+    type=click.Choice(["per-user", "round-robin"]),
+    help="Pin each virtual user to one account, or rotate accounts per request",
+)
+@click.option("--mint-rate", default=10.0, help="Pool logins per second while pre-minting")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--cleanup", is_flag=True, help="Log out the load users' sessions on exit")
+@click.option(
+    "--cleanup-client",
+    default=None,
+    help="Client whose sessions --cleanup deletes (for --token/--token-file runs)",
+)
+@click.option("--admin-user", default="admin", help="Admin username (for --cleanup)")
+@click.option(
+    "--protocol",
+    default=None,
+    type=click.Choice(["http1", "http1-close", "http2"]),
+    help="Send with httpx: HTTP/1.1 keep-alive, a connection per request, or HTTP/2",
+)
+@click.option("--insecure", is_flag=True, help="Skip TLS verification (Kong's self-signed cert)")
+@click.option("--output", default=None, help="Write results as JSON to this file")
+@click.option("--history/--no-history", default=True, help="Record the run in the run history")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def load_run(
+    endpoint,
+    kong_url,
+    method,
+    vus,
+    duration,
+    token,
+    token_file,
+    pool_size,
+    pool_prefix,
+    pool_password,
+    pool_mode,
+    mint_rate,
+    realm,
+    keycloak_url,
+    cleanup,
+    cleanup_client,
+    admin_user,
+    protocol,
+    insecure,
+    output,
+    history,
+    history_db,
+):
+    """Run load against an endpoint"""
+    import json
+    from kc_test.load import run_load
+    from kc_test.reporter import print_load_summary
+
+    if cleanup and not (pool_size and not token_file) and not cleanup_client:
+        # Static tokens name no users, so there is nothing to log out by username
+        console.print("[red]✗ Error:[/red] --cleanup needs --pool-size or --cleanup-client")
+        raise click.Abort()
+
+    token_provider = (lambda vu: token) if token else None
+    user_pool = None
+    admin_password = click.prompt("Admin Password", hide_input=True) if cleanup else None
+
+    try:
+        if token_file:
+            from kc_test.token_mint import read_tokens
+
+            tokens = read_tokens(token_file)
+            console.print(f"[blue]Loaded {len(tokens)} tokens from:[/blue] {token_file}")
+
+            def token_provider(vu):
+                return tokens[vu % len(tokens)]
+
+        elif pool_size:
+            from kc_test.user_pool import UserPool
+
+            user_pool = UserPool(keycloak_url, realm, pool_size, pool_prefix, pool_password)
+            console.print(
+                f"[blue]Minting tokens for {pool_size} pool users[/blue] (≤ {mint_rate}/s)"
+            )
+            minted = user_pool.mint_tokens(mint_rate)
+            console.print(
+                f"[green]✓ {minted['minted']} tokens[/green] in {minted['elapsed']:.1f}s"
+                + (f", [red]{minted['failed']} failed[/red]" if minted["failed"] else "")
+            )
+            if not minted["minted"]:
+                raise Exception("Every pool login failed (run 'kc-test pool provision' first?)")
+            if pool_mode == "round-robin":
+
+                def token_provider(vu):
+                    return user_pool.next_token()
+
+            else:
+                token_provider = user_pool.token_for
+
+        console.print(f"[blue]Running load:[/blue] {vus} virtual users for {duration}s")
+        results = run_load(
+            kong_url,
+            endpoint,
+            vus,
+            duration,
+            token_provider,
+            method,
+            protocol=protocol,
+            verify=not insecure,
+        )
+        print_load_summary(results)
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Results saved to:[/green] {output}")
+
+        if history:
+            _record_history(results, "load", kong_url, history_db)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+    finally:
+        if cleanup:
+            usernames = user_pool.usernames if user_pool else []
+            _cleanup_sessions(
+                keycloak_url, realm, admin_user, admin_password, usernames, cleanup_client
+            )
+
+
+@load.command("protocols")
+@click.option("--endpoint", required=True, help="API endpoint")
+@click.option("--kong-url", default="https://localhost:8443", help="Kong URL (TLS for HTTP/2)")
+@click.option("--method", default="GET", help="HTTP method")
+@click.option("--vus", default=50, help="Concurrent virtual users")
+@click.option("--duration", default=30.0, help="Run time per protocol in seconds")
+@click.option("--token", default=None, help="Static JWT token for every request")
+@click.option("--token-file", default=None, help="Tokens (one per line) spread over virtual users")
+@click.option(
+    "--protocol",
+    "protocols",
+    multiple=True,
+    type=click.Choice(["http1", "http1-close", "http2"]),
+    help="Protocol mode to run (repeatable; default: all)",
+)
+@click.option("--insecure", is_flag=True, help="Skip TLS verification (Kong's self-signed cert)")
+@click.option("--output", default=None, help="Write results as JSON to this file")
+def load_protocols(
+    endpoint, kong_url, method, vus, duration, token, token_file, protocols, insecure, output
+):
+    """Compare HTTP/1.1 with and without keep-alive against HTTP/2"""
+    import json
+    from kc_test.load import PROTOCOLS, compare_protocols
+    from kc_test.reporter import print_protocol_comparison
+
+    token_provider = (lambda vu: token) if token else None
+
+    try:
+        if token_file:
+            from kc_test.token_mint import read_tokens
+
+            tokens = read_tokens(token_file)
+
+            def token_provider(vu):
+                return tokens[vu % len(tokens)]
+
+        def on_result(protocol, run):
+            console.print(
+                f"[green]✓ {protocol}:[/green] {run['throughput']:.1f} req/s, "
+                f"p99 {run['latency']['p99'] * 1000:.1f}ms, {run['connections']} connections"
+            )
+
+        console.print(f"[blue]Comparing protocols:[/blue] {vus} virtual users for {duration}s each")
+        results = compare_protocols(
+            kong_url,
+            endpoint,
+            vus,
+            duration,
+            token_provider,
+            method,
+            tuple(protocols) or PROTOCOLS,
+            verify=not insecure,
+            on_result=on_result,
+        )
+        print_protocol_comparison(results)
+
+        http2 = results["protocols"].get("http2")
+        if http2 and not http2["http_versions"].get("HTTP/2"):
+            console.print(
+                "[yellow]⚠ No HTTP/2 responses: HTTP/2 is negotiated over TLS, "
+                "use Kong's https listener with http2 enabled[/yellow]"
+            )
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Results saved to:[/green] {output}")
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@load.command("matrix")
+@click.argument("topology_file")
+@click.option("--endpoint", default=None, help="API endpoint (default: per gateway, see topology)")
+@click.option("--method", default="GET", help="HTTP method")
+@click.option("--vus", default=10, help="Concurrent virtual users per gateway")
+@click.option("--duration", default=30.0, help="Run time in seconds")
+@click.option("--solo", is_flag=True, help="Load each gateway alone first, to measure interference")
+@click.option(
+    "--protocol",
+    default=None,
+    type=click.Choice(["http1", "http1-close", "http2"]),
+    help="Send with httpx: HTTP/1.1 keep-alive, a connection per request, or HTTP/2",
+)
+@click.option("--insecure", is_flag=True, help="Skip TLS verification (Kong's self-signed cert)")
+@click.option("--output", default=None, help="Write results as JSON to this file")
+def load_matrix(topology_file, endpoint, method, vus, duration, solo, protocol, insecure, output):
+    """Load every gateway of a topology at the same time"""
+    import json
+    from kc_test.reporter import print_load_matrix
+    from kc_test.topology import load_matrix as run_load_matrix, load_topology
+
+    try:
+        gateways = load_topology(topology_file)
+        if solo:
+            console.print(
+                f"[blue]Loading each of {len(gateways)} gateways alone:[/blue] "
+                f"{vus} virtual users for {duration}s each"
+            )
+
+        def on_result(name, run):
+            if "error" in run:
+                console.print(f"[red]✗ {name}:[/red] {run['error']}")
+            else:
+                console.print(
+                    f"[green]✓ {name}:[/green] {run['throughput']:.1f} req/s, "
+                    f"p99 {run['latency']['p99'] * 1000:.1f}ms, {run['errors']} errors"
+                )
+
+        console.print(
+            f"[blue]Loading {len(gateways)} gateways together:[/blue] "
+            f"{vus} virtual users each for {duration}s"
+        )
+        results = run_load_matrix(
+            gateways,
+            vus,
+            duration,
+            method,
+            endpoint,
+            protocol=protocol,
+            verify=not insecure,
+            solo=solo,
+            on_result=on_result,
+        )
+        print_load_matrix(results)
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Results saved to:[/green] {output}")
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@load.command("soak")
+@click.option("--endpoint", required=True, help="API endpoint")
+@click.option("--kong-url", default="http://localhost:8000", help="Kong URL")
+@click.option("--kong-admin-url", default=None, help="Kong admin URL to sample /status from")
+@click.option("--container", multiple=True, help="Docker container to sample memory (repeatable)")
+@click.option("--method", default="GET", help="HTTP method")
+@click.option("--vus", default=10, help="Concurrent virtual users")
+@click.option("--duration", default="1h", help="Run time (e.g. 900, 45m, 6h)")
+@click.option("--bucket", default=60.0, help="Series bucket width in seconds")
+@click.option("--pool-size", default=10, help="Pool users (one per virtual user is typical)")
+@click.option("--pool-prefix", default="kc-load-", help="Pool username prefix")
+@click.option("--pool-password", default="load-test-123", help="Pool user password")
+@click.option("--mint-rate", default=10.0, help="Pool logins per second while pre-minting")
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--cleanup", is_flag=True, help="Log out the load users' sessions on exit")
+@click.option("--admin-user", default="admin", help="Admin username (for --cleanup)")
+@click.option("--output", default="soak-series.ndjson", help="NDJSON series file")
+@click.option("--summary-output", default=None, help="Save run summary JSON (for report generate)")
+@click.option("--history/--no-history", default=True, help="Record the run in the run history")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def load_soak(
+    endpoint,
+    kong_url,
+    kong_admin_url,
+    container,
+    method,
+    vus,
+    duration,
+    bucket,
+    pool_size,
+    pool_prefix,
+    pool_password,
+    mint_rate,
+    realm,
+    keycloak_url,
+    cleanup,
+    admin_user,
+    output,
+    summary_output,
+    history,
+    history_db,
+):
+    """Soak an endpoint for hours, following token expiry and refresh"""
+    import json
+    from kc_test.soak import parse_duration, run_soak
+    from kc_test.user_pool import UserPool
+
+    try:
+        user_pool = UserPool(keycloak_url, realm, pool_size, pool_prefix, pool_password)
+    except ValueError as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+    admin_password = click.prompt("Admin Password", hide_input=True) if cleanup else None
+
+    try:
+        seconds = parse_duration(duration)
+        console.print(f"[blue]Minting tokens for {pool_size} pool users[/blue] (≤ {mint_rate}/s)")
+        if not user_pool.mint_tokens(mint_rate)["minted"]:
+            raise Exception("Every pool login failed (run 'kc-test pool provision' first?)")
+
+        def on_bucket(row):
+            kong = row["kong"] or {}
+            console.print(
+                f"t={row['t']:>7.0f}s  {row['throughput']:8.1f} req/s  "
+                f"p95 {row['latency']['p95'] * 1000:7.1f}ms  errors {row['errors']:>5}  "
+                f"401 {row['unauthorized']:>4} (near refresh {row['unauthorized_near_refresh']})  "
+                f"refreshes {row['refreshes']:>4}"
+                + (f"  kong conns {kong['connections'].get('active', 0)}" if kong else "")
+            )
+
+        console.print(
+            f"[blue]Soaking {kong_url}/{endpoint.lstrip('/')}[/blue] with {vus} virtual users "
+            f"for {seconds:.0f}s; series → {output} (Ctrl-C stops early)"
+        )
+        results = run_soak(
+            kong_url,
+            endpoint,
+            vus,
+            seconds,
+            user_pool.token_for,
+            bucket_seconds=bucket,
+            method=method,
+            kong_admin_url=kong_admin_url,
+            containers=list(container),
+            output=output,
+            on_bucket=on_bucket,
+        )
+
+        analysis = results["analysis"]
+        table = Table(title="Soak drift (per hour)")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Slope", style="yellow")
+        for key, value in analysis.items():
+            if isinstance(value, float):
+                table.add_row(key, f"{value:+.2f}")
+        for name, growth in analysis["containers"].items():
+            table.add_row(f"{name} memory_bytes", f"{growth['memory_bytes_per_hour']:+.0f}")
+            table.add_row(f"{name} pids", f"{growth['pids_per_hour']:+.2f}")
+        console.print(table)
+
+        for burst in analysis["unauthorized_bursts"]:
+            cause = "refresh race" if burst["refresh_race"] else "other"
+            console.print(
+                f"[red]401 burst[/red] at t={burst['t']:.0f}s: {burst['unauthorized']} "
+                f"({burst['near_refresh']} near token expiry/issue → {cause})"
+            )
+        console.print(f"[green]✓ Series saved to:[/green] {output}")
+
+        if summary_output:
+            with open(summary_output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Summary saved to:[/green] {summary_output}")
+
+        if history:
+            _record_history(results, "soak", kong_url, history_db, kong_admin_url)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+    finally:
+        if cleanup:
+            _cleanup_sessions(keycloak_url, realm, admin_user, admin_password, user_pool.usernames)
+
+
+@main.group()
+def bench():
+    """Benchmarks"""
+    pass
+
+
+@bench.command("token")
+@click.option(
+    "--grant",
+    "grants",
+    multiple=True,
+    default=["password", "refresh_token"],
+    type=click.Choice(["password", "refresh_token", "client_credentials"]),
+    help="Grant type to exercise (repeatable)",
+)
+@click.option("--realm", default="kong-realm", help="Keycloak realm")
+@click.option("--keycloak-url", default="http://localhost:8080", help="Keycloak URL")
+@click.option("--client-id", default="kong-client", help="Client ID")
+@click.option("--client-secret", default=None, help="Client secret (client_credentials)")
+@click.option("--user", default="testuser", help="User for password/refresh grants")
+@click.option("--password", default="user123", help="Password for --user")
+@click.option("--pool-size", default=0, help="Spread password/refresh grants over pool users")
+@click.option("--pool-prefix", default="kc-load-", help="Pool username prefix")
+@click.option("--pool-password", default="load-test-123", help="Pool user password")
+@click.option("--start-concurrency", default=1, help="Workers at the start of the ramp")
+@click.option("--peak-concurrency", default=16, help="Workers at the end of the ramp")
+@click.option("--ramp-time", default=30.0, help="Ramp length in seconds")
+@click.option("--hold-time", default=30.0, help="Time held at peak concurrency in seconds")
+@click.option("--cleanup", is_flag=True, help="Log out the load users' sessions on exit")
+@click.option("--admin-user", default="admin", help="Admin username (for --cleanup)")
+@click.option("--output", default=None, help="Write results as JSON to this file")
+def bench_token(
+    grants,
+    realm,
+    keycloak_url,
+    client_id,
+    client_secret,
+    user,
+    password,
+    pool_size,
+    pool_prefix,
+    pool_password,
+    start_concurrency,
+    peak_concurrency,
+    ramp_time,
+    hold_time,
+    cleanup,
+    admin_user,
+    output,
+):
+    """Benchmark Keycloak token issuance"""
+    import json
+    from kc_test.bench import run_token_benchmark
+    from kc_test.reporter import print_bench_summary
+
+    user_pool = None
+    if pool_size:
+        from kc_test.user_pool import UserPool
+
+        user_pool = UserPool(keycloak_url, realm, pool_size, pool_prefix, pool_password)
+
+    admin_password = click.prompt("Admin Password", hide_input=True) if cleanup else None
+
+    console.print(
+        f"[blue]Benchmarking token endpoint:[/blue] {', '.join(grants)} "
+        f"({start_concurrency}→{peak_concurrency} workers over {ramp_time}s, hold {hold_time}s)"
+    )
+
+    try:
+        results = run_token_benchmark(
+            keycloak_url,
+            realm,
+            list(grants),
+            client_id=client_id,
+            username=user,
+            password=password,
+            client_secret=client_secret,
+            user_pool=user_pool,
+            start_concurrency=start_concurrency,
+            peak_concurrency=peak_concurrency,
+            ramp_time=ramp_time,
+            hold_time=hold_time,
+        )
+        print_bench_summary(results)
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2)
+            console.print(f"[green]✓ Results saved to:[/green] {output}")
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+    finally:
+        if cleanup:
+            usernames = user_pool.usernames if user_pool else [user]
+            _cleanup_sessions(keycloak_url, realm, admin_user, admin_password, usernames)
+
+
+@main.group()
+def fake():
+    """Local Keycloak/Kong stand-in"""
+    pass
+
+
+@fake.command("serve")
+@click.option("--host", default="127.0.0.1", help="Bind address")
+@click.option("--port", default=8080, help="Bind port")
+@click.option("--public-url", default=None, help="URL clients use (default: http://host:port)")
+@click.option("--key-file", default=None, help="Signing key shared with 'token mint'")
+@click.option("--backend-url", default=None, help="Forward /api/* to backend-demo at this URL")
+@click.option("--proxy-realm", default="kong-realm", help="Realm whose tokens the proxy accepts")
+@click.option("--access-ttl", default=300, help="Access token lifetime in seconds")
+@click.option("--keycloak-latency", default=0.0, help="Added Keycloak latency in seconds")
+@click.option("--keycloak-jitter", default=0.0, help="Keycloak latency spread (+/-) in seconds")
+@click.option("--keycloak-error-rate", default=0.0, help="Fraction of Keycloak requests failed")
+@click.option("--kong-latency", default=0.0, help="Added proxy latency in seconds")
+@click.option("--kong-jitter", default=0.0, help="Proxy latency spread (+/-) in seconds")
+@click.option("--kong-error-rate", default=0.0, help="Fraction of proxied requests failed")
+@click.option("--error-status", default=503, help="Status code of injected errors")
+@click.option("--seed", default=None, type=int, help="Random seed for reproducible injection")
+def fake_serve(
+    host,
+    port,
+    public_url,
+    key_file,
+    backend_url,
+    proxy_realm,
+    access_ttl,
+    keycloak_latency,
+    keycloak_jitter,
+    keycloak_error_rate,
+    kong_latency,
+    kong_jitter,
+    kong_error_rate,
+    error_status,
+    seed,
+):
+    """Serve a fake Keycloak + Kong for offline benchmarks"""
+    from kc_test.fake_stack import FakeStack, Faults, serve
+    from kc_test.token_mint import load_or_create_key
+
+    public_url = public_url or f"http://{host}:{port}"
+
+    try:
+        app = FakeStack(
+            public_url,
+            private_pem=load_or_create_key(key_file) if key_file else None,
+            backend_url=backend_url,
+            keycloak_faults=Faults(
+                keycloak_latency, keycloak_jitter, keycloak_error_rate, error_status, seed
+            ),
+            kong_faults=Faults(kong_latency, kong_jitter, kong_error_rate, error_status, seed),
+            access_ttl=access_ttl,
+            proxy_realm=proxy_realm,
+        )
+
+        console.print(f"[blue]Fake Keycloak + Kong on:[/blue] {public_url}")
+        console.print("[blue]Realms:[/blue] master (admin/admin), kong-realm (admin, testuser)")
+        serve(app, host, port)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+
+@main.group()
+def kong():
+    """Kong gateway operations"""
+    pass
+
+
+@kong.command("stats")
+@click.option("--topology", default=None, help="Topology file listing every gateway's admin URL")
+@click.option("--admin-url", "admin_urls", multiple=True, help="Kong admin URL (repeatable)")
+@click.option("--interval", default=5.0, help="Seconds between polls")
+@click.option("--duration", default=None, help="Stop after this long (e.g. 900, 45m)")
+@click.option("--timeout", default=5.0, help="Per-request timeout in seconds")
+@click.option("--output", default="kong-stats.ndjson", help="NDJSON time series file")
+def kong_stats(topology, admin_urls, interval, duration, timeout, output):
+    """Poll Kong status, metrics and upstream health from every admin API"""
+    from urllib.parse import urlparse
+    from rich.live import Live
+    from kc_test.kong_stats import poll
+    from kc_test.reporter import kong_stats_table
+    from kc_test.soak import parse_duration
+
+    try:
+        gateways = []
+        if topology:
+            from kc_test.topology import load_topology
+
+            gateways = load_topology(topology)
+            missing = [g["name"] for g in gateways if not g["admin_url"]]
+            if missing:
+                raise Exception(f"No admin_url for: {', '.join(missing)}")
+        gateways += [
+            {"name": urlparse(url).netloc or url, "admin_url": url.rstrip("/")}
+            for url in admin_urls
+        ]
+        if not gateways:
+            gateways = [{"name": "kong", "admin_url": "http://localhost:8001"}]
+
+        seconds = parse_duration(duration) if duration else None
+        console.print(
+            f"[blue]Polling {len(gateways)} Kong admin API(s) every {interval:g}s[/blue]; "
+            f"series → {output} (Ctrl-C stops)"
+        )
+
+        with Live(console=console, auto_refresh=False) as live:
+
+            def on_poll(rows):
+                live.update(kong_stats_table(rows), refresh=True)
+
+            try:
+                polls = poll(gateways, interval, seconds, output, on_poll, timeout=timeout)
+            except KeyboardInterrupt:
+                polls = None
+
+        if polls is not None:
+            console.print(f"[green]✓ {polls} polls saved to:[/green] {output}")
+        else:
+            console.print(f"[green]✓ Series saved to:[/green] {output}")
     except Exception as e:
         console.print(f"[red]✗ Error:[/red] {e}")
         raise click.Abort()
@@ -276,7 +1567,7 @@ def report():
 
 
 @report.command()
-@click.option("--input", required=True, help="Input test results file (JSON)")
+@click.option("--input", required=True, help="Input test results file (JSON or NDJSON)")
 @click.option(
     "--format",
     default="html",
@@ -286,17 +1577,14 @@ def report():
 @click.option("--output", required=True, help="Output file")
 def generate(input, format, output):
     """Generate report from test results"""
-    import json
-    from kc_test.reporter import generate_report
+    from kc_test.reporter import write_report
+    from kc_test.result_stream import open_results
 
     try:
-        with open(input, "r") as f:
-            results = json.load(f)
-
-        report = generate_report(results, format)
+        results, tests = open_results(input)
 
         with open(output, "w") as f:
-            f.write(report)
+            write_report(results, format, f, tests())
 
         console.print(f"[green]✓ Report generated:[/green] {output}")
     except Exception as e:
@@ -304,5 +1592,191 @@ def generate(input, format, output):
         raise click.Abort()
 
 
+@report.command()
+@click.option("--input", required=True, help="Results file to record (JSON or NDJSON)")
+@click.option(
+    "--kind",
+    default="suite",
+    type=click.Choice(["suite", "scenarios", "load", "soak"]),
+    help="Run type",
+)
+@click.option("--env", default=None, help="Environment (default: from the results)")
+@click.option("--kong-url", default=None, help="Kong URL to read the version from")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def record(input, kind, env, kong_url, history_db):
+    """Record a results file in the run history"""
+    from kc_test.result_stream import open_results
+
+    try:
+        results, tests = open_results(input)
+        results["tests"] = tests()
+        if env:
+            results["environment"] = env
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+    _record_history(results, kind, kong_url, history_db)
+
+
+@report.command()
+@click.argument("baseline")
+@click.argument("candidate")
+@click.option("--max-p50-increase", default=0.10, help="Allowed relative p50 increase")
+@click.option("--max-p95-increase", default=0.10, help="Allowed relative p95 increase")
+@click.option("--max-p99-increase", default=0.10, help="Allowed relative p99 increase")
+@click.option("--max-throughput-drop", default=0.10, help="Allowed relative throughput drop")
+@click.option("--alpha", default=0.05, help="Significance level for latency shifts")
+@click.option("--min-samples", default=20, help="Samples per side before a shift can regress")
+@click.option(
+    "--format",
+    default="console",
+    type=click.Choice(["console", "markdown", "json"]),
+    help="Output format",
+)
+@click.option("--output", default=None, help="Write the comparison to this file")
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def compare(
+    baseline,
+    candidate,
+    max_p50_increase,
+    max_p95_increase,
+    max_p99_increase,
+    max_throughput_drop,
+    alpha,
+    min_samples,
+    format,
+    output,
+    history_db,
+):
+    """Compare two runs and exit non-zero on significant regressions
+
+    BASELINE and CANDIDATE are results files or recorded runs as run:<id>.
+    """
+    import io
+    import json
+    from kc_test.compare import compare_runs, load_endpoints
+    from kc_test.reporter import print_comparison, write_comparison_markdown
+
+    thresholds = {
+        "p50": max_p50_increase,
+        "p95": max_p95_increase,
+        "p99": max_p99_increase,
+        "throughput": max_throughput_drop,
+    }
+
+    try:
+        comparison = compare_runs(
+            load_endpoints(baseline, history_db),
+            load_endpoints(candidate, history_db),
+            thresholds,
+            alpha,
+            min_samples,
+        )
+
+        if format == "console":
+            print_comparison(comparison)
+        else:
+            buffer = io.StringIO()
+            if format == "json":
+                json.dump(comparison, buffer, indent=2)
+            else:
+                write_comparison_markdown(comparison, buffer, baseline, candidate)
+            if output:
+                with open(output, "w") as f:
+                    f.write(buffer.getvalue())
+                console.print(f"[green]✓ Comparison saved to:[/green] {output}")
+            else:
+                click.echo(buffer.getvalue())
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+    if not comparison["passed"]:
+        raise SystemExit(1)
+
+
+@report.command()
+@click.option("--endpoint", default=None, help="Only endpoints containing this text")
+@click.option("--env", default=None, help="Only runs in this environment")
+@click.option(
+    "--kind",
+    default=None,
+    type=click.Choice(["suite", "scenarios", "load", "soak"]),
+    help="Only runs of this type",
+)
+@click.option("--days", default=None, type=float, help="Only runs from the last N days")
+@click.option("--limit", default=20, help="Most recent runs per endpoint")
+@click.option(
+    "--format",
+    default="console",
+    type=click.Choice(["console", "json"]),
+    help="Output format",
+)
+@click.option("--history-db", default=None, help="Run history (default: ~/.kc-test-history.db)")
+def trend(endpoint, env, kind, days, limit, format, history_db):
+    """Show p99 and throughput over time per endpoint"""
+    import json
+    import time
+    from datetime import datetime
+    from kc_test.history import DEFAULT_HISTORY_DB, TREND_WARN_CHANGE, RunHistory, regression
+
+    try:
+        since = time.time() - days * 86400 if days else None
+        with RunHistory(history_db or DEFAULT_HISTORY_DB) as history:
+            trends = history.trend(endpoint, env, kind, since, limit)
+    except Exception as e:
+        console.print(f"[red]✗ Error:[/red] {e}")
+        raise click.Abort()
+
+    if format == "json":
+        click.echo(json.dumps(trends, indent=2))
+        return
+
+    if not trends:
+        console.print("[yellow]No recorded runs match[/yellow]")
+        return
+
+    for name, series in trends.items():
+        table = Table(title=name)
+        table.add_column("Recorded", style="cyan")
+        table.add_column("Kind")
+        table.add_column("Env")
+        table.add_column("Git")
+        table.add_column("Kong")
+        table.add_column("Keycloak")
+        table.add_column("Requests", justify="right")
+        table.add_column("Errors", justify="right", style="red")
+        table.add_column("Req/s", justify="right", style="green")
+        table.add_column("p50", justify="right", style="blue")
+        table.add_column("p99", justify="right", style="blue")
+
+        for row in series:
+            table.add_row(
+                datetime.fromtimestamp(row["recorded_at"]).strftime("%Y-%m-%d %H:%M"),
+                row["kind"],
+                row["environment"] or "-",
+                (row["git_sha"] or "-")[:8],
+                row["kong_version"] or "-",
+                row["keycloak_version"] or "-",
+                str(row["requests"]),
+                str(row["errors"]),
+                f"{row['throughput']:.1f}" if row["throughput"] is not None else "-",
+                f"{row['p50'] * 1000:.1f}ms" if row["p50"] is not None else "-",
+                f"{row['p99'] * 1000:.1f}ms" if row["p99"] is not None else "-",
+            )
+        console.print(table)
+
+        for key, worse in (("p99", 1), ("throughput", -1)):
+            change = regression(series, key)
+            if change is None:
+                continue
+            color = "red" if change * worse >= TREND_WARN_CHANGE else "green"
+            console.print(
+                f"  [{color}]{key} {change:+.1%}[/{color}] vs median of the "
+                f"{len(series) - 1} earlier run(s)"
+            )
+
+
 if __name__ == "__main__":
     main()
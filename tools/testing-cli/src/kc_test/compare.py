@@ -0,0 +1,193 @@
+"""Comparison of two runs with significance testing, for regression gating"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from .histogram import LatencyHistogram
+from .history import DEFAULT_HISTORY_DB, RunHistory, endpoint_rows
+from .result_stream import open_results
+
+# Default gates: relative increase (latency) or drop (throughput) that fails a comparison
+DEFAULT_THRESHOLDS = {"p50": 0.10, "p95": 0.10, "p99": 0.10, "throughput": 0.10}
+
+# Significance level for latency shifts
+DEFAULT_ALPHA = 0.05
+
+# Samples each side needs before a latency shift can count as significant
+DEFAULT_MIN_SAMPLES = 20
+
+
+def mann_whitney(
+    baseline: LatencyHistogram, candidate: LatencyHistogram
+) -> Tuple[float, float, float]:
+    """
+    Two-sided Mann-Whitney U test on two latency histograms
+
+    Samples in the same bucket are treated as ties, so the test runs over
+    the buckets rather than the raw samples and uses the normal
+    approximation with tie correction.
+
+    Args:
+        baseline: Baseline latencies
+        candidate: Candidate latencies (same bucket layout)
+
+    Returns:
+        (probability that a candidate sample is slower than a baseline
+        sample, z score, p-value); (0.5, 0.0, 1.0) if either side is empty
+    """
+    if (baseline.floor, baseline.growth) != (candidate.floor, candidate.growth):
+        raise ValueError("Cannot compare histograms with different bucket layouts")
+
+    n1, n2 = baseline.count, candidate.count
+    if not n1 or not n2:
+        return 0.5, 0.0, 1.0
+
+    u = 0.0
+    below = 0
+    ties = 0.0
+    for index in sorted(set(baseline.counts) | set(candidate.counts)):
+        a = baseline.counts.get(index, 0)
+        b = candidate.counts.get(index, 0)
+        u += b * (below + a / 2)
+        below += a
+        t = a + b
+        ties += t**3 - t
+
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u / (n1 * n2), 0.0, 1.0
+
+    z = (u - mean) / math.sqrt(variance)
+    return u / (n1 * n2), z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def _change(baseline: Optional[float], candidate: Optional[float]) -> Optional[float]:
+    if baseline is None or candidate is None or not baseline:
+        return None
+    return (candidate - baseline) / baseline
+
+
+def compare_endpoint(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    thresholds: Dict[str, float] = DEFAULT_THRESHOLDS,
+    alpha: float = DEFAULT_ALPHA,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+) -> Dict[str, Any]:
+    """
+    Compare one endpoint between two runs
+
+    A latency percentile regresses when it grew past its threshold and the
+    Mann-Whitney test finds the candidate significantly slower; throughput
+    regresses when it dropped past its threshold (with enough requests on
+    both sides to mean anything).
+
+    Args:
+        baseline: Baseline endpoint row (see history.endpoint_rows)
+        candidate: Candidate endpoint row
+        thresholds: Relative change per metric (p50/p95/p99 increase, throughput drop)
+        alpha: Significance level
+        min_samples: Samples each side needs for a regression to count
+
+    Returns:
+        Baseline/candidate values and relative change per metric, the test
+        result, and the regressions found
+    """
+    slower, z, p_value = mann_whitney(baseline["histogram"], candidate["histogram"])
+    enough = min(baseline["requests"], candidate["requests"]) >= min_samples
+    significant = enough and p_value < alpha and slower > 0.5
+
+    metrics = {}
+    regressions = []
+    for key in ("p50", "p95", "p99", "throughput"):
+        change = _change(baseline.get(key), candidate.get(key))
+        metrics[key] = {
+            "baseline": baseline.get(key),
+            "candidate": candidate.get(key),
+            "change": change,
+        }
+        threshold = thresholds.get(key)
+        if change is None or threshold is None or not enough:
+            continue
+        if key == "throughput" and -change > threshold:
+            regressions.append(f"throughput {change:+.1%} (limit -{threshold:.0%})")
+        elif key != "throughput" and change > threshold and significant:
+            regressions.append(f"{key} {change:+.1%} (limit +{threshold:.0%}, p={p_value:.3g})")
+
+    return {
+        "endpoint": candidate["endpoint"],
+        "requests": {"baseline": baseline["requests"], "candidate": candidate["requests"]},
+        "errors": {"baseline": baseline["errors"], "candidate": candidate["errors"]},
+        "metrics": metrics,
+        "test": {
+            "method": "mann-whitney",
+            "prob_slower": slower,
+            "z": z,
+            "p_value": p_value,
+            "significant": significant,
+        },
+        "regressions": regressions,
+    }
+
+
+def compare_runs(
+    baseline: List[Dict[str, Any]],
+    candidate: List[Dict[str, Any]],
+    thresholds: Dict[str, float] = DEFAULT_THRESHOLDS,
+    alpha: float = DEFAULT_ALPHA,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+) -> Dict[str, Any]:
+    """
+    Compare every endpoint the two runs have in common
+
+    Args:
+        baseline: Baseline endpoint rows
+        candidate: Candidate endpoint rows
+        thresholds: Relative change per metric (p50/p95/p99 increase, throughput drop)
+        alpha: Significance level
+        min_samples: Samples each side needs for a regression to count
+
+    Returns:
+        Per-endpoint comparisons, endpoints found on one side only, settings,
+        and whether the candidate passed (no regressions)
+    """
+    by_name = {row["endpoint"]: row for row in baseline}
+    candidates = {row["endpoint"]: row for row in candidate}
+
+    endpoints = [
+        compare_endpoint(by_name[name], row, thresholds, alpha, min_samples)
+        for name, row in candidates.items()
+        if name in by_name
+    ]
+
+    return {
+        "endpoints": endpoints,
+        "only_baseline": sorted(set(by_name) - set(candidates)),
+        "only_candidate": sorted(set(candidates) - set(by_name)),
+        "thresholds": thresholds,
+        "alpha": alpha,
+        "min_samples": min_samples,
+        "regressions": sum(len(e["regressions"]) for e in endpoints),
+        "passed": not any(e["regressions"] for e in endpoints),
+    }
+
+
+def load_endpoints(source: str, history_db: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Endpoint rows of a run: a results file, or a recorded run as "run:<id>"
+
+    Args:
+        source: Results file (JSON or NDJSON; load, soak or test results) or run reference
+        history_db: Run history holding referenced runs
+
+    Returns:
+        Rows shaped like history.endpoint_rows()
+    """
+    if source.startswith("run:"):
+        with RunHistory(history_db or DEFAULT_HISTORY_DB) as history:
+            return history.endpoints(int(source[4:]))
+
+    results, tests = open_results(source)
+    return endpoint_rows({**results, "tests": tests()})
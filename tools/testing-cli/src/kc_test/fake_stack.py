@@ -0,0 +1,801 @@
+"""In-process stand-in for Keycloak and Kong, for deterministic offline benchmarks"""
+
+import asyncio
+import json
+import random
+import re
+import secrets
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from .token_mint import TokenMinter, generate_key
+
+DEFAULT_ACCESS_TTL = 300
+DEFAULT_REFRESH_TTL = 1800
+
+# Verified tokens remembered by the proxy before the cache is reset
+VERIFY_CACHE_SIZE = 10000
+
+# Realms created on startup, shaped like compose/kong-realm.json
+DEFAULT_REALMS: Dict[str, Dict[str, Any]] = {
+    "master": {
+        "roles": ["admin"],
+        "users": [{"username": "admin", "password": "admin", "roles": ["admin"]}],
+    },
+    "kong-realm": {
+        "roles": ["user", "admin"],
+        "users": [
+            {"username": "admin", "password": "admin123", "roles": ["admin", "user"]},
+            {"username": "testuser", "password": "user123", "roles": ["user"]},
+        ],
+    },
+}
+
+Response = Tuple[int, Any, Dict[str, str]]
+
+
+class Faults:
+    """Latency and error injection for one side of the fake (Keycloak or Kong)"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize fault injection
+
+        Args:
+            latency: Added delay per request in seconds
+            jitter: Uniform +/- spread around latency in seconds
+            error_rate: Fraction of requests (0-1) answered with error_status
+            error_status: Status code of injected errors
+            seed: Random seed, for reproducible runs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+
+    async def apply(self) -> Optional[int]:
+        """Sleep for the injected latency; return a status code if this request should fail"""
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+
+class _Request:
+    """Minimal view of an ASGI HTTP request"""
+
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query = dict(parse_qsl(scope.get("query_string", b"").decode()))
+        self.headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+        self.body = body
+        self.received = time.perf_counter()
+
+    def json(self) -> Any:
+        return json.loads(self.body or b"null")
+
+    def form(self) -> Dict[str, str]:
+        return dict(parse_qsl(self.body.decode()))
+
+    def bearer(self) -> Optional[str]:
+        value = self.headers.get("authorization", "")
+        return value[7:] if value.lower().startswith("bearer ") else None
+
+
+class FakeStack:
+    """
+    ASGI application answering as Keycloak and as the Kong proxy
+
+    Keycloak side: the OIDC token endpoint (password, refresh_token and
+    client_credentials grants), JWKS and discovery, and the Admin API endpoints
+    KeycloakAdmin uses (users, partialImport, realm roles, role mappings,
+    logout, clients and sessions). Kong side: /api/* is checked for a valid
+    token from the proxy realm (admin routes also for the admin role), as
+    Kong's JWT plugin only trusts that realm's issuer, and then either
+    forwarded to backend-demo or answered with backend-demo's payloads, plus
+    /health and Kong's admin /status. All state lives in memory.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8080",
+        private_pem: Optional[str] = None,
+        backend_url: Optional[str] = None,
+        keycloak_faults: Optional[Faults] = None,
+        kong_faults: Optional[Faults] = None,
+        access_ttl: int = DEFAULT_ACCESS_TTL,
+        refresh_ttl: int = DEFAULT_REFRESH_TTL,
+        realms: Optional[Dict[str, Dict[str, Any]]] = None,
+        proxy_realm: str = "kong-realm",
+    ):
+        """
+        Initialize fake stack
+
+        Args:
+            base_url: URL clients reach the fake at (used for iss and discovery)
+            private_pem: Signing key (e.g. the one `token mint` uses, so minted
+                tokens pass the proxy); generated if omitted
+            backend_url: backend-demo URL to forward /api/* to (built-in
+                responses if omitted)
+            keycloak_faults: Fault injection for Keycloak endpoints
+            kong_faults: Fault injection for proxied requests
+            access_ttl: Access token lifetime in seconds
+            refresh_ttl: Refresh token lifetime in seconds
+            realms: Realms to seed (default: DEFAULT_REALMS)
+            proxy_realm: Realm whose tokens the Kong proxy accepts
+        """
+        self.base_url = base_url.rstrip("/")
+        self.private_pem = private_pem or generate_key()
+        self.backend_url = backend_url.rstrip("/") if backend_url else None
+        self.keycloak_faults = keycloak_faults or Faults()
+        self.kong_faults = kong_faults or Faults()
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.proxy_realm = proxy_realm
+        self.realms: Dict[str, Dict[str, Any]] = {}
+        self.refresh_tokens: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"requests": 0, "tokens_issued": 0, "proxied": 0, "injected_errors": 0}
+        self._minters: Dict[Tuple[str, str], TokenMinter] = {}
+        self._verified: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._backend = None
+
+        for name, spec in (realms or DEFAULT_REALMS).items():
+            self.add_realm(name, spec.get("roles", []), spec.get("users", []))
+
+        oidc = r"/realms/([^/]+)/protocol/openid-connect"
+        admin = r"/admin/realms/([^/]+)"
+        user = rf"{admin}/users/([^/]+)"
+
+        self._routes: List[Tuple[str, re.Pattern, Callable[..., Awaitable[Response]], str]] = []
+        for method, pattern, handler, side in [
+            ("POST", rf"{oidc}/token", self._token, "kc"),
+            ("GET", rf"{oidc}/certs", self._certs, "kc"),
+            ("GET", r"/realms/([^/]+)/\.well-known/openid-configuration", self._discovery, "kc"),
+            ("GET", rf"{admin}/users", self._list_users, "admin"),
+            ("POST", rf"{admin}/users", self._create_user, "admin"),
+            ("GET", user, self._get_user, "admin"),
+            ("POST", rf"{admin}/partialImport", self._partial_import, "admin"),
+            ("GET", rf"{admin}/roles", self._list_roles, "admin"),
+            ("GET", rf"{user}/role-mappings/realm", self._get_mappings, "admin"),
+            ("POST", rf"{user}/role-mappings/realm", self._add_mappings, "admin"),
+            ("POST", rf"{user}/logout", self._logout_user, "admin"),
+            ("GET", rf"{admin}/clients", self._list_clients, "admin"),
+            ("GET", rf"{admin}/clients/([^/]+)/user-sessions", self._client_sessions, "admin"),
+            ("DELETE", rf"{admin}/sessions/([^/]+)", self._delete_session, "admin"),
+            ("GET", r"/health", self._health, "kong"),
+            ("GET", r"/status", self._status, "kong"),
+            ("*", r"/api/(.*)", self._proxy, "kong"),
+        ]:
+            self._routes.append((method, re.compile(pattern), handler, side))
+
+    # Realm state
+
+    def add_realm(self, name: str, roles: List[str], users: List[Dict[str, Any]]):
+        """
+        Create (or reset) a realm
+
+        Args:
+            name: Realm name
+            roles: Realm role names
+            users: Users as dicts with username, password and optional roles
+        """
+        self.realms[name] = {
+            "roles": {role: {"id": str(uuid.uuid4()), "name": role} for role in roles},
+            "users": {},
+            "by_username": {},
+            "mappings": {},
+            "clients": {
+                client_id: {"id": str(uuid.uuid4()), "clientId": client_id}
+                for client_id in ["kong-client", "admin-cli"]
+            },
+            "sessions": {},
+        }
+        for user in users:
+            user_id = self._add_user(name, {"username": user["username"]}, user.get("password"))
+            self.realms[name]["mappings"][user_id] = set(user.get("roles", []))
+
+    def _realm(self, name: str) -> Dict[str, Any]:
+        realm = self.realms.get(name)
+        if realm is None:
+            raise _HTTPError(404, {"error": "Realm not found."})
+        return realm
+
+    def _add_user(self, realm_name: str, rep: Dict[str, Any], password: Optional[str]) -> str:
+        realm = self.realms[realm_name]
+        username = rep["username"].lower()
+        user_id = str(uuid.uuid4())
+        realm["users"][user_id] = {
+            "id": user_id,
+            "username": username,
+            "enabled": rep.get("enabled", True),
+            "email": rep.get("email"),
+            "firstName": rep.get("firstName"),
+            "lastName": rep.get("lastName"),
+            "createdTimestamp": int(time.time() * 1000),
+            "_password": password,
+        }
+        realm["by_username"][username] = user_id
+        realm["mappings"].setdefault(user_id, set())
+        return user_id
+
+    @staticmethod
+    def _password_of(rep: Dict[str, Any]) -> Optional[str]:
+        for credential in rep.get("credentials") or []:
+            if credential.get("type") == "password":
+                return credential.get("value")
+        return None
+
+    @staticmethod
+    def _public(user: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in user.items() if not k.startswith("_") and v is not None}
+
+    def _user(self, realm: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        user = realm["users"].get(user_id)
+        if user is None:
+            raise _HTTPError(404, {"error": "User not found"})
+        return user
+
+    # Tokens
+
+    def _minter(self, realm: str, client_id: str) -> TokenMinter:
+        key = (realm, client_id)
+        if key not in self._minters:
+            self._minters[key] = TokenMinter(
+                self.private_pem, f"{self.base_url}/realms/{realm}", client_id, self.access_ttl
+            )
+        return self._minters[key]
+
+    def _access_token(
+        self,
+        realm: str,
+        client_id: str,
+        user: Dict[str, Any],
+        roles: List[str],
+        session_id: Optional[str] = None,
+    ) -> str:
+        # Every token is signed afresh with its own random jti, so separate
+        # sessions never share a token
+        return self._minter(realm, client_id).mint(
+            user["username"],
+            sorted(roles),
+            user.get("email"),
+            {"sid": session_id} if session_id else None,
+        )
+
+    def _issue(self, realm_name: str, client_id: str, user_id: str, session_id: str) -> Any:
+        realm = self.realms[realm_name]
+        user = realm["users"][user_id]
+        refresh = secrets.token_urlsafe(32)
+        self.refresh_tokens[refresh] = {
+            "realm": realm_name,
+            "client_id": client_id,
+            "user_id": user_id,
+            "session_id": session_id,
+            "expires_at": time.time() + self.refresh_ttl,
+        }
+        self.stats["tokens_issued"] += 1
+        return {
+            "access_token": self._access_token(
+                realm_name, client_id, user, list(realm["mappings"][user_id]), session_id
+            ),
+            "expires_in": self.access_ttl,
+            "refresh_expires_in": self.refresh_ttl,
+            "refresh_token": refresh,
+            "token_type": "Bearer",
+            "not-before-policy": 0,
+            "session_state": session_id,
+            "scope": "openid profile email",
+        }
+
+    def verify(self, token: Optional[str], realm: str) -> Optional[Dict[str, Any]]:
+        """
+        Check a bearer token's signature, issuer and expiry against a realm
+
+        Args:
+            token: Encoded JWT
+            realm: Realm that must have issued the token
+
+        Returns:
+            Claims if the token is valid for the realm, otherwise None
+        """
+        from jose import jwt
+
+        if not token:
+            return None
+
+        key = (realm, token)
+        claims = self._verified.get(key)
+        if claims is None:
+            try:
+                claims = jwt.decode(
+                    token,
+                    self._minter(realm, "admin-cli").jwks(),
+                    algorithms=["RS256"],
+                    issuer=f"{self.base_url}/realms/{realm}",
+                    options={"verify_aud": False, "verify_exp": False},
+                )
+            except Exception:
+                return None
+            if len(self._verified) > VERIFY_CACHE_SIZE:
+                self._verified.clear()
+            self._verified[key] = claims
+
+        return claims if claims.get("exp", 0) > time.time() else None
+
+    # Keycloak endpoints
+
+    async def _token(self, request: _Request, realm_name: str) -> Response:
+        realm = self._realm(realm_name)
+        form = request.form()
+        grant = form.get("grant_type")
+        client_id = form.get("client_id", "")
+
+        if grant == "password":
+            user_id = realm["by_username"].get(form.get("username", "").lower())
+            user = realm["users"].get(user_id) if user_id else None
+            if user is None or user["_password"] != form.get("password"):
+                return (
+                    401,
+                    {"error": "invalid_grant", "error_description": "Invalid user credentials"},
+                    {},
+                )
+            session_id = str(uuid.uuid4())
+            realm["sessions"][session_id] = {
+                "id": session_id,
+                "userId": user_id,
+                "username": user["username"],
+                "clientId": client_id,
+                "start": int(time.time() * 1000),
+            }
+            return 200, self._issue(realm_name, client_id, user_id, session_id), {}
+
+        if grant == "refresh_token":
+            entry = self.refresh_tokens.pop(form.get("refresh_token", ""), None)
+            if (
+                entry is None
+                or entry["realm"] != realm_name
+                or entry["expires_at"] < time.time()
+                or entry["session_id"] not in realm["sessions"]
+            ):
+                return (
+                    400,
+                    {"error": "invalid_grant", "error_description": "Invalid refresh token"},
+                    {},
+                )
+            return (
+                200,
+                self._issue(realm_name, client_id, entry["user_id"], entry["session_id"]),
+                {},
+            )
+
+        if grant == "client_credentials":
+            if not form.get("client_secret"):
+                return 401, {"error": "unauthorized_client"}, {}
+            self.stats["tokens_issued"] += 1
+            user = {"username": f"service-account-{client_id}"}
+            token = self._access_token(realm_name, client_id, user, [])
+            return (
+                200,
+                {"access_token": token, "expires_in": self.access_ttl, "token_type": "Bearer"},
+                {},
+            )
+
+        return 400, {"error": "unsupported_grant_type"}, {}
+
+    async def _certs(self, request: _Request, realm_name: str) -> Response:
+        self._realm(realm_name)
+        return 200, self._minter(realm_name, "admin-cli").jwks(), {}
+
+    async def _discovery(self, request: _Request, realm_name: str) -> Response:
+        self._realm(realm_name)
+        issuer = f"{self.base_url}/realms/{realm_name}"
+        return (
+            200,
+            {
+                "issuer": issuer,
+                "token_endpoint": f"{issuer}/protocol/openid-connect/token",
+                "jwks_uri": f"{issuer}/protocol/openid-connect/certs",
+                "grant_types_supported": ["password", "refresh_token", "client_credentials"],
+                "id_token_signing_alg_values_supported": ["RS256"],
+            },
+            {},
+        )
+
+    # Admin API endpoints
+
+    async def _list_users(self, request: _Request, realm_name: str) -> Response:
+        realm = self._realm(realm_name)
+        username = request.query.get("username")
+        if username is not None:
+            username = username.lower()
+            if request.query.get("exact") == "true":
+                user_id = realm["by_username"].get(username)
+                users = [realm["users"][user_id]] if user_id else []
+            else:
+                users = [u for u in realm["users"].values() if username in u["username"]]
+        else:
+            users = list(realm["users"].values())
+
+        first = int(request.query.get("first", 0))
+        count = int(request.query.get("max", 100))
+        return 200, [self._public(u) for u in users[first : first + count]], {}
+
+    async def _create_user(self, request: _Request, realm_name: str) -> Response:
+        realm = self._realm(realm_name)
+        rep = request.json() or {}
+        if not rep.get("username"):
+            return 400, {"errorMessage": "User name is missing"}, {}
+        if rep["username"].lower() in realm["by_username"]:
+            return 409, {"errorMessage": "User exists with same username"}, {}
+
+        user_id = self._add_user(realm_name, rep, self._password_of(rep))
+        location = f"{self.base_url}/admin/realms/{realm_name}/users/{user_id}"
+        return 201, None, {"location": location}
+
+    async def _get_user(self, request: _Request, realm_name: str, user_id: str) -> Response:
+        return 200, self._public(self._user(self._realm(realm_name), user_id)), {}
+
+    async def _partial_import(self, request: _Request, realm_name: str) -> Response:
+        realm = self._realm(realm_name)
+        body = request.json() or {}
+        policy = body.get("ifResourceExists", "FAIL")
+        added = skipped = overwritten = 0
+
+        for rep in body.get("users", []):
+            existing = realm["by_username"].get(rep.get("username", "").lower())
+            if existing is None:
+                self._add_user(realm_name, rep, self._password_of(rep))
+                added += 1
+            elif policy == "SKIP":
+                skipped += 1
+            elif policy == "OVERWRITE":
+                realm["users"][existing]["_password"] = self._password_of(rep)
+                overwritten += 1
+            else:
+                return 409, {"errorMessage": f"User '{rep['username']}' already exists"}, {}
+
+        return 200, {"added": added, "skipped": skipped, "overwritten": overwritten}, {}
+
+    async def _list_roles(self, request: _Request, realm_name: str) -> Response:
+        return 200, list(self._realm(realm_name)["roles"].values()), {}
+
+    async def _get_mappings(self, request: _Request, realm_name: str, user_id: str) -> Response:
+        realm = self._realm(realm_name)
+        self._user(realm, user_id)
+        roles = realm["mappings"][user_id]
+        return 200, [realm["roles"][r] for r in sorted(roles) if r in realm["roles"]], {}
+
+    async def _add_mappings(self, request: _Request, realm_name: str, user_id: str) -> Response:
+        realm = self._realm(realm_name)
+        self._user(realm, user_id)
+        for role in request.json() or []:
+            if role.get("name") not in realm["roles"]:
+                return 404, {"error": "Role not found"}, {}
+            realm["mappings"][user_id].add(role["name"])
+        return 204, None, {}
+
+    async def _logout_user(self, request: _Request, realm_name: str, user_id: str) -> Response:
+        realm = self._realm(realm_name)
+        self._user(realm, user_id)
+        for session_id in [s for s, v in realm["sessions"].items() if v["userId"] == user_id]:
+            del realm["sessions"][session_id]
+        return 204, None, {}
+
+    async def _list_clients(self, request: _Request, realm_name: str) -> Response:
+        clients = list(self._realm(realm_name)["clients"].values())
+        client_id = request.query.get("clientId")
+        if client_id:
+            clients = [c for c in clients if c["clientId"] == client_id]
+        return 200, clients, {}
+
+    async def _client_sessions(self, request: _Request, realm_name: str, uuid_: str) -> Response:
+        realm = self._realm(realm_name)
+        client = next((c for c in realm["clients"].values() if c["id"] == uuid_), None)
+        if client is None:
+            return 404, {"error": "Could not find client"}, {}
+        sessions = [s for s in realm["sessions"].values() if s["clientId"] == client["clientId"]]
+        first = int(request.query.get("first", 0))
+        count = int(request.query.get("max", 100))
+        return 200, sessions[first : first + count], {}
+
+    async def _delete_session(
+        self, request: _Request, realm_name: str, session_id: str
+    ) -> Response:
+        self._realm(realm_name)["sessions"].pop(session_id, None)
+        return 204, None, {}
+
+    # Kong side
+
+    async def _health(self, request: _Request) -> Response:
+        return 200, {"status": "healthy"}, {}
+
+    async def _status(self, request: _Request) -> Response:
+        return (
+            200,
+            {
+                "server": {
+                    "connections_active": 0,
+                    "connections_waiting": 0,
+                    "connections_handled": self.stats["requests"],
+                    "total_requests": self.stats["requests"],
+                },
+                "memory": {"workers_lua_vms": [], "lua_shared_dicts": {}},
+            },
+            {},
+        )
+
+    async def _proxy(self, request: _Request, path: str) -> Response:
+        route = path.split("/", 1)[0]
+        claims = None
+
+        if route in ("protected", "admin"):
+            claims = self.verify(request.bearer(), self.proxy_realm)
+            if claims is None:
+                return 401, {"message": "Unauthorized"}, {}
+
+        self.stats["proxied"] += 1
+        upstream_start = time.perf_counter()
+
+        if self.backend_url:
+            status, body, headers = await self._forward(request)
+        else:
+            status, body, headers = self._backend_response(request, path, claims)
+
+        return (
+            status,
+            body,
+            {
+                **headers,
+                "x-kong-proxy-latency": str(int((upstream_start - request.received) * 1000)),
+                "x-kong-upstream-latency": str(int((time.perf_counter() - upstream_start) * 1000)),
+            },
+        )
+
+    async def _forward(self, request: _Request) -> Response:
+        import httpx
+
+        if self._backend is None:
+            self._backend = httpx.AsyncClient(base_url=self.backend_url, timeout=30.0)
+
+        headers = {k: v for k, v in request.headers.items() if k not in ("host", "content-length")}
+        response = await self._backend.request(
+            request.method,
+            request.path,
+            params=request.query,
+            headers=headers,
+            content=request.body,
+        )
+        content_type = response.headers.get("content-type", "application/json")
+        return response.status_code, response.content, {"content-type": content_type}
+
+    @staticmethod
+    def _backend_response(
+        request: _Request, path: str, claims: Optional[Dict[str, Any]]
+    ) -> Response:
+        # Mirrors applications/backend-demo/src/api/routes.py
+        endpoint = f"/api/{path}"
+        routes = {
+            "public": ("GET", "POST"),
+            "protected": ("GET", "POST"),
+            "admin": ("GET",),
+            "admin/users": ("GET",),
+        }
+        if path not in routes:
+            return 404, {"detail": "Not Found"}, {}
+        if request.method not in routes[path]:
+            return 405, {"detail": "Method Not Allowed"}, {}
+
+        received = {}
+        if request.method == "POST":
+            try:
+                received = json.loads(request.body)
+            except ValueError:
+                pass
+
+        if path == "public":
+            if request.method == "POST":
+                return (
+                    200,
+                    {
+                        "message": "Public POST endpoint received your data",
+                        "received_data": received,
+                        "endpoint": endpoint,
+                        "method": "POST",
+                    },
+                    {},
+                )
+            return (
+                200,
+                {
+                    "message": "This is a public endpoint, accessible without authentication",
+                    "endpoint": endpoint,
+                    "authentication": "none",
+                },
+                {},
+            )
+
+        username = claims.get("preferred_username", "unknown")
+        if path == "protected":
+            if request.method == "POST":
+                return (
+                    200,
+                    {
+                        "message": "Protected POST endpoint processed your request",
+                        "received_data": received,
+                        "endpoint": endpoint,
+                        "method": "POST",
+                        "user": username,
+                    },
+                    {},
+                )
+            return (
+                200,
+                {
+                    "message": "This is a protected endpoint, accessible with valid JWT",
+                    "endpoint": endpoint,
+                    "authentication": "required",
+                    "user": {
+                        "id": claims.get("sub"),
+                        "roles": claims.get("realm_roles", []),
+                        "username": claims.get("preferred_username"),
+                        "email": claims.get("email"),
+                        "first_name": claims.get("given_name"),
+                        "last_name": claims.get("family_name"),
+                        "email_verified": claims.get("email_verified", False),
+                    },
+                    "token_info": {
+                        "issued_at": claims.get("iat"),
+                        "expires_at": claims.get("exp"),
+                        "issuer": claims.get("iss"),
+                    },
+                    "request_headers": {
+                        "x-kong-request-id": request.headers.get("x-kong-request-id"),
+                        "x-correlation-id": request.headers.get("x-correlation-id"),
+                    },
+                },
+                {},
+            )
+
+        if "admin" not in claims.get("realm_roles", []):
+            return 403, {"detail": "Forbidden: Admin role required"}, {}
+        if path == "admin":
+            return (
+                200,
+                {
+                    "message": "This is an admin endpoint, accessible only with admin role",
+                    "endpoint": endpoint,
+                    "authentication": "required",
+                    "authorization": "admin role",
+                    "user_info": {
+                        "username": username,
+                        "email": claims.get("email", "unknown"),
+                        "roles": claims.get("realm_roles", []),
+                    },
+                },
+                {},
+            )
+        return (
+            200,
+            {
+                "message": "Admin-only endpoint: User list",
+                "users": [
+                    {"id": 1, "username": "admin", "roles": ["admin", "user"]},
+                    {"id": 2, "username": "testuser", "roles": ["user"]},
+                ],
+                "total": 2,
+                "requester": username,
+            },
+            {},
+        )
+
+    # ASGI
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    if self._backend is not None:
+                        await self._backend.aclose()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        request = _Request(scope, body)
+        self.stats["requests"] += 1
+        status, payload, headers = await self._dispatch(request)
+
+        if isinstance(payload, bytes):
+            content = payload
+        elif payload is None:
+            content = b""
+        else:
+            content = json.dumps(payload).encode()
+            headers.setdefault("content-type", "application/json")
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-length", str(len(content)).encode())]
+                + [(k.encode(), v.encode()) for k, v in headers.items()],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    async def _dispatch(self, request: _Request) -> Response:
+        for method, pattern, handler, side in self._routes:
+            match = pattern.fullmatch(request.path)
+            if not match or method not in ("*", request.method):
+                continue
+
+            faults = self.kong_faults if side == "kong" else self.keycloak_faults
+            injected = await faults.apply()
+            if injected:
+                self.stats["injected_errors"] += 1
+                return injected, {"error": "injected"}, {}
+
+            if side == "admin":
+                if self.verify(request.bearer(), "master") is None:
+                    return 401, {"error": "HTTP 401 Unauthorized"}, {}
+
+            try:
+                return await handler(request, *match.groups())
+            except _HTTPError as e:
+                return e.status, e.payload, {}
+            except ValueError:
+                return 400, {"error": "invalid request body"}, {}
+
+        return 404, {"error": "Not Found"}, {}
+
+
+class _HTTPError(Exception):
+    """Raised by handlers to answer with an error status"""
+
+    def __init__(self, status: int, payload: Any):
+        super().__init__(payload)
+        self.status = status
+        self.payload = payload
+
+
+def serve(app: FakeStack, host: str = "127.0.0.1", port: int = 8080):
+    """
+    Run the fake stack on an HTTP server
+
+    Args:
+        app: Fake stack
+        host: Bind address
+        port: Bind port
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise Exception("Serving the fake stack needs uvicorn (pip install uvicorn)")
+
+    uvicorn.run(app, host=host, port=port, log_level="warning")
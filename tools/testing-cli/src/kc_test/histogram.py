@@ -0,0 +1,142 @@
+"""Log-bucketed latency histograms"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Smallest latency with its own bucket (seconds); anything faster lands in bucket 0
+HISTOGRAM_FLOOR = 1e-6
+
+# Ratio between consecutive bucket bounds, i.e. about 2% relative precision
+HISTOGRAM_GROWTH = 1.02
+
+
+class LatencyHistogram:
+    """
+    Latency counts in logarithmic buckets
+
+    Buckets are kept sparsely, so a histogram of any number of samples stays a
+    few hundred entries at most. Count, sum, min and max are exact; percentiles
+    are accurate to the bucket width.
+    """
+
+    def __init__(self, floor: float = HISTOGRAM_FLOOR, growth: float = HISTOGRAM_GROWTH):
+        self.floor = floor
+        self.growth = growth
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._log_growth = math.log(growth)
+
+    def _index(self, value: float) -> int:
+        if value <= self.floor:
+            return 0
+        return int(math.log(value / self.floor) / self._log_growth)
+
+    def bounds(self, index: int) -> Tuple[float, float]:
+        """Lower and upper bound of a bucket in seconds"""
+        return self.floor * self.growth**index, self.floor * self.growth ** (index + 1)
+
+    def record(self, value: float, count: int = 1):
+        """
+        Add samples
+
+        Args:
+            value: Latency in seconds
+            count: Number of samples with this latency
+        """
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add every sample of another histogram with the same bucket layout"""
+        if (other.floor, other.growth) != (self.floor, self.growth):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """
+        Nearest-rank percentile
+
+        Args:
+            p: Percentile (0-100)
+
+        Returns:
+            Midpoint of the bucket holding the percentile, clamped to the
+            observed min/max (0.0 for an empty histogram)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lower, upper = self.bounds(index)
+                return min(max((lower + upper) / 2, self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        """Mean latency (0.0 for an empty histogram)"""
+        return self.sum / self.count if self.count else 0.0
+
+    def bins(self, n: int) -> List[Tuple[float, float, int]]:
+        """
+        Regroup the buckets into at most `n` bins of equal logarithmic width
+
+        Args:
+            n: Number of bins
+
+        Returns:
+            (lower bound, upper bound, count) per bin, spanning the occupied buckets
+        """
+        if not self.counts:
+            return []
+        first, last = min(self.counts), max(self.counts)
+        per_bin = max(math.ceil((last - first + 1) / n), 1)
+        grouped = [0] * math.ceil((last - first + 1) / per_bin)
+        for index, count in self.counts.items():
+            grouped[(index - first) // per_bin] += count
+        return [
+            (
+                self.bounds(first + i * per_bin)[0],
+                self.bounds(first + (i + 1) * per_bin - 1)[1],
+                count,
+            )
+            for i, count in enumerate(grouped)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form"""
+        return {
+            "floor": self.floor,
+            "growth": self.growth,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(index): n for index, n in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """Rebuild a histogram from to_dict() output"""
+        histogram = cls(data.get("floor", HISTOGRAM_FLOOR), data.get("growth", HISTOGRAM_GROWTH))
+        histogram.counts = {int(index): n for index, n in data.get("counts", {}).items()}
+        histogram.count = data.get("count", sum(histogram.counts.values()))
+        histogram.sum = data.get("sum", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
@@ -0,0 +1,354 @@
+"""Run history: every run's summary and latency histograms in a local SQLite store"""
+
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .histogram import LatencyHistogram
+
+DEFAULT_HISTORY_DB = os.environ.get(
+    "KC_TEST_HISTORY_DB", os.path.expanduser("~/.kc-test-history.db")
+)
+
+# Relative change of the latest run against earlier ones that trend output flags
+TREND_WARN_CHANGE = 0.10
+
+# Result fields too large (or per-sample) to keep in the stored run summary
+_DETAIL_FIELDS = ("tests", "histogram", "timeline", "series")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    environment TEXT,
+    git_sha TEXT,
+    kong_version TEXT,
+    keycloak_version TEXT,
+    summary TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS endpoints (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    throughput REAL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    max REAL,
+    histogram TEXT,
+    PRIMARY KEY (run_id, endpoint)
+);
+CREATE INDEX IF NOT EXISTS endpoints_by_name ON endpoints(endpoint, run_id);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs(recorded_at);
+"""
+
+
+def git_sha(cwd: Optional[str] = None) -> Optional[str]:
+    """
+    Commit under test: CI-provided SHA, else HEAD of the working directory's repo
+
+    Args:
+        cwd: Directory inside the repository
+
+    Returns:
+        Commit SHA, or None outside a git checkout
+    """
+    for variable in ("GITHUB_SHA", "CI_COMMIT_SHA", "GIT_COMMIT"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def kong_version(
+    kong_url: str, admin_url: Optional[str] = None, timeout: float = 5
+) -> Optional[str]:
+    """
+    Kong version from its admin API, else from the proxy's Server/Via header
+
+    Args:
+        kong_url: Kong proxy URL
+        admin_url: Kong admin API URL (optional)
+        timeout: Request timeout in seconds
+
+    Returns:
+        Version string, or None if Kong is unreachable or hides it
+    """
+    if os.environ.get("KC_TEST_KONG_VERSION"):
+        return os.environ["KC_TEST_KONG_VERSION"]
+    try:
+        if admin_url:
+            return requests.get(admin_url, timeout=timeout).json().get("version")
+        response = requests.get(kong_url, timeout=timeout)
+    except Exception:
+        return None
+    for header in ("Server", "Via"):
+        match = re.search(r"kong/([\w.-]+)", response.headers.get(header, ""))
+        if match:
+            return match.group(1)
+    return None
+
+
+def keycloak_version() -> Optional[str]:
+    """
+    Keycloak version (KC_TEST_KEYCLOAK_VERSION)
+
+    Keycloak only reports its version to authenticated admins, so runs are
+    tagged from the environment, e.g. the image tag used by the compose file.
+    """
+    return os.environ.get("KC_TEST_KEYCLOAK_VERSION")
+
+
+def _histogram_row(endpoint: str, histogram: LatencyHistogram, errors: int) -> Dict[str, Any]:
+    return {
+        "endpoint": endpoint,
+        "requests": histogram.count,
+        "errors": errors,
+        "throughput": None,
+        "p50": histogram.percentile(50),
+        "p95": histogram.percentile(95),
+        "p99": histogram.percentile(99),
+        "max": histogram.max,
+        "histogram": histogram,
+    }
+
+
+def endpoint_rows(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Per-endpoint figures of a run
+
+    Load and soak runs are one endpoint ("METHOD /path"); test suites and
+    scenarios contribute one row per test name, with durations aggregated
+    into a histogram.
+
+    Args:
+        results: Run results (load/soak results or test results)
+
+    Returns:
+        Rows with requests, errors, throughput, percentiles and histogram
+    """
+    if results.get("latency"):
+        endpoint = f"{results.get('method', 'GET')} {urlparse(results.get('url', '')).path}"
+        latency = results["latency"]
+        histogram = (
+            LatencyHistogram.from_dict(results["histogram"])
+            if results.get("histogram")
+            else LatencyHistogram()
+        )
+        return [
+            {
+                "endpoint": endpoint,
+                "requests": results.get("requests", 0),
+                "errors": results.get("errors", 0),
+                "throughput": results.get("throughput"),
+                "p50": latency.get("p50"),
+                "p95": latency.get("p95"),
+                "p99": latency.get("p99"),
+                "max": latency.get("max"),
+                "histogram": histogram,
+            }
+        ]
+
+    by_name: Dict[str, List[Any]] = {}
+    for test in results.get("tests", []):
+        entry = by_name.setdefault(test["name"], [LatencyHistogram(), 0])
+        entry[0].record(test.get("duration", 0) or 0)
+        entry[1] += not test["passed"]
+    return [_histogram_row(name, h, errors) for name, (h, errors) in by_name.items()]
+
+
+class RunHistory:
+    """Append-only SQLite store of run summaries and per-endpoint histograms"""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_DB):
+        """
+        Open (and create if needed) the history database
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(
+        self,
+        results: Dict[str, Any],
+        kind: str,
+        tags: Optional[Dict[str, Optional[str]]] = None,
+        recorded_at: Optional[float] = None,
+    ) -> int:
+        """
+        Store a run
+
+        Args:
+            results: Run results
+            kind: Run type (suite, scenarios, load, soak)
+            tags: environment, git_sha, kong_version, keycloak_version
+            recorded_at: Unix time of the run (default: now)
+
+        Returns:
+            Run ID
+        """
+        tags = tags or {}
+        summary = {k: v for k, v in results.items() if k not in _DETAIL_FIELDS}
+        rows = endpoint_rows(results)
+
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (recorded_at, kind, environment, git_sha, kong_version, "
+                "keycloak_version, summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    recorded_at or time.time(),
+                    kind,
+                    tags.get("environment") or results.get("environment"),
+                    tags.get("git_sha"),
+                    tags.get("kong_version"),
+                    tags.get("keycloak_version"),
+                    json.dumps(summary, default=str),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO endpoints (run_id, endpoint, requests, errors, throughput, "
+                "p50, p95, p99, max, histogram) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        row["endpoint"],
+                        row["requests"],
+                        row["errors"],
+                        row["throughput"],
+                        row["p50"],
+                        row["p95"],
+                        row["p99"],
+                        row["max"],
+                        json.dumps(row["histogram"].to_dict()),
+                    )
+                    for row in rows
+                ],
+            )
+        return run_id
+
+    def trend(
+        self,
+        endpoint: Optional[str] = None,
+        environment: Optional[str] = None,
+        kind: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 50,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Per-endpoint figures over time
+
+        Args:
+            endpoint: Endpoint filter (substring match)
+            environment: Only runs in this environment
+            kind: Only runs of this type
+            since: Only runs recorded after this Unix time
+            limit: Most recent runs per endpoint
+
+        Returns:
+            Endpoint -> rows in chronological order (run metadata, requests,
+            errors, throughput and percentiles)
+        """
+        clauses, params = [], []
+        for clause, value in (
+            ("e.endpoint LIKE ?", f"%{endpoint}%" if endpoint else None),
+            ("r.environment = ?", environment),
+            ("r.kind = ?", kind),
+            ("r.recorded_at >= ?", since),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        rows = self.db.execute(
+            "SELECT r.id AS run_id, r.recorded_at, r.kind, r.environment, r.git_sha, "
+            "r.kong_version, r.keycloak_version, e.endpoint, e.requests, e.errors, "
+            "e.throughput, e.p50, e.p95, e.p99, e.max "
+            "FROM endpoints e JOIN runs r ON r.id = e.run_id"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + " ORDER BY r.recorded_at DESC",
+            params,
+        )
+
+        trends: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            series = trends.setdefault(row["endpoint"], [])
+            if len(series) < limit:
+                series.append(dict(row))
+        return {name: series[::-1] for name, series in sorted(trends.items())}
+
+    def endpoints(self, run_id: int) -> List[Dict[str, Any]]:
+        """
+        Stored per-endpoint figures of a run
+
+        Args:
+            run_id: Run ID
+
+        Returns:
+            Rows shaped like endpoint_rows(), with the histogram rebuilt
+        """
+        if not self.db.execute("SELECT 1 FROM runs WHERE id = ?", (run_id,)).fetchone():
+            raise Exception(f"Run {run_id} not found in {self.path}")
+
+        rows = self.db.execute(
+            "SELECT endpoint, requests, errors, throughput, p50, p95, p99, max, histogram "
+            "FROM endpoints WHERE run_id = ? ORDER BY endpoint",
+            (run_id,),
+        )
+        return [
+            {
+                **dict(row),
+                "histogram": LatencyHistogram.from_dict(json.loads(row["histogram"] or "{}")),
+            }
+            for row in rows
+        ]
+
+
+def regression(series: Iterable[Dict[str, Any]], key: str = "p99") -> Optional[float]:
+    """
+    Change of the latest value against the median of the earlier ones
+
+    Args:
+        series: Rows in chronological order
+        key: Field to compare
+
+    Returns:
+        Relative change (0.1 = 10% higher), or None with fewer than two values
+    """
+    values = [row[key] for row in series if row.get(key) is not None]
+    if len(values) < 2:
+        return None
+    earlier = sorted(values[:-1])
+    middle = len(earlier) // 2
+    median = earlier[middle] if len(earlier) % 2 else (earlier[middle - 1] + earlier[middle]) / 2
+    return (values[-1] - median) / median if median else None
@@ -3,11 +3,28 @@
 import requests
 import base64
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+# Refresh the admin token this many seconds before it actually expires
+TOKEN_REFRESH_MARGIN = 10
+
+# Default page size for paginated Admin API listings (Keycloak's own default is 100)
+USERS_PAGE_SIZE = 100
+
+# How long KeycloakAdmin caches realm roles and username -> ID lookups (seconds)
+REALM_CACHE_TTL = 300
 
 
 def get_token(
-    keycloak_url: str, realm: str, username: str, password: str, client_id: str = "kong-client"
+    keycloak_url: str,
+    realm: str,
+    username: str,
+    password: str,
+    client_id: str = "kong-client",
+    timeout: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Get JWT token from Keycloak
@@ -18,6 +35,7 @@ def get_token(
         username: Username
         password: Password
         client_id: Client ID (default: kong-client)
+        timeout: Request timeout in seconds (optional)
 
     Returns:
         Token data including access_token and refresh_token
@@ -32,7 +50,10 @@ def get_token(
     }
 
     response = requests.post(
-        token_endpoint, data=data, headers={"Content-Type": "application/x-www-form-urlencoded"}
+        token_endpoint,
+        data=data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        timeout=timeout,
     )
 
     if response.status_code != 200:
@@ -104,10 +125,62 @@ def refresh_token(
     return response.json()
 
 
+class UserExistsError(Exception):
+    """Raised when creating a user whose username is already taken"""
+
+
+class PartialImportUnavailable(Exception):
+    """Raised when the server does not provide the realm partialImport endpoint"""
+
+
+def user_representation(
+    username: str,
+    password: str,
+    email: Optional[str] = None,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build a Keycloak user representation with a permanent password
+
+    Args:
+        username: Username
+        password: Password
+        email: Email (optional)
+        first_name: First name (optional)
+        last_name: Last name (optional)
+
+    Returns:
+        User representation for the Admin API
+    """
+    user_data = {
+        "username": username,
+        "enabled": True,
+        "emailVerified": True,
+        "credentials": [{"type": "password", "value": password, "temporary": False}],
+    }
+
+    if email:
+        user_data["email"] = email
+    if first_name:
+        user_data["firstName"] = first_name
+    if last_name:
+        user_data["lastName"] = last_name
+
+    return user_data
+
+
 class KeycloakAdmin:
     """Keycloak Admin API client"""
 
-    def __init__(self, keycloak_url: str, admin_username: str, admin_password: str):
+    def __init__(
+        self,
+        keycloak_url: str,
+        admin_username: str,
+        admin_password: str,
+        auto_refresh: bool = False,
+        cache_ttl: float = REALM_CACHE_TTL,
+    ):
         """
         Initialize Keycloak Admin client
 
@@ -115,27 +188,131 @@ class KeycloakAdmin:
             keycloak_url: Keycloak base URL
             admin_username: Admin username
             admin_password: Admin password
+            auto_refresh: Refresh the admin token on a background timer
+            cache_ttl: Seconds to cache realm roles and username -> ID lookups
         """
         self.keycloak_url = keycloak_url
         self.admin_username = admin_username
         self.admin_password = admin_password
         self.admin_token = None
+        self.admin_refresh_token = None
+        self.token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self._refresh_timer: Optional[threading.Timer] = None
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[tuple, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
         self._authenticate()
 
+        if auto_refresh:
+            self.start_auto_refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_auto_refresh()
+
     def _authenticate(self):
         """Authenticate and get admin token"""
-        token_data = get_token(
-            self.keycloak_url, "master", self.admin_username, self.admin_password, "admin-cli"
-        )
+        token_data = None
+
+        # Prefer the refresh grant, fall back to a full login if the session is gone
+        if self.admin_refresh_token:
+            try:
+                token_data = refresh_token(
+                    self.keycloak_url, "master", self.admin_refresh_token, "admin-cli"
+                )
+            except Exception:
+                token_data = None
+
+        if token_data is None:
+            token_data = get_token(
+                self.keycloak_url, "master", self.admin_username, self.admin_password, "admin-cli"
+            )
+
         self.admin_token = token_data["access_token"]
+        self.admin_refresh_token = token_data.get("refresh_token")
+        self.token_expires_at = time.monotonic() + token_data.get("expires_in", 60)
+
+    def token_expiring(self, margin: float = TOKEN_REFRESH_MARGIN) -> bool:
+        """Check whether the admin token expires within `margin` seconds"""
+        return time.monotonic() >= self.token_expires_at - margin
+
+    def ensure_token(self):
+        """
+        Refresh the admin token if it is about to expire
+
+        Concurrent callers share a single in-flight refresh.
+        """
+        if not self.token_expiring():
+            return
+
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.token_expiring():
+                self._authenticate()
 
-    def _get_headers(self) -> Dict[str, str]:
+    def _reauthenticate(self, stale_token: Optional[str]):
+        """
+        Re-authenticate after the server rejected `stale_token`
+
+        Only the first caller holding the stale token refreshes; the others
+        pick up the token it obtained.
+        """
+        with self._token_lock:
+            if self.admin_token == stale_token:
+                self._authenticate()
+
+    def start_auto_refresh(self):
+        """Refresh the admin token on a background timer ahead of expiry"""
+        self.stop_auto_refresh()
+
+        delay = max(self.token_expires_at - TOKEN_REFRESH_MARGIN - time.monotonic(), 1.0)
+        self._refresh_timer = threading.Timer(delay, self._auto_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def stop_auto_refresh(self):
+        """Cancel the background refresh timer"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _auto_refresh(self):
+        """Background timer callback"""
+        try:
+            self.ensure_token()
+        except Exception:
+            # Leave it to the next request's on-demand refresh / 401 retry
+            pass
+        if self._refresh_timer is not None:
+            self.start_auto_refresh()
+
+    def _get_headers(self, token: Optional[str] = None) -> Dict[str, str]:
         """Get headers with admin token"""
         return {
-            "Authorization": f"Bearer {self.admin_token}",
+            "Authorization": f"Bearer {token or self.admin_token}",
             "Content-Type": "application/json",
         }
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send an authenticated Admin API request
+
+        The token is refreshed ahead of expiry, and a 401 response triggers
+        one re-authentication and a single retry.
+        """
+        self.ensure_token()
+        token = self.admin_token
+        response = requests.request(method, url, headers=self._get_headers(token), **kwargs)
+
+        if response.status_code == 401:
+            self._reauthenticate(token)
+            response = requests.request(method, url, headers=self._get_headers(), **kwargs)
+
+        return response
+
     def list_users(self, realm: str) -> List[Dict[str, Any]]:
         """
         List all users in a realm
@@ -146,16 +323,60 @@ class KeycloakAdmin:
         Returns:
             List of users
         """
-        url = f"{self.keycloak_url}/admin/realms/{realm}/users"
-        response = requests.get(url, headers=self._get_headers())
+        return list(self.iter_users(realm))
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to list users: {response.text}")
+    def iter_users(
+        self, realm: str, page_size: int = USERS_PAGE_SIZE, prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all users in a realm, one page at a time
 
-        return response.json()
+        Args:
+            realm: Realm name
+            page_size: Users requested per page
+            prefetch: Fetch the next page in the background while the
+                current one is consumed
+
+        Yields:
+            User representations
+        """
+        url = f"{self.keycloak_url}/admin/realms/{realm}/users"
+
+        def fetch(first: int) -> List[Dict[str, Any]]:
+            response = self._request("GET", url, params={"first": first, "max": page_size})
+            if response.status_code != 200:
+                raise Exception(f"Failed to list users: {response.text}")
+            return response.json()
+
+        if not prefetch:
+            first = 0
+            while True:
+                page = fetch(first)
+                yield from page
+                if len(page) < page_size:
+                    return
+                first += page_size
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            first = 0
+            pending = pool.submit(fetch, first)
+            while True:
+                page = pending.result()
+                first += page_size
+                if len(page) == page_size:
+                    pending = pool.submit(fetch, first)
+                yield from page
+                if len(page) < page_size:
+                    return
 
     def create_user(
-        self, realm: str, username: str, password: str, email: Optional[str] = None
+        self,
+        realm: str,
+        username: str,
+        password: str,
+        email: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
     ) -> str:
         """
         Create a new user
@@ -165,64 +386,150 @@ class KeycloakAdmin:
             username: Username
             password: Password
             email: Email (optional)
+            first_name: First name (optional)
+            last_name: Last name (optional)
 
         Returns:
             User ID
         """
         # Create user
         url = f"{self.keycloak_url}/admin/realms/{realm}/users"
-        user_data = {
-            "username": username,
-            "enabled": True,
-            "emailVerified": True,
-            "credentials": [{"type": "password", "value": password, "temporary": False}],
-        }
+        user_data = user_representation(username, password, email, first_name, last_name)
 
-        if email:
-            user_data["email"] = email
+        response = self._request("POST", url, json=user_data)
 
-        response = requests.post(url, headers=self._get_headers(), json=user_data)
+        if response.status_code == 409:
+            raise UserExistsError(f"User '{username}' already exists")
 
         if response.status_code not in [201, 204]:
             raise Exception(f"Failed to create user: {response.text}")
 
-        # Get user ID from location header or fetch user
+        # Get user ID from location header or look the user up
         location = response.headers.get("Location")
         if location:
             user_id = location.split("/")[-1]
+            self._cache_put(("user_id", realm, username), user_id)
         else:
-            # Fetch user by username
-            users = self.list_users(realm)
-            user = next((u for u in users if u["username"] == username), None)
+            user = self.get_user_by_username(realm, username)
             if not user:
                 raise Exception("User created but ID not found")
             user_id = user["id"]
 
         return user_id
 
+    def partial_import(
+        self, realm: str, users: List[Dict[str, Any]], if_exists: str = "SKIP"
+    ) -> Dict[str, Any]:
+        """
+        Import a batch of users in one request via the realm partialImport endpoint
+
+        Args:
+            realm: Realm name
+            users: User representations
+            if_exists: What to do with existing users (SKIP, OVERWRITE or FAIL)
+
+        Returns:
+            Import summary (added/skipped/overwritten counts)
+
+        Raises:
+            PartialImportUnavailable: If the server does not provide the endpoint
+        """
+        url = f"{self.keycloak_url}/admin/realms/{realm}/partialImport"
+        response = self._request("POST", url, json={"ifResourceExists": if_exists, "users": users})
+
+        if response.status_code == 404:
+            # A missing realm 404s as well; only a realm that exists means no endpoint
+            realm_response = self._request("GET", f"{self.keycloak_url}/admin/realms/{realm}")
+            if realm_response.status_code == 404:
+                raise Exception(f"Realm '{realm}' not found")
+
+        if response.status_code in [404, 405, 501]:
+            raise PartialImportUnavailable("partialImport not available")
+
+        if response.status_code != 200:
+            raise Exception(f"Partial import failed: {response.text}")
+
+        return response.json()
+
+    def _cached(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """Return a cached value, loading it if missing or older than the TTL"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        value = loader()
+        if value is not None:
+            self._cache_put(key, value)
+        return value
+
+    def _cache_put(self, key: tuple, value: Any):
+        """Store a value in the metadata cache"""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+
+    def clear_cache(self, realm: Optional[str] = None):
+        """
+        Drop cached realm metadata
+
+        Args:
+            realm: Only drop entries for this realm (default: all)
+        """
+        with self._cache_lock:
+            if realm is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[1] == realm]:
+                    del self._cache[key]
+
     def get_user_by_username(self, realm: str, username: str) -> Optional[Dict[str, Any]]:
         """
         Get user by username
 
         Args:
             realm: Realm name
-            username: Username
+            username: Username (exact match)
 
         Returns:
             User data or None
         """
-        url = f"{self.keycloak_url}/admin/realms/{realm}/users?username={username}"
-        response = requests.get(url, headers=self._get_headers())
+        url = f"{self.keycloak_url}/admin/realms/{realm}/users"
+        response = self._request("GET", url, params={"username": username, "exact": "true"})
 
         if response.status_code != 200:
             raise Exception(f"Failed to get user: {response.text}")
 
         users = response.json()
-        return users[0] if users else None
+        user = next((u for u in users if u["username"] == username.lower()), None)
+        if user:
+            self._cache_put(("user_id", realm, username), user["id"])
+        return user
+
+    def get_user_id(self, realm: str, username: str) -> str:
+        """
+        Get a user's ID, cached per instance
+
+        Args:
+            realm: Realm name
+            username: Username
+
+        Returns:
+            User ID
+        """
+
+        def load():
+            user = self.get_user_by_username(realm, username)
+            return user["id"] if user else None
+
+        user_id = self._cached(("user_id", realm, username), load)
+        if not user_id:
+            raise Exception(f"User '{username}' not found")
+        return user_id
 
     def get_realm_roles(self, realm: str) -> List[Dict[str, Any]]:
         """
-        Get all realm roles
+        Get all realm roles (cached per instance)
 
         Args:
             realm: Realm name
@@ -230,13 +537,33 @@ class KeycloakAdmin:
         Returns:
             List of roles
         """
-        url = f"{self.keycloak_url}/admin/realms/{realm}/roles"
-        response = requests.get(url, headers=self._get_headers())
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to get roles: {response.text}")
+        def load():
+            url = f"{self.keycloak_url}/admin/realms/{realm}/roles"
+            response = self._request("GET", url)
 
-        return response.json()
+            if response.status_code != 200:
+                raise Exception(f"Failed to get roles: {response.text}")
+
+            return response.json()
+
+        return self._cached(("roles", realm), load)
+
+    def _resolve_roles(self, realm: str, role_names: List[str]) -> List[Dict[str, Any]]:
+        """Map role names to role representations"""
+        roles = {r["name"]: r for r in self.get_realm_roles(realm)}
+        missing = [name for name in role_names if name not in roles]
+        if missing:
+            raise Exception(f"Role '{missing[0]}' not found")
+        return [roles[name] for name in role_names]
+
+    def _add_role_mappings(self, realm: str, user_id: str, roles: List[Dict[str, Any]]):
+        """Post realm role mappings for a user in one request"""
+        url = f"{self.keycloak_url}/admin/realms/{realm}/users/{user_id}/role-mappings/realm"
+        response = self._request("POST", url, json=roles)
+
+        if response.status_code not in [204, 200]:
+            raise Exception(f"Failed to assign role: {response.text}")
 
     def assign_role(self, realm: str, username: str, role_name: str):
         """
@@ -247,25 +574,50 @@ class KeycloakAdmin:
             username: Username
             role_name: Role name
         """
-        # Get user
-        user = self.get_user_by_username(realm, username)
-        if not user:
-            raise Exception(f"User '{username}' not found")
-
-        user_id = user["id"]
+        user_id = self.get_user_id(realm, username)
+        self._add_role_mappings(realm, user_id, self._resolve_roles(realm, [role_name]))
+
+    def assign_roles(
+        self,
+        realm: str,
+        assignments: Dict[str, List[str]],
+        concurrency: int = 8,
+    ) -> Dict[str, str]:
+        """
+        Assign realm roles to many users
 
-        # Get role
-        roles = self.get_realm_roles(realm)
-        role = next((r for r in roles if r["name"] == role_name), None)
-        if not role:
-            raise Exception(f"Role '{role_name}' not found")
+        Each user's roles are posted in a single request, and users are
+        processed with bounded concurrency.
 
-        # Assign role
-        url = f"{self.keycloak_url}/admin/realms/{realm}/users/{user_id}/role-mappings/realm"
-        response = requests.post(url, headers=self._get_headers(), json=[role])
+        Args:
+            realm: Realm name
+            assignments: Role names to assign, keyed by username
+            concurrency: Users processed in parallel
 
-        if response.status_code not in [204, 200]:
-            raise Exception(f"Failed to assign role: {response.text}")
+        Returns:
+            Error messages keyed by username for assignments that failed
+        """
+        # Warm the role cache once instead of racing on it from every worker
+        self.get_realm_roles(realm)
+
+        def assign(username: str, role_names: List[str]):
+            roles = self._resolve_roles(realm, role_names)
+            self._add_role_mappings(realm, self.get_user_id(realm, username), roles)
+
+        errors: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            futures = {
+                pool.submit(assign, username, role_names): username
+                for username, role_names in assignments.items()
+                if role_names
+            }
+            for future, username in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[username] = str(e)
+
+        return errors
 
     def get_user_roles(self, realm: str, username: str) -> List[str]:
         """
@@ -278,16 +630,152 @@ class KeycloakAdmin:
         Returns:
             List of role names
         """
-        user = self.get_user_by_username(realm, username)
-        if not user:
-            raise Exception(f"User '{username}' not found")
-
-        user_id = user["id"]
+        user_id = self.get_user_id(realm, username)
         url = f"{self.keycloak_url}/admin/realms/{realm}/users/{user_id}/role-mappings/realm"
-        response = requests.get(url, headers=self._get_headers())
+        response = self._request("GET", url)
 
         if response.status_code != 200:
             raise Exception(f"Failed to get user roles: {response.text}")
 
         roles = response.json()
         return [role["name"] for role in roles]
+
+    def logout_user(self, realm: str, username: str):
+        """
+        Log out all sessions of a user
+
+        Args:
+            realm: Realm name
+            username: Username
+        """
+        user_id = self.get_user_id(realm, username)
+        url = f"{self.keycloak_url}/admin/realms/{realm}/users/{user_id}/logout"
+        response = self._request("POST", url)
+
+        if response.status_code not in [204, 200]:
+            raise Exception(f"Failed to log out user: {response.text}")
+
+    def logout_users(
+        self, realm: str, usernames: List[str], concurrency: int = 8
+    ) -> Dict[str, str]:
+        """
+        Log out all sessions of many users with bounded concurrency
+
+        Args:
+            realm: Realm name
+            usernames: Users to log out
+            concurrency: Users processed in parallel
+
+        Returns:
+            Error messages keyed by username for logouts that failed
+        """
+        errors: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            futures = {pool.submit(self.logout_user, realm, u): u for u in usernames}
+            for future, username in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[username] = str(e)
+
+        return errors
+
+    def get_client_uuid(self, realm: str, client_id: str) -> str:
+        """
+        Get a client's internal ID, cached per instance
+
+        Args:
+            realm: Realm name
+            client_id: Client ID (e.g. kong-client)
+
+        Returns:
+            Client UUID
+        """
+
+        def load():
+            url = f"{self.keycloak_url}/admin/realms/{realm}/clients"
+            response = self._request("GET", url, params={"clientId": client_id})
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to get client: {response.text}")
+
+            clients = response.json()
+            return clients[0]["id"] if clients else None
+
+        client_uuid = self._cached(("client", realm, client_id), load)
+        if not client_uuid:
+            raise Exception(f"Client '{client_id}' not found")
+        return client_uuid
+
+    def iter_client_sessions(
+        self, realm: str, client_id: str, page_size: int = USERS_PAGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the user sessions of a client
+
+        Args:
+            realm: Realm name
+            client_id: Client ID
+            page_size: Sessions requested per page
+
+        Yields:
+            User session representations
+        """
+        client_uuid = self.get_client_uuid(realm, client_id)
+        url = f"{self.keycloak_url}/admin/realms/{realm}/clients/{client_uuid}/user-sessions"
+        first = 0
+
+        while True:
+            response = self._request("GET", url, params={"first": first, "max": page_size})
+            if response.status_code != 200:
+                raise Exception(f"Failed to list sessions: {response.text}")
+
+            page = response.json()
+            yield from page
+            if len(page) < page_size:
+                return
+            first += page_size
+
+    def delete_session(self, realm: str, session_id: str):
+        """
+        Delete (log out) a single user session
+
+        Args:
+            realm: Realm name
+            session_id: Session ID
+        """
+        url = f"{self.keycloak_url}/admin/realms/{realm}/sessions/{session_id}"
+        response = self._request("DELETE", url)
+
+        if response.status_code not in [204, 200, 404]:
+            raise Exception(f"Failed to delete session: {response.text}")
+
+    def logout_client_sessions(
+        self, realm: str, client_id: str, concurrency: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Delete every user session of a client with bounded concurrency
+
+        Session IDs are collected first, since deleting while paging would
+        shift the pages.
+
+        Args:
+            realm: Realm name
+            client_id: Client ID
+            concurrency: Sessions deleted in parallel
+
+        Returns:
+            Number of sessions deleted and error messages keyed by session ID
+        """
+        session_ids = [s["id"] for s in self.iter_client_sessions(realm, client_id)]
+
+        errors: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            futures = {pool.submit(self.delete_session, realm, s): s for s in session_ids}
+            for future, session_id in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[session_id] = str(e)
+
+        return {"deleted": len(session_ids) - len(errors), "errors": errors}
@@ -0,0 +1,287 @@
+"""Periodic scrape of Kong admin APIs: /status, Prometheus /metrics and upstream health"""
+
+import json
+import math
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .soak import parse_size
+from .topology import run_matrix
+
+# Kong latency histograms (prometheus plugin) whose percentiles are derived per poll
+LATENCY_HISTOGRAMS = ("kong_request_latency_ms", "kong_kong_latency_ms", "kong_upstream_latency_ms")
+
+# Labels that split a metric into series of their own in the totals (summing
+# connection states or shared dicts together would be meaningless)
+KEPT_LABELS = ("state", "shared_dict")
+
+_SAMPLE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)")
+_LABEL = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """
+    Parse the Prometheus text exposition format
+
+    Args:
+        text: /metrics response body
+
+    Returns:
+        (metric name, labels, value) per sample; comments and malformed
+        lines are skipped
+    """
+    samples = []
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match or line.startswith("#"):
+            continue
+        try:
+            value = float(match.group(3))
+        except ValueError:
+            continue
+        samples.append((match.group(1), dict(_LABEL.findall(match.group(2) or "")), value))
+    return samples
+
+
+def scrape_status(admin_url: str, timeout: float = 5) -> Dict[str, Any]:
+    """
+    Read Kong's admin /status
+
+    Args:
+        admin_url: Kong admin API URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        Connection counters, total requests, per-dict shared memory
+        (allocated/capacity bytes), Lua VM memory and database reachability
+    """
+    response = requests.get(f"{admin_url}/status", timeout=timeout)
+    response.raise_for_status()
+    status = response.json()
+    server = status.get("server", {})
+    memory = status.get("memory", {})
+
+    return {
+        "connections": {
+            key[len("connections_") :]: value
+            for key, value in server.items()
+            if key.startswith("connections_")
+        },
+        "total_requests": server.get("total_requests", 0),
+        "shared_dicts": {
+            name: {
+                "allocated": parse_size(str(d.get("allocated_slabs", "0"))),
+                "capacity": parse_size(str(d.get("capacity", "0"))),
+            }
+            for name, d in memory.get("lua_shared_dicts", {}).items()
+        },
+        "lua_vm_bytes": sum(
+            parse_size(str(vm.get("http_allocated_gc", "0")))
+            for vm in memory.get("workers_lua_vms", [])
+        ),
+        "database_reachable": status.get("database", {}).get("reachable"),
+    }
+
+
+def scrape_metrics(admin_url: str, timeout: float = 5) -> Optional[Dict[str, Any]]:
+    """
+    Read the prometheus plugin's /metrics
+
+    Args:
+        admin_url: Kong admin API URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        None if the plugin is off (404); otherwise each metric summed over
+        all labels but KEPT_LABELS (keyed like `name{state="active"}`), and
+        the cumulative buckets of LATENCY_HISTOGRAMS summed over services
+        and routes ({le: count})
+    """
+    response = requests.get(f"{admin_url}/metrics", timeout=timeout)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    totals: Dict[str, float] = {}
+    histograms: Dict[str, Dict[str, float]] = {}
+    for name, labels, value in parse_prometheus(response.text):
+        if name.endswith("_bucket"):
+            family = name[: -len("_bucket")]
+            if family in LATENCY_HISTOGRAMS and "le" in labels:
+                buckets = histograms.setdefault(family, {})
+                buckets[labels["le"]] = buckets.get(labels["le"], 0.0) + value
+            continue
+        if not math.isnan(value):
+            kept = ",".join(f'{key}="{labels[key]}"' for key in KEPT_LABELS if key in labels)
+            series = f"{name}{{{kept}}}" if kept else name
+            totals[series] = totals.get(series, 0.0) + value
+
+    return {"totals": totals, "histograms": histograms}
+
+
+def scrape_upstreams(admin_url: str, timeout: float = 5) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the health of every upstream's targets
+
+    Args:
+        admin_url: Kong admin API URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        Upstream name -> counts per health state and the state per target
+        (empty when services point straight at a URL)
+    """
+    response = requests.get(f"{admin_url}/upstreams", timeout=timeout)
+    response.raise_for_status()
+
+    upstreams = {}
+    for upstream in response.json().get("data", []):
+        health = requests.get(f"{admin_url}/upstreams/{upstream['name']}/health", timeout=timeout)
+        health.raise_for_status()
+        targets = {t["target"]: t.get("health", "UNKNOWN") for t in health.json().get("data", [])}
+        states: Dict[str, int] = {}
+        for state in targets.values():
+            states[state] = states.get(state, 0) + 1
+        upstreams[upstream["name"]] = {"states": states, "targets": targets}
+    return upstreams
+
+
+def scrape(admin_url: str, timeout: float = 5) -> Dict[str, Any]:
+    """
+    Scrape one Kong instance
+
+    Each source is read on its own, so a disabled plugin or a failing
+    endpoint only blanks its part of the sample.
+
+    Args:
+        admin_url: Kong admin API URL
+        timeout: Request timeout per call in seconds
+
+    Returns:
+        Wall-clock time, status, metrics and upstreams (None if unavailable)
+        and the error per source that failed
+    """
+    sample: Dict[str, Any] = {"time": time.time(), "errors": {}}
+    for key, read in (
+        ("status", scrape_status),
+        ("metrics", scrape_metrics),
+        ("upstreams", scrape_upstreams),
+    ):
+        try:
+            sample[key] = read(admin_url, timeout)
+        except Exception as e:
+            sample[key] = None
+            sample["errors"][key] = str(e)
+    return sample
+
+
+def _bucket_percentile(buckets: Dict[str, float], p: float) -> Optional[float]:
+    """Upper bound (ms) of the cumulative bucket holding the percentile (None past the last)"""
+    bounds = sorted((float(le), count) for le, count in buckets.items())
+    if not bounds or bounds[-1][1] <= 0:
+        return None
+    rank = p / 100 * bounds[-1][1]
+    for upper, count in bounds:
+        if count >= rank:
+            return upper if math.isfinite(upper) else None
+    return None
+
+
+def rates(previous: Optional[Dict[str, Any]], sample: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-second rates and latency percentiles between two samples of an instance
+
+    Args:
+        previous: Earlier sample (None for the first poll)
+        sample: Current sample
+
+    Returns:
+        Requests per second from /status, and p50/p95/p99 (ms upper bucket
+        bounds) of each Kong latency histogram over the interval
+    """
+    if not previous:
+        return {}
+    elapsed = sample["time"] - previous["time"]
+    result: Dict[str, Any] = {}
+
+    if sample["status"] and previous["status"] and elapsed > 0:
+        served = sample["status"]["total_requests"] - previous["status"]["total_requests"]
+        result["requests_per_second"] = max(served, 0) / elapsed
+
+    if sample["metrics"] and previous["metrics"]:
+        for name, buckets in sample["metrics"]["histograms"].items():
+            before = previous["metrics"]["histograms"].get(name, {})
+            interval = {le: count - before.get(le, 0.0) for le, count in buckets.items()}
+            if any(count < 0 for count in interval.values()):
+                continue  # counters reset (Kong reloaded)
+            percentiles = {f"p{q}": _bucket_percentile(interval, q) for q in (50, 95, 99)}
+            if percentiles["p50"] is not None:
+                result[name] = percentiles
+    return result
+
+
+def poll(
+    gateways: List[Dict[str, Any]],
+    interval: float = 5.0,
+    duration: Optional[float] = None,
+    output: Optional[str] = None,
+    on_poll: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None,
+    stop: Optional[threading.Event] = None,
+    timeout: float = 5,
+) -> int:
+    """
+    Scrape every gateway's admin API in parallel at a fixed interval
+
+    Polls are scheduled from the start time, so a slow scrape does not
+    push later ones back; a poll that overruns the interval skips the
+    ticks it missed.
+
+    Args:
+        gateways: Gateways with a name and admin_url (see topology.load_topology)
+        interval: Seconds between polls
+        duration: Stop after this many seconds (None: until `stop` is set)
+        output: NDJSON file getting one row per gateway per poll
+        on_poll: Called after each poll with the rows per gateway name
+        stop: Event that ends polling
+        timeout: Request timeout per call in seconds
+
+    Returns:
+        Number of polls
+    """
+    stop = stop or threading.Event()
+    previous: Dict[str, Dict[str, Any]] = {}
+    start = time.time()
+    polls = 0
+    sink = open(output, "w") if output else None
+
+    try:
+        while not stop.is_set():
+            t = time.time() - start
+            samples = run_matrix(gateways, lambda g: scrape(g["admin_url"], timeout))
+            rows = {}
+            for name, sample in samples.items():
+                rows[name] = {"t": t, "gateway": name, **sample}
+                rows[name]["rates"] = rates(previous.get(name), sample)
+                previous[name] = sample
+
+            if sink:
+                for row in rows.values():
+                    sink.write(json.dumps(row) + "\n")
+                sink.flush()
+            polls += 1
+            if on_poll:
+                on_poll(rows)
+
+            next_tick = (math.floor((time.time() - start) / interval) + 1) * interval
+            if duration is not None and next_tick > duration:
+                break
+            stop.wait(next_tick - (time.time() - start))
+    finally:
+        if sink:
+            sink.close()
+
+    return polls
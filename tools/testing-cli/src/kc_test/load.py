@@ -0,0 +1,300 @@
+"""Closed-loop load generation against Kong endpoints"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from .result_store import ResultStore
+
+# Token provider: virtual user index -> access token (or None for anonymous)
+TokenProvider = Callable[[int], Optional[str]]
+
+# Sample recorder: (virtual user, start offset, latency, status code, token used)
+SampleRecorder = Callable[[int, float, float, int, Optional[str]], None]
+
+# Protocol modes: HTTP/1.1 keep-alive, HTTP/1.1 with a new connection per
+# request, and HTTP/2 with every virtual user multiplexed over one client
+PROTOCOLS = ("http1", "http1-close", "http2")
+
+
+def summarize(samples: List[Tuple[float, float, int]], elapsed: float) -> Dict[str, Any]:
+    """
+    Aggregate raw samples
+
+    Args:
+        samples: (start offset, latency, status code) tuples; status 0 is a transport error
+        elapsed: Wall-clock duration of the run
+
+    Returns:
+        Request counts, throughput, latency percentiles and status breakdown
+    """
+    store = ResultStore()
+    for offset, latency, status in samples:
+        store.append("", 0 < status < 400, latency, offset, status)
+    return store.latency_summary(elapsed)
+
+
+def _require_http2():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        raise Exception("HTTP/2 needs the h2 package (install the http2 extra or pip install h2)")
+
+
+def http_clients(protocol: str, virtual_users: int, verify: bool = True) -> List[Any]:
+    """
+    httpx clients per virtual user for a protocol mode
+
+    Args:
+        protocol: One of PROTOCOLS
+        virtual_users: Number of virtual users
+        verify: Verify TLS certificates
+
+    Returns:
+        One client per virtual user; in http2 mode every virtual user shares
+        one client, so requests multiplex over its connection
+    """
+    if protocol == "http1":
+        return [
+            httpx.Client(verify=verify, limits=httpx.Limits(max_connections=1))
+            for _ in range(virtual_users)
+        ]
+    if protocol == "http1-close":
+        return [
+            httpx.Client(
+                verify=verify,
+                headers={"Connection": "close"},
+                limits=httpx.Limits(max_keepalive_connections=0),
+            )
+            for _ in range(virtual_users)
+        ]
+    if protocol == "http2":
+        _require_http2()
+        return [httpx.Client(http2=True, verify=verify)] * virtual_users
+    raise ValueError(f"Unsupported protocol: {protocol}")
+
+
+def drive_virtual_users(
+    url: str,
+    method: str,
+    virtual_users: int,
+    duration: float,
+    token_provider: Optional[TokenProvider],
+    record: SampleRecorder,
+    timeout: float = 10.0,
+    stop: Optional[threading.Event] = None,
+    clients: Optional[List[Any]] = None,
+    connection_stats: Optional[Dict[str, Any]] = None,
+) -> float:
+    """
+    Run closed-loop virtual users until the duration ends or `stop` is set
+
+    Each virtual user runs its own keep-alive session and sends the next
+    request as soon as the previous one completes.
+
+    Args:
+        url: Target URL
+        method: HTTP method
+        virtual_users: Number of concurrent virtual users
+        duration: Run time in seconds
+        token_provider: Supplies each virtual user's access token per request
+        record: Called once per request with the sample
+        timeout: Per-request timeout in seconds
+        stop: Event that ends the run early
+        clients: httpx client per virtual user (see http_clients) instead of
+            a requests session each
+        connection_stats: Filled with connections opened and responses per
+            HTTP version (httpx clients only)
+
+    Returns:
+        Elapsed wall-clock time in seconds
+    """
+    stop = stop or threading.Event()
+    lock = threading.Lock()
+    start = time.monotonic()
+    deadline = start + duration
+    if connection_stats is not None:
+        connection_stats.update(connections=0, http_versions={})
+
+    def virtual_user(index: int):
+        session = requests.Session() if clients is None else None
+        opened = 0
+        versions: Dict[str, int] = {}
+
+        def trace(name: str, info: Dict[str, Any]):
+            nonlocal opened
+            if name == "connection.connect_tcp.complete":
+                opened += 1
+
+        while time.monotonic() < deadline and not stop.is_set():
+            headers = {}
+            token = None
+            sent = time.monotonic()
+            try:
+                token = token_provider(index) if token_provider else None
+                if token:
+                    headers["Authorization"] = f"Bearer {token}"
+                if session is not None:
+                    status = session.request(
+                        method, url, headers=headers, timeout=timeout
+                    ).status_code
+                else:
+                    response = clients[index].request(
+                        method, url, headers=headers, timeout=timeout, extensions={"trace": trace}
+                    )
+                    versions[response.http_version] = versions.get(response.http_version, 0) + 1
+                    status = response.status_code
+            except Exception:
+                status = 0
+            record(index, sent - start, time.monotonic() - sent, status, token)
+
+        if session is not None:
+            session.close()
+        if connection_stats is not None:
+            with lock:
+                connection_stats["connections"] += opened
+                for version, count in versions.items():
+                    totals = connection_stats["http_versions"]
+                    totals[version] = totals.get(version, 0) + count
+
+    threads = [threading.Thread(target=virtual_user, args=(i,)) for i in range(virtual_users)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return time.monotonic() - start
+
+
+def run_load(
+    kong_url: str,
+    endpoint: str,
+    virtual_users: int = 10,
+    duration: float = 30.0,
+    token_provider: Optional[TokenProvider] = None,
+    method: str = "GET",
+    timeout: float = 10.0,
+    protocol: Optional[str] = None,
+    verify: bool = True,
+) -> Dict[str, Any]:
+    """
+    Drive an endpoint with concurrent virtual users for a fixed duration
+
+    Args:
+        kong_url: Kong gateway URL
+        endpoint: API endpoint path
+        virtual_users: Number of concurrent virtual users
+        duration: Run time in seconds
+        token_provider: Supplies each virtual user's access token per request
+        method: HTTP method
+        timeout: Per-request timeout in seconds
+        protocol: Send with httpx in this mode (see PROTOCOLS) instead of a
+            requests keep-alive session per virtual user
+        verify: Verify TLS certificates (protocol modes only)
+
+    Returns:
+        Run configuration and summary statistics; protocol modes add the
+        connections opened and responses per HTTP version
+    """
+    url = f"{kong_url}/{endpoint.lstrip('/')}"
+    name = f"{method} {endpoint}"
+
+    # One store per virtual user, so recording needs no lock
+    per_user = [ResultStore() for _ in range(virtual_users)]
+
+    def record(index, offset, latency, status, token):
+        per_user[index].append(name, 0 < status < 400, latency, offset, status)
+
+    clients = http_clients(protocol, virtual_users, verify) if protocol else None
+    connection_stats: Dict[str, Any] = {}
+    try:
+        elapsed = drive_virtual_users(
+            url,
+            method,
+            virtual_users,
+            duration,
+            token_provider,
+            record,
+            timeout,
+            clients=clients,
+            connection_stats=connection_stats if clients else None,
+        )
+    finally:
+        for client in {id(c): c for c in clients or []}.values():
+            client.close()
+
+    samples = ResultStore()
+    for store in per_user:
+        samples.extend(store)
+
+    return {
+        "url": url,
+        "method": method,
+        "virtual_users": virtual_users,
+        "duration": elapsed,
+        **({"protocol": protocol, **connection_stats} if protocol else {}),
+        **samples.latency_summary(elapsed),
+    }
+
+
+def compare_protocols(
+    kong_url: str,
+    endpoint: str,
+    virtual_users: int = 10,
+    duration: float = 30.0,
+    token_provider: Optional[TokenProvider] = None,
+    method: str = "GET",
+    protocols: Tuple[str, ...] = PROTOCOLS,
+    verify: bool = True,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the same load once per protocol mode, one after the other
+
+    Args:
+        kong_url: Kong gateway URL (https for HTTP/2 via ALPN)
+        endpoint: API endpoint path
+        virtual_users: Number of concurrent virtual users
+        duration: Run time per protocol in seconds
+        token_provider: Supplies each virtual user's access token per request
+        method: HTTP method
+        protocols: Modes to run
+        verify: Verify TLS certificates
+        on_result: Called with each protocol's results as it finishes
+
+    Returns:
+        Run configuration and the run_load results per protocol
+    """
+    if "http2" in protocols:
+        _require_http2()
+
+    results = {}
+    for protocol in protocols:
+        results[protocol] = run_load(
+            kong_url,
+            endpoint,
+            virtual_users,
+            duration,
+            token_provider,
+            method,
+            protocol=protocol,
+            verify=verify,
+        )
+        if on_result:
+            on_result(protocol, results[protocol])
+
+    return {
+        "url": f"{kong_url}/{endpoint.lstrip('/')}",
+        "method": method,
+        "virtual_users": virtual_users,
+        "duration": duration,
+        "protocols": results,
+    }
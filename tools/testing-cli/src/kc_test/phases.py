@@ -0,0 +1,171 @@
+"""Per-request latency phases from httpx trace events and Kong's latency headers"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .result_store import percentile
+
+# Phase -> (start event, end event); http11/http2 prefixes are matched by suffix
+_PHASE_EVENTS = {
+    "connect": ("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+    "tls": ("connection.start_tls.started", "connection.start_tls.complete"),
+    "send": ("send_request_headers.started", "send_request_body.complete"),
+    "wait": ("send_request_body.complete", "receive_response_headers.complete"),
+    "body": ("receive_response_body.started", "receive_response_body.complete"),
+}
+
+# Components a request's time is attributed to
+COMPONENTS = ("client", "network", "kong", "backend", "unattributed")
+
+
+def _header_seconds(response: httpx.Response, name: str) -> Optional[float]:
+    value = response.headers.get(name)
+    try:
+        return int(value) / 1000 if value is not None else None
+    except ValueError:
+        return None
+
+
+def attribute(phases: Dict[str, float], total: float, response: httpx.Response) -> Dict[str, Any]:
+    """
+    Split a request's time between client, network, Kong and backend
+
+    Kong reports the time it spent running plugins before proxying
+    (X-Kong-Proxy-Latency) and the time the upstream took to answer,
+    including the Kong-to-backend hop (X-Kong-Upstream-Latency). Responses
+    Kong produces itself, such as a JWT plugin 401, carry
+    X-Kong-Response-Latency instead. The rest of the server wait is network.
+
+    Args:
+        phases: Phase durations in seconds (connect, tls, send, wait, body)
+        total: Wall-clock duration of the request
+        response: Response carrying Kong's latency headers
+
+    Returns:
+        Seconds per component; without Kong headers the server wait stays
+        unattributed
+    """
+    kong = _header_seconds(response, "X-Kong-Proxy-Latency")
+    if kong is None:
+        kong = _header_seconds(response, "X-Kong-Response-Latency")
+    backend = _header_seconds(response, "X-Kong-Upstream-Latency")
+
+    traced = sum(phases.values())
+    transfer = sum(phases.get(p, 0.0) for p in ("connect", "tls", "send", "body"))
+    wait = phases.get("wait", 0.0)
+
+    if kong is None:
+        server, unattributed = 0.0, wait
+    else:
+        # Headers have millisecond resolution; never attribute more than the wait
+        server = min(kong + (backend or 0.0), wait)
+        unattributed = 0.0
+
+    return {
+        "client": max(total - traced, 0.0),
+        "network": transfer + (wait - server if kong is not None else 0.0),
+        "kong": min(kong, wait) if kong is not None else None,
+        "backend": max(server - kong, 0.0) if kong is not None and backend is not None else None,
+        "unattributed": unattributed,
+    }
+
+
+def traced_request(
+    client: httpx.Client,
+    method: str,
+    url: str,
+    **kwargs: Any,
+) -> Tuple[httpx.Response, Dict[str, Any]]:
+    """
+    Send a request and time its phases
+
+    Connect and TLS only appear when the request opened a new connection;
+    on a reused keep-alive connection they are zero.
+
+    Args:
+        client: httpx client (its pool decides whether a connection is reused)
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to client.request (headers, json, timeout, ...)
+
+    Returns:
+        Response and the breakdown: total, per-phase seconds, per-component
+        attribution, Kong's raw latency headers and the HTTP version
+    """
+    events: Dict[str, float] = {}
+
+    def trace(name: str, info: Dict[str, Any]):
+        events.setdefault(
+            name.split(".", 1)[1] if name.startswith("http") else name, time.perf_counter()
+        )
+
+    start = time.perf_counter()
+    response = client.request(method, url, extensions={"trace": trace}, **kwargs)
+    total = time.perf_counter() - start
+
+    phases = {
+        phase: max(events[end] - events[begin], 0.0)
+        for phase, (begin, end) in _PHASE_EVENTS.items()
+        if begin in events and end in events
+    }
+
+    return response, {
+        "total": total,
+        "phases": phases,
+        "attribution": attribute(phases, total, response),
+        "kong_headers": {
+            name: response.headers[name]
+            for name in (
+                "X-Kong-Proxy-Latency",
+                "X-Kong-Upstream-Latency",
+                "X-Kong-Response-Latency",
+            )
+            if name in response.headers
+        },
+        "http_version": response.http_version,
+    }
+
+
+def summarize_breakdowns(breakdowns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the breakdowns of many requests
+
+    Args:
+        breakdowns: traced_request() breakdowns
+
+    Returns:
+        Mean and p95 per phase and per component, and each component's
+        share of the mean total
+    """
+    totals = sorted(b["total"] for b in breakdowns)
+    mean_total = sum(totals) / len(totals) if totals else 0.0
+
+    def stats(values: List[float]) -> Dict[str, float]:
+        values = sorted(values)
+        return {
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p95": percentile(values, 95),
+        }
+
+    phases = {
+        phase: stats([b["phases"].get(phase, 0.0) for b in breakdowns]) for phase in _PHASE_EVENTS
+    }
+    components = {}
+    for component in COMPONENTS:
+        values = [b["attribution"][component] for b in breakdowns]
+        known = [v for v in values if v is not None]
+        if not known:
+            continue
+        components[component] = {
+            **stats(known),
+            "share": (sum(known) / len(values)) / mean_total if mean_total else 0.0,
+        }
+
+    return {
+        "requests": len(breakdowns),
+        "total": stats(totals),
+        "phases": phases,
+        "components": components,
+    }
@@ -0,0 +1,214 @@
+"""Bulk user provisioning from CSV/JSONL files"""
+
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .keycloak_client import (
+    KeycloakAdmin,
+    PartialImportUnavailable,
+    UserExistsError,
+    user_representation,
+)
+
+# Recognised input columns / keys
+USER_FIELDS = ("username", "password", "email", "firstName", "lastName")
+
+
+def read_users(path: str, default_password: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream user rows from a CSV or JSONL file
+
+    CSV files need a header row; JSONL files hold one JSON object per line.
+    Both use the keys username, password, email, firstName and lastName.
+
+    Args:
+        path: Input file (.csv, .jsonl or .ndjson)
+        default_password: Password for rows that do not provide one
+
+    Yields:
+        User rows
+    """
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row in rows:
+            user = {key: row.get(key) for key in USER_FIELDS if row.get(key)}
+            if "username" not in user:
+                raise ValueError(f"Row without username in {path}: {row}")
+            user.setdefault("password", default_password)
+            if not user["password"]:
+                raise ValueError(f"No password for user '{user['username']}'")
+            yield user
+
+
+def load_checkpoint(checkpoint_file: str, source: str) -> Dict[str, Any]:
+    """
+    Load provisioning progress for a source file
+
+    Args:
+        checkpoint_file: Checkpoint path
+        source: Input file the checkpoint must belong to
+
+    Returns:
+        Progress counters (rows already handled and their outcomes)
+    """
+    progress = {"source": source, "completed": 0, "created": 0, "skipped": 0, "failed": 0}
+
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, "r") as f:
+            saved = json.load(f)
+        if saved.get("source") == source:
+            progress.update(saved)
+
+    return progress
+
+
+def save_checkpoint(checkpoint_file: str, progress: Dict[str, Any]):
+    """Atomically persist provisioning progress"""
+    tmp_file = f"{checkpoint_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_file, checkpoint_file)
+
+
+def import_batch(admin: KeycloakAdmin, realm: str, users: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Submit a batch through partialImport (raises PartialImportUnavailable without it)"""
+    summary = admin.partial_import(
+        realm,
+        [
+            user_representation(
+                u["username"], u["password"], u.get("email"), u.get("firstName"), u.get("lastName")
+            )
+            for u in users
+        ],
+    )
+    added = summary.get("added", 0)
+    skipped = summary.get("skipped", 0) + summary.get("overwritten", 0)
+    return {"created": added, "skipped": skipped, "failed": len(users) - added - skipped}
+
+
+def create_batch(admin: KeycloakAdmin, realm: str, users: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Create a batch one user at a time"""
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+
+    for u in users:
+        try:
+            admin.create_user(
+                realm,
+                u["username"],
+                u["password"],
+                u.get("email"),
+                u.get("firstName"),
+                u.get("lastName"),
+            )
+            counts["created"] += 1
+        except UserExistsError:
+            counts["skipped"] += 1
+        except Exception:
+            counts["failed"] += 1
+
+    return counts
+
+
+def bulk_create_users(
+    admin: KeycloakAdmin,
+    realm: str,
+    source: str,
+    batch_size: int = 500,
+    concurrency: int = 4,
+    mode: str = "auto",
+    default_password: Optional[str] = None,
+    checkpoint_file: Optional[str] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Provision users from a file in concurrent batches
+
+    Rows already recorded in the checkpoint are skipped, so an interrupted run
+    can be restarted with the same arguments. The checkpoint only advances over
+    batches that have completed in order.
+
+    Args:
+        admin: Keycloak admin client
+        realm: Target realm
+        source: CSV/JSONL input file
+        batch_size: Users per batch
+        concurrency: Batches in flight (one request each with partialImport,
+            one create at a time per batch otherwise)
+        mode: auto (partialImport, falling back to creates), partial-import or create
+        default_password: Password for rows that do not provide one
+        checkpoint_file: Progress file (default: <source>.checkpoint.json)
+        on_progress: Called with the progress counters after each batch
+
+    Returns:
+        Progress counters plus elapsed time and throughput for this run
+    """
+    checkpoint_file = checkpoint_file or f"{source}.checkpoint.json"
+    progress = load_checkpoint(checkpoint_file, source)
+    resumed_from = progress["completed"]
+
+    use_import = mode in ["auto", "partial-import"]
+    rows = itertools.islice(read_users(source, default_password), resumed_from, None)
+    batches = enumerate(itertools.batched(rows, batch_size))
+
+    def run_batch(users):
+        nonlocal use_import
+        if use_import:
+            try:
+                return import_batch(admin, realm, users)
+            except PartialImportUnavailable:
+                if mode == "partial-import":
+                    raise
+                use_import = False
+        return create_batch(admin, realm, users)
+
+    start = time.time()
+    running: Dict[Future, Tuple[int, int]] = {}
+    finished: Dict[int, Tuple[int, Dict[str, int]]] = {}
+    next_to_commit = 0
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        while True:
+            # Keep `concurrency` batches in flight
+            for index, users in itertools.islice(batches, max(concurrency - len(running), 0)):
+                running[pool.submit(run_batch, list(users))] = (index, len(users))
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, size = running.pop(future)
+                finished[index] = (size, future.result())
+
+            # Advance the checkpoint over the contiguous prefix of finished batches
+            while next_to_commit in finished:
+                size, counts = finished.pop(next_to_commit)
+                progress["completed"] += size
+                for key, value in counts.items():
+                    progress[key] += value
+                next_to_commit += 1
+
+            save_checkpoint(checkpoint_file, progress)
+            if on_progress:
+                on_progress(progress)
+
+    elapsed = time.time() - start
+    processed = progress["completed"] - resumed_from
+
+    return {
+        **progress,
+        "resumed_from": resumed_from,
+        "processed": processed,
+        "elapsed": elapsed,
+        "throughput": processed / elapsed if elapsed > 0 else 0.0,
+        "mode": "partial-import" if use_import else "create",
+    }
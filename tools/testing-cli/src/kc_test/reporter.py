@@ -1,14 +1,44 @@
 """Test result reporting"""
 
+import html
+import io
 import json
 from datetime import datetime
 from rich.console import Console
 from rich.table import Table
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, TextIO, Tuple
+
+from .charts import data_uri, format_ms, histogram_svg, line_chart_svg, status_svg
+from .histogram import LatencyHistogram
 
 
 console = Console()
 
+# Tests listed individually in HTML reports; later ones are aggregated by name
+HTML_MAX_ROWS = 5000
+
+# Rows per page of the HTML test table
+HTML_PAGE_SIZE = 500
+
+# Failed tests repeated in the Markdown failures section
+MARKDOWN_MAX_FAILURES = 1000
+
+# Load/soak fields carried into reports alongside the test summary
+LATENCY_FIELDS = (
+    "phases",
+    "url",
+    "method",
+    "virtual_users",
+    "requests",
+    "errors",
+    "throughput",
+    "latency",
+    "status_codes",
+    "histogram",
+    "timeline",
+    "series",
+)
+
 
 def print_test_results(results: List[Dict[str, Any]]):
     """Print test results in table format"""
@@ -32,18 +62,454 @@ def print_test_results(results: List[Dict[str, Any]]):
     console.print(table)
 
 
-def print_summary(passed: int, failed: int, total: int):
+def print_summary(
+    passed: int,
+    failed: int,
+    total: int,
+    critical_path: Optional[List[str]] = None,
+    critical_path_duration: Optional[float] = None,
+):
     """Print test summary"""
     console.print("\n[bold]Test Summary[/bold]")
     console.print(f"[green]Passed:[/green] {passed}/{total}")
     console.print(f"[red]Failed:[/red] {failed}/{total}")
 
+    if critical_path:
+        console.print(
+            f"[blue]Critical path:[/blue] {' → '.join(critical_path)} "
+            f"({critical_path_duration:.2f}s)"
+        )
+
     if failed == 0:
         console.print("\n[green]✓ All tests passed![/green]")
     else:
         console.print(f"\n[red]✗ {failed} test(s) failed[/red]")
 
 
+# Columns of a latency breakdown: phases, then the components time is attributed to
+_BREAKDOWN_COLUMNS = (
+    ("Connect", "phases", "connect"),
+    ("TLS", "phases", "tls"),
+    ("Send", "phases", "send"),
+    ("Wait", "phases", "wait"),
+    ("Body", "phases", "body"),
+    ("Client", "attribution", "client"),
+    ("Network", "attribution", "network"),
+    ("Kong", "attribution", "kong"),
+    ("Backend", "attribution", "backend"),
+)
+
+
+def _breakdown_cells(breakdown: Dict[str, Any]) -> List[str]:
+    """Total and per-column durations of one request's latency breakdown"""
+    cells = [format_ms(breakdown["total"])]
+    for _, group, key in _BREAKDOWN_COLUMNS:
+        value = breakdown[group].get(key)
+        cells.append(format_ms(value) if value is not None else "-")
+    return cells
+
+
+def print_phase_breakdown(breakdowns: Dict[str, Dict[str, Any]]):
+    """Print where each request's time went"""
+    table = Table(title="Latency breakdown")
+    table.add_column("Request", style="cyan")
+    table.add_column("Total", style="yellow")
+    for title, group, _ in _BREAKDOWN_COLUMNS:
+        table.add_column(title, style="blue" if group == "phases" else "green")
+
+    for name, breakdown in breakdowns.items():
+        table.add_row(name, *_breakdown_cells(breakdown))
+
+    console.print(table)
+
+
+def print_phase_summary(summary: Dict[str, Any]):
+    """Print the aggregated latency breakdown of repeated requests"""
+    table = Table(title=f"Latency breakdown over {summary['requests']} requests")
+    table.add_column("Component", style="cyan")
+    table.add_column("Mean", style="yellow")
+    table.add_column("p95", style="yellow")
+    table.add_column("Share", style="green")
+
+    for name, stats in summary["components"].items():
+        table.add_row(
+            name, format_ms(stats["mean"]), format_ms(stats["p95"]), f"{stats['share']:.0%}"
+        )
+    table.add_row(
+        "total", format_ms(summary["total"]["mean"]), format_ms(summary["total"]["p95"]), "100%"
+    )
+
+    console.print(table)
+
+
+def print_load_summary(results: Dict[str, Any]):
+    """Print load run summary"""
+    table = Table(title=f"Load: {results['method']} {results['url']}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="yellow")
+
+    latency = results["latency"]
+    table.add_row("Virtual users", str(results["virtual_users"]))
+    table.add_row("Duration", f"{results['duration']:.1f}s")
+    table.add_row("Requests", str(results["requests"]))
+    table.add_row("Errors", str(results["errors"]))
+    table.add_row("Throughput", f"{results['throughput']:.1f} req/s")
+    for key in ["mean", "p50", "p90", "p95", "p99", "max"]:
+        table.add_row(f"Latency {key}", f"{latency[key] * 1000:.1f}ms")
+    table.add_row(
+        "Status codes",
+        ", ".join(f"{status}: {count}" for status, count in results["status_codes"].items()),
+    )
+    if results.get("protocol"):
+        table.add_row("Protocol", results["protocol"])
+        table.add_row("Connections opened", str(results["connections"]))
+        table.add_row(
+            "HTTP versions",
+            ", ".join(f"{v}: {n}" for v, n in results["http_versions"].items()) or "-",
+        )
+
+    console.print(table)
+
+
+def print_protocol_comparison(results: Dict[str, Any]):
+    """Print protocol mode results side by side"""
+    runs = results["protocols"]
+    table = Table(
+        title=(
+            f"Protocols: {results['method']} {results['url']} "
+            f"({results['virtual_users']} virtual users, {results['duration']:.0f}s each)"
+        )
+    )
+    table.add_column("Metric", style="cyan")
+    for protocol in runs:
+        table.add_column(protocol, style="yellow", justify="right")
+
+    def row(title, cell):
+        table.add_row(title, *(cell(run) for run in runs.values()))
+
+    row("Requests", lambda run: str(run["requests"]))
+    row("Errors", lambda run: str(run["errors"]))
+    row("Throughput", lambda run: f"{run['throughput']:.1f} req/s")
+    for key in ["p50", "p95", "p99", "max"]:
+        row(f"Latency {key}", lambda run, key=key: format_ms(run["latency"][key]))
+    row("Connections opened", lambda run: str(run["connections"]))
+    row(
+        "Requests per connection",
+        lambda run: f"{run['requests'] / run['connections']:.1f}" if run["connections"] else "-",
+    )
+    row(
+        "HTTP versions",
+        lambda run: ", ".join(f"{v}: {n}" for v, n in run["http_versions"].items()) or "-",
+    )
+
+    console.print(table)
+
+
+def print_suite_matrix(results: Dict[str, Any]):
+    """Print comprehensive suite results per gateway and over all gateways"""
+    table = Table(title=f"Suite matrix: {results['environment']}")
+    table.add_column("Gateway", style="cyan")
+    table.add_column("Realm", style="white")
+    table.add_column("Passed", style="green", justify="right")
+    table.add_column("Failed", style="red", justify="right")
+    table.add_column("Duration", style="blue", justify="right")
+    table.add_column("Failures", style="white")
+
+    for name, run in results["gateways"].items():
+        if "error" in run:
+            table.add_row(name, "-", "-", "-", "-", f"[red]{run['error']}[/red]")
+            continue
+        failures = [test["name"] for test in run["tests"] if not test["passed"]]
+        table.add_row(
+            name,
+            run["realm"],
+            f"{run['passed']}/{run['total']}",
+            str(run["failed"]),
+            f"{run['duration']:.2f}s",
+            ", ".join(failures) or "-",
+        )
+
+    aggregate = results["aggregate"]
+    table.add_row(
+        "[bold]All gateways[/bold]",
+        "",
+        f"{aggregate['passed']}/{aggregate['total']}",
+        str(aggregate["failed"]),
+        f"{aggregate['duration']:.2f}s",
+        f"[red]{aggregate['errors']} gateway(s) not run[/red]" if aggregate["errors"] else "",
+    )
+    console.print(table)
+
+
+def print_load_matrix(results: Dict[str, Any]):
+    """Print concurrent load results per gateway side by side, with the aggregate"""
+    runs = results["gateways"]
+    table = Table(
+        title=(
+            f"Load matrix: {results['method']} "
+            f"({results['virtual_users']} virtual users per gateway, {results['duration']:.0f}s)"
+        )
+    )
+    table.add_column("Metric", style="cyan")
+    for name in runs:
+        table.add_column(name, style="yellow", justify="right")
+    table.add_column("All gateways", style="bold", justify="right")
+
+    columns = list(runs.values()) + [results["aggregate"]]
+
+    def row(title, cell):
+        table.add_row(title, *("-" if "error" in run else cell(run) for run in columns))
+
+    row("Requests", lambda run: str(run["requests"]))
+    row("Errors", lambda run: str(run["errors"]))
+    row("Throughput", lambda run: f"{run['throughput']:.1f} req/s")
+    for key in ["p50", "p95", "p99", "max"]:
+        row(f"Latency {key}", lambda run, key=key: format_ms(run["latency"][key]))
+    row(
+        "Status codes",
+        lambda run: ", ".join(f"{status}: {n}" for status, n in run["status_codes"].items()),
+    )
+
+    if any("interference" in run for run in runs.values()):
+
+        def change(run, key):
+            if "interference" not in run:
+                return ""
+            solo, together, delta = _format_change(key, run["interference"]["metrics"][key])
+            return f"{solo} → {together} ({delta})"
+
+        for key in ["p50", "p99", "throughput"]:
+            row(f"{key} vs solo", lambda run, key=key: change(run, key))
+        row(
+            "Slowed down",
+            lambda run: (
+                ""
+                if "interference" not in run
+                else "[red]yes[/red]" if run["interference"]["regressions"] else "no"
+            ),
+        )
+
+    console.print(table)
+    for name, run in runs.items():
+        if "error" in run:
+            console.print(f"[red]✗ {name}:[/red] {run['error']}")
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+def kong_stats_table(rows: Dict[str, Dict[str, Any]]) -> Table:
+    """
+    Dashboard table of the latest Kong admin API poll, one row per gateway
+
+    Args:
+        rows: kong_stats.poll() rows per gateway name
+
+    Returns:
+        Table (for console.print or a live display)
+    """
+    first = next(iter(rows.values()), {})
+    table = Table(title=f"Kong stats (t={first.get('t', 0):.0f}s)")
+    table.add_column("Gateway", style="cyan", no_wrap=True)
+    table.add_column("Conns act/rd/wr/wait", style="yellow", justify="right")
+    table.add_column("Req/s", style="green", justify="right")
+    table.add_column("p95", style="blue", justify="right")
+    table.add_column("Fullest shm", style="magenta")
+    table.add_column("Lua VMs", style="magenta", justify="right")
+    table.add_column("Healthy targets", style="white", justify="right")
+    table.add_column("Failed", style="red")
+
+    for name, row in rows.items():
+        status = row["status"]
+        connections = status["connections"] if status else {}
+        dicts = status["shared_dicts"] if status else {}
+        fill = {shm: d["allocated"] / d["capacity"] for shm, d in dicts.items() if d["capacity"]}
+        fullest = max(fill, key=fill.get, default=None)
+        latency = row["rates"].get("kong_request_latency_ms", {}).get("p95")
+        upstreams = row["upstreams"] or {}
+        targets = sum(sum(u["states"].values()) for u in upstreams.values())
+        healthy = sum(u["states"].get("HEALTHY", 0) for u in upstreams.values())
+
+        table.add_row(
+            name,
+            "/".join(
+                str(connections.get(k, "-")) for k in ("active", "reading", "writing", "waiting")
+            ),
+            (
+                f"{row['rates']['requests_per_second']:.1f}"
+                if "requests_per_second" in row["rates"]
+                else "-"
+            ),
+            f"≤{latency:g}ms" if latency is not None else "-",
+            f"{fullest} {fill[fullest]:.0%}" if fullest else "-",
+            _format_bytes(status["lua_vm_bytes"]) if status else "-",
+            f"{healthy}/{targets}" if targets else "-",
+            ", ".join(row["errors"]) or "",
+        )
+
+    return table
+
+
+def print_bench_summary(results: Dict[str, Any]):
+    """Print token benchmark summary"""
+    table = Table(
+        title=(
+            f"Token endpoint: {results['realm']} "
+            f"({results['start_concurrency']}→{results['peak_concurrency']} workers, "
+            f"{results['duration']:.0f}s)"
+        )
+    )
+    table.add_column("Grant", style="cyan")
+    table.add_column("Issued", style="green")
+    table.add_column("Tokens/s", style="yellow")
+    table.add_column("p50", style="blue")
+    table.add_column("p95", style="blue")
+    table.add_column("p99", style="blue")
+    table.add_column("Max", style="blue")
+    table.add_column("Errors", style="red")
+
+    for grant, summary in results["grants"].items():
+        latency = summary["latency"]
+        table.add_row(
+            grant,
+            str(summary["issued"]),
+            f"{summary['issuance_rate']:.1f}",
+            f"{latency['p50'] * 1000:.0f}ms",
+            f"{latency['p95'] * 1000:.0f}ms",
+            f"{latency['p99'] * 1000:.0f}ms",
+            f"{latency['max'] * 1000:.0f}ms",
+            ", ".join(f"{cls}: {n}" for cls, n in summary["error_classes"].items()) or "-",
+        )
+
+    console.print(table)
+
+    timeline = Table(title="Ramp timeline")
+    timeline.add_column("t", style="cyan")
+    timeline.add_column("Workers", style="yellow")
+    timeline.add_column("Tokens/s", style="green")
+    timeline.add_column("Errors", style="red")
+    for entry in results["timeline"]:
+        timeline.add_row(
+            f"{entry['t']}s",
+            str(entry["concurrency"]),
+            f"{entry['rate']:.1f}",
+            str(entry["errors"]),
+        )
+
+    console.print(timeline)
+
+
+def _format_change(metric: str, values: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Baseline, candidate and change of a comparison metric as display strings"""
+    pair = (values["baseline"], values["candidate"])
+    if metric == "throughput":
+        shown = [f"{v:.1f}/s" if v is not None else "-" for v in pair]
+    else:
+        shown = [format_ms(v) if v is not None else "-" for v in pair]
+    change = values["change"]
+    return shown[0], shown[1], f"{change:+.1%}" if change is not None else "-"
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    """Print run comparison"""
+    for endpoint in comparison["endpoints"]:
+        test = endpoint["test"]
+        table = Table(
+            title=(
+                f"{endpoint['endpoint']} ({endpoint['requests']['baseline']} → "
+                f"{endpoint['requests']['candidate']} requests, p={test['p_value']:.3g})"
+            )
+        )
+        table.add_column("Metric", style="cyan")
+        table.add_column("Baseline", style="blue")
+        table.add_column("Candidate", style="blue")
+        table.add_column("Change", style="yellow")
+        for metric, values in endpoint["metrics"].items():
+            table.add_row(metric, *_format_change(metric, values))
+        console.print(table)
+
+        for regression in endpoint["regressions"]:
+            console.print(f"[red]✗ Regression:[/red] {regression}")
+
+    for side in ("baseline", "candidate"):
+        for name in comparison[f"only_{side}"]:
+            console.print(f"[yellow]⚠ Only in {side}:[/yellow] {name}")
+
+    if comparison["passed"]:
+        console.print("\n[green]✓ No significant regressions[/green]")
+    else:
+        console.print(f"\n[red]✗ {comparison['regressions']} regression(s)[/red]")
+
+
+def write_comparison_markdown(
+    comparison: Dict[str, Any],
+    out: TextIO,
+    baseline: str = "baseline",
+    candidate: str = "candidate",
+):
+    """
+    Stream a run comparison as Markdown (e.g. for a CI job summary or PR comment)
+
+    Args:
+        comparison: Output of compare.compare_runs
+        out: Writable text file
+        baseline: Baseline label
+        candidate: Candidate label
+    """
+    verdict = (
+        "✅ No significant regressions"
+        if comparison["passed"]
+        else f"❌ {comparison['regressions']} regression(s)"
+    )
+    thresholds = ", ".join(
+        f"{metric} {'-' if metric == 'throughput' else '+'}{limit:.0%}"
+        for metric, limit in comparison["thresholds"].items()
+    )
+    test = f"Mann-Whitney, α={comparison['alpha']}, ≥{comparison['min_samples']} samples"
+    out.write(
+        f"""# Kong + Keycloak Performance Comparison
+
+- **Baseline:** {baseline}
+- **Candidate:** {candidate}
+- **Result:** {verdict}
+- **Thresholds:** {thresholds} ({test})
+- **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+| Endpoint | Metric | Baseline | Candidate | Change | p-value | Status |
+|----------|--------|----------|-----------|--------|---------|--------|
+"""
+    )
+    for endpoint in comparison["endpoints"]:
+        regressed = {r.split()[0] for r in endpoint["regressions"]}
+        for metric, values in endpoint["metrics"].items():
+            status = "❌" if metric in regressed else "✅"
+            p_value = f"{endpoint['test']['p_value']:.3g}" if metric != "throughput" else "-"
+            out.write(
+                f"| {endpoint['endpoint']} | {metric} | "
+                + " | ".join(_format_change(metric, values))
+                + f" | {p_value} | {status} |\n"
+            )
+
+    missing = [
+        f"- **Only in {side}:** {name}\n"
+        for side in ("baseline", "candidate")
+        for name in comparison[f"only_{side}"]
+    ]
+    if missing:
+        out.write("\n## Unmatched Endpoints\n\n" + "".join(missing))
+
+    regressions = [
+        f"- **{e['endpoint']}:** {r}\n" for e in comparison["endpoints"] for r in e["regressions"]
+    ]
+    if regressions:
+        out.write("\n## ⚠️ Regressions\n\n" + "".join(regressions))
+
+
 def generate_report(results: Dict[str, Any], format: str = "json") -> str:
     """
     Generate test report in specified format
@@ -55,18 +521,59 @@ def generate_report(results: Dict[str, Any], format: str = "json") -> str:
     Returns:
         Formatted report string
     """
+    buffer = io.StringIO()
+    write_report(results, format, buffer)
+    return buffer.getvalue()
+
+
+def write_report(
+    results: Dict[str, Any],
+    format: str,
+    out: TextIO,
+    tests: Optional[Iterable[Dict[str, Any]]] = None,
+):
+    """
+    Stream a test report to a file handle
+
+    Rows are written as they are read from `tests`, so reports of any size
+    are produced in linear time without building the document in memory.
+
+    Args:
+        results: Test results data (summary fields; tests unless given separately)
+        format: Output format (json, html, markdown)
+        out: Writable text file
+        tests: Test records to report (default: results["tests"])
+    """
+    if tests is None:
+        tests = results.get("tests", [])
+
     if format == "json":
-        return generate_json_report(results)
+        write_json_report(results, out, tests)
     elif format == "html":
-        return generate_html_report(results)
+        write_html_report(results, out, tests)
     elif format == "markdown":
-        return generate_markdown_report(results)
+        write_markdown_report(results, out, tests)
     else:
         raise ValueError(f"Unsupported format: {format}")
 
 
 def generate_json_report(results: Dict[str, Any]) -> str:
     """Generate JSON report"""
+    return generate_report(results, "json")
+
+
+def generate_html_report(results: Dict[str, Any]) -> str:
+    """Generate HTML report"""
+    return generate_report(results, "html")
+
+
+def generate_markdown_report(results: Dict[str, Any]) -> str:
+    """Generate Markdown report"""
+    return generate_report(results, "markdown")
+
+
+def write_json_report(results: Dict[str, Any], out: TextIO, tests: Iterable[Dict[str, Any]]):
+    """Stream JSON report, one test record per line"""
     report_data = {
         "timestamp": datetime.now().isoformat(),
         "summary": {
@@ -74,127 +581,281 @@ def generate_json_report(results: Dict[str, Any]) -> str:
             "passed": results.get("passed", 0),
             "failed": results.get("failed", 0),
             "duration": results.get("duration", 0),
+            "critical_path_duration": results.get("critical_path_duration"),
         },
+        "critical_path": results.get("critical_path", []),
         "environment": results.get("environment", "unknown"),
         "configuration": {
             "keycloak_url": results.get("keycloak_url"),
             "kong_url": results.get("kong_url"),
         },
-        "tests": results.get("tests", []),
+        **{key: results[key] for key in LATENCY_FIELDS if key in results},
     }
-    return json.dumps(report_data, indent=2)
 
+    # Reopen the object after the fixed fields and stream the tests array into it
+    out.write(json.dumps(report_data, indent=2)[:-2])
+    out.write(',\n  "tests": [')
+    separator = "\n    "
+    for test in tests:
+        out.write(separator + json.dumps(test))
+        separator = ",\n    "
+    out.write("\n  ]\n}" if separator != "\n    " else "]\n}")
 
-def generate_html_report(results: Dict[str, Any]) -> str:
-    """Generate HTML report"""
-    tests = results.get("tests", [])
-    passed = results.get("passed", 0)
-    failed = results.get("failed", 0)
-    total = results.get("total", 0)
-    duration = results.get("duration", 0)
 
-    test_rows = ""
-    for test in tests:
-        status_class = "pass" if test["passed"] else "fail"
-        status_icon = "✓" if test["passed"] else "✗"
-        test_rows += f"""
-        <tr class="{status_class}">
-            <td>{test['name']}</td>
-            <td class="status">{status_icon}</td>
-            <td>{test.get('duration', 0):.2f}s</td>
-            <td>{test.get('message', '')}</td>
-        </tr>
-        """
-
-    html = f"""
-<!DOCTYPE html>
+_HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <title>Kong + Keycloak Test Report</title>
     <style>
-        body {{
+        body {
             font-family: Arial, sans-serif;
             margin: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background-color: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #333;
             border-bottom: 2px solid #4CAF50;
             padding-bottom: 10px;
-        }}
-        .summary {{
+        }
+        .summary {
             display: flex;
             gap: 20px;
             margin: 20px 0;
-        }}
-        .summary-item {{
+        }
+        .summary-item {
             flex: 1;
             padding: 15px;
             border-radius: 4px;
             text-align: center;
-        }}
-        .summary-item h3 {{
+        }
+        .summary-item h3 {
             margin: 0;
             font-size: 24px;
-        }}
-        .summary-item p {{
+        }
+        .summary-item p {
             margin: 5px 0 0 0;
             color: #666;
-        }}
-        .total {{ background-color: #e3f2fd; }}
-        .passed {{ background-color: #e8f5e9; }}
-        .failed {{ background-color: #ffebee; }}
-        table {{
+        }
+        .total { background-color: #e3f2fd; }
+        .passed { background-color: #e8f5e9; }
+        .failed { background-color: #ffebee; }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
-        }}
-        th {{
+        }
+        th {
             background-color: #4CAF50;
             color: white;
             padding: 12px;
             text-align: left;
-        }}
-        td {{
+        }
+        td {
             padding: 10px;
             border-bottom: 1px solid #ddd;
-        }}
-        tr.pass {{
+        }
+        tr.pass {
             background-color: #f1f8f4;
-        }}
-        tr.fail {{
+        }
+        tr.fail {
             background-color: #fef1f1;
-        }}
-        .status {{
+        }
+        .status {
             font-weight: bold;
             font-size: 18px;
-        }}
-        tr.pass .status {{
+        }
+        tr.pass .status {
             color: #4CAF50;
-        }}
-        tr.fail .status {{
+        }
+        tr.fail .status {
             color: #f44336;
-        }}
-        .metadata {{
+        }
+        .metadata {
             margin-top: 20px;
             padding: 15px;
             background-color: #f9f9f9;
             border-radius: 4px;
-        }}
+        }
+        svg {
+            max-width: 100%;
+            height: auto;
+            margin: 10px 0;
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <h1>Kong + Keycloak Integration Test Report</h1>
-        
+"""
+
+_HTML_TABLE_START = """
+        <table>
+            <thead>
+                <tr>
+                    <th>Test Name</th>
+                    <th>Status</th>
+                    <th>Duration</th>
+                    <th>Message</th>
+                </tr>
+            </thead>
+            <tbody>
+"""
+
+_HTML_TABLE_END = """            </tbody>
+        </table>
+"""
+
+
+def _latency_charts(results: Dict[str, Any]) -> Dict[str, str]:
+    """SVG charts for the latency section of load/soak results, by title"""
+    latency = results["latency"]
+    charts = {}
+
+    if results.get("histogram"):
+        markers = [(key, latency[key]) for key in ("p50", "p99") if latency.get(key)]
+        charts["Latency Histogram"] = histogram_svg(
+            LatencyHistogram.from_dict(results["histogram"]), markers=markers
+        )
+
+    # Load runs carry a timeline, soak runs their bucket series; both share the row shape
+    rows = results.get("timeline") or results.get("series") or []
+    if rows:
+        xs = [row["t"] for row in rows]
+        charts["Latency Over Time"] = line_chart_svg(
+            xs,
+            {
+                key: ([row["latency"][key] for row in rows], color)
+                for key, color in (("p50", "#4CAF50"), ("p95", "#FF9800"), ("p99", "#f44336"))
+            },
+        )
+        charts["Throughput Over Time"] = line_chart_svg(
+            xs,
+            {
+                "req/s": ([row["throughput"] for row in rows], "#2196F3"),
+                "errors": ([row["errors"] for row in rows], "#f44336"),
+            },
+            y_format=lambda value: f"{value:.0f}",
+        )
+
+    if results.get("status_codes"):
+        charts["Status Codes"] = status_svg(results["status_codes"])
+
+    return charts
+
+
+def write_latency_html(results: Dict[str, Any], out: TextIO):
+    """
+    Stream the latency distribution section of a load or soak run
+
+    Charts are drawn from the run's histogram and timeline, so their size
+    does not depend on the number of samples.
+
+    Args:
+        results: Load/soak results (with latency, histogram, timeline/series, status_codes)
+        out: Writable text file
+    """
+    charts = _latency_charts(results)
+    latency = results["latency"]
+    keys = [key for key in ("mean", "p50", "p90", "p95", "p99", "max") if key in latency]
+
+    out.write(
+        f"""
+        <h2>Latency Distribution</h2>
+        <p>{html.escape(str(results.get('method', '')))} {html.escape(str(results.get('url', '')))}
+            — {results.get('requests', 0)} requests, {results.get('errors', 0)} errors,
+            {results.get('throughput', 0):.1f} req/s</p>
+        <table>
+            <thead>
+                <tr>{"".join(f"<th>{key}</th>" for key in keys)}</tr>
+            </thead>
+            <tbody>
+                <tr>{"".join(f"<td>{format_ms(latency[key])}</td>" for key in keys)}</tr>
+            </tbody>
+        </table>
+"""
+    )
+    for title, svg in charts.items():
+        out.write(f"        <h3>{title}</h3>\n        {svg}\n")
+
+
+def write_latency_markdown(results: Dict[str, Any], out: TextIO):
+    """
+    Stream the latency distribution section of a load or soak run
+
+    Tables carry the numbers; charts are embedded as SVG data URIs, which
+    most Markdown viewers render inline.
+
+    Args:
+        results: Load/soak results (with latency, histogram, timeline/series, status_codes)
+        out: Writable text file
+    """
+    charts = _latency_charts(results)
+    latency = results["latency"]
+    keys = [key for key in ("mean", "p50", "p90", "p95", "p99", "max") if key in latency]
+
+    out.write(
+        f"""## Latency Distribution
+
+- **Target:** {results.get('method', '')} {results.get('url', '')}
+- **Requests:** {results.get('requests', 0)}
+- **Errors:** {results.get('errors', 0)}
+- **Throughput:** {results.get('throughput', 0):.1f} req/s
+
+| {" | ".join(keys)} |
+|{"|".join("---" for _ in keys)}|
+| {" | ".join(format_ms(latency[key]) for key in keys)} |
+
+"""
+    )
+
+    status_codes = results.get("status_codes") or {}
+    if status_codes:
+        out.write("| Status | Count |\n|--------|-------|\n")
+        for status, count in status_codes.items():
+            out.write(f"| {status} | {count} |\n")
+        out.write("\n")
+
+    for title, svg in charts.items():
+        out.write(f"### {title}\n\n![{title}]({data_uri(svg)})\n\n")
+
+
+def write_html_report(
+    results: Dict[str, Any],
+    out: TextIO,
+    tests: Iterable[Dict[str, Any]],
+    max_rows: int = HTML_MAX_ROWS,
+    page_size: int = HTML_PAGE_SIZE,
+):
+    """
+    Stream HTML report
+
+    The first `page_size` rows form the main table and further rows go into
+    collapsed pages of the same size. Past `max_rows`, tests are aggregated
+    by name (runs, failures, mean/max duration) instead of listed.
+
+    Args:
+        results: Test results data
+        out: Writable text file
+        tests: Test records
+        max_rows: Rows listed individually
+        page_size: Rows per page
+    """
+    passed = results.get("passed", 0)
+    failed = results.get("failed", 0)
+    total = results.get("total", 0)
+    duration = results.get("duration", 0)
+
+    out.write(_HTML_HEAD)
+    out.write(
+        f"""
         <div class="summary">
             <div class="summary-item total">
                 <h3>{total}</h3>
@@ -209,25 +870,94 @@ def generate_html_report(results: Dict[str, Any]) -> str:
                 <p>Failed</p>
             </div>
         </div>
+"""
+    )
+    if results.get("latency"):
+        write_latency_html(results, out)
+    if results.get("phases"):
+        out.write(
+            "\n        <h2>Latency Breakdown</h2>\n        <table>\n            <thead>\n"
+            "                <tr><th>Request</th><th>Total</th>"
+            + "".join(f"<th>{title}</th>" for title, _, _ in _BREAKDOWN_COLUMNS)
+            + "</tr>\n            </thead>\n            <tbody>\n"
+        )
+        for name, breakdown in results["phases"].items():
+            cells = "".join(f"<td>{cell}</td>" for cell in _breakdown_cells(breakdown))
+            out.write(f"                <tr><td>{html.escape(name)}</td>{cells}</tr>\n")
+        out.write(_HTML_TABLE_END)
 
+    rows = 0
+    aggregated: Dict[str, List[float]] = {}
+    out.write(_HTML_TABLE_START)
+
+    for test in tests:
+        if rows >= max_rows:
+            entry = aggregated.setdefault(test["name"], [0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += not test["passed"]
+            entry[2] += test.get("duration", 0)
+            entry[3] = max(entry[3], test.get("duration", 0))
+            continue
+
+        if rows and rows % page_size == 0:
+            out.write(_HTML_TABLE_END + ("        </details>\n" if rows > page_size else ""))
+            out.write(f"        <details>\n            <summary>Tests from #{rows + 1}</summary>")
+            out.write(_HTML_TABLE_START)
+
+        status_class = "pass" if test["passed"] else "fail"
+        status_icon = "✓" if test["passed"] else "✗"
+        out.write(
+            f"""                <tr class="{status_class}">
+                    <td>{html.escape(str(test['name']))}</td>
+                    <td class="status">{status_icon}</td>
+                    <td>{test.get('duration', 0):.2f}s</td>
+                    <td>{html.escape(str(test.get('message', '')))}</td>
+                </tr>
+"""
+        )
+        rows += 1
+
+    out.write(_HTML_TABLE_END + ("        </details>\n" if rows > page_size else ""))
+
+    if aggregated:
+        out.write(
+            f"""
+        <h2>Aggregated Results</h2>
+        <p>{sum(e[0] for e in aggregated.values())} further tests, grouped by name</p>
         <table>
             <thead>
                 <tr>
                     <th>Test Name</th>
-                    <th>Status</th>
-                    <th>Duration</th>
-                    <th>Message</th>
+                    <th>Runs</th>
+                    <th>Failed</th>
+                    <th>Mean Duration</th>
+                    <th>Max Duration</th>
                 </tr>
             </thead>
             <tbody>
-                {test_rows}
-            </tbody>
-        </table>
+"""
+        )
+        for name, (runs, failures, total_duration, max_duration) in aggregated.items():
+            status_class = "fail" if failures else "pass"
+            out.write(
+                f"""                <tr class="{status_class}">
+                    <td>{html.escape(str(name))}</td>
+                    <td>{runs}</td>
+                    <td>{failures}</td>
+                    <td>{total_duration / runs:.2f}s</td>
+                    <td>{max_duration:.2f}s</td>
+                </tr>
+"""
+            )
+        out.write(_HTML_TABLE_END)
 
+    out.write(
+        f"""
         <div class="metadata">
             <h3>Test Metadata</h3>
             <p><strong>Environment:</strong> {results.get('environment', 'N/A')}</p>
             <p><strong>Total Duration:</strong> {duration:.2f}s</p>
+            <p><strong>Critical Path:</strong> {_critical_path_text(results)}</p>
             <p><strong>Keycloak URL:</strong> {results.get('keycloak_url', 'N/A')}</p>
             <p><strong>Kong URL:</strong> {results.get('kong_url', 'N/A')}</p>
             <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
@@ -235,19 +965,38 @@ def generate_html_report(results: Dict[str, Any]) -> str:
     </div>
 </body>
 </html>
-    """
-    return html
+"""
+    )
 
 
-def generate_markdown_report(results: Dict[str, Any]) -> str:
-    """Generate Markdown report"""
-    tests = results.get("tests", [])
+def _critical_path_text(results: Dict[str, Any]) -> str:
+    """Critical path of a suite run and its summed duration, for reports"""
+    path = " → ".join(results.get("critical_path", [])) or "N/A"
+    return f"{path} ({results.get('critical_path_duration') or 0:.2f}s)"
+
+
+def write_markdown_report(
+    results: Dict[str, Any],
+    out: TextIO,
+    tests: Iterable[Dict[str, Any]],
+    max_failures: int = MARKDOWN_MAX_FAILURES,
+):
+    """
+    Stream Markdown report
+
+    Args:
+        results: Test results data
+        out: Writable text file
+        tests: Test records
+        max_failures: Failed tests repeated individually in the failures section
+    """
     passed = results.get("passed", 0)
     failed = results.get("failed", 0)
     total = results.get("total", 0)
     duration = results.get("duration", 0)
 
-    md = f"""# Kong + Keycloak Integration Test Report
+    out.write(
+        f"""# Kong + Keycloak Integration Test Report
 
 ## Summary
 
@@ -256,18 +1005,47 @@ def generate_markdown_report(results: Dict[str, Any]) -> str:
 - **Failed:** {failed}
 - **Success Rate:** {(passed/total*100) if total > 0 else 0:.1f}%
 - **Total Duration:** {duration:.2f}s
+- **Critical Path:** {_critical_path_text(results)}
 
-## Test Results
+"""
+    )
+    if results.get("latency"):
+        write_latency_markdown(results, out)
+    if results.get("phases"):
+        out.write(
+            "## Latency Breakdown\n\n| Request | Total | "
+            + " | ".join(title for title, _, _ in _BREAKDOWN_COLUMNS)
+            + " |\n|"
+            + "---|" * (len(_BREAKDOWN_COLUMNS) + 2)
+            + "\n"
+        )
+        for name, breakdown in results["phases"].items():
+            out.write(f"| {name} | " + " | ".join(_breakdown_cells(breakdown)) + " |\n")
+        out.write("\n")
+
+    out.write(
+        """## Test Results
 
 | Test Name | Status | Duration | Message |
 |-----------|--------|----------|---------|
 """
+    )
 
+    failures = []
+    failure_count = 0
     for test in tests:
         status = "✅ PASS" if test["passed"] else "❌ FAIL"
-        md += f"| {test['name']} | {status} | {test.get('duration', 0):.2f}s | {test.get('message', '')} |\n"
+        out.write(
+            f"| {test['name']} | {status} | {test.get('duration', 0):.2f}s "
+            f"| {test.get('message', '')} |\n"
+        )
+        if not test["passed"]:
+            failure_count += 1
+            if len(failures) < max_failures:
+                failures.append((test["name"], test.get("message", "No message")))
 
-    md += f"""
+    out.write(
+        f"""
 ## Test Environment
 
 - **Environment:** {results.get('environment', 'N/A')}
@@ -276,11 +1054,11 @@ def generate_markdown_report(results: Dict[str, Any]) -> str:
 - **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 """
+    )
 
-    if failed > 0:
-        md += "## ⚠️ Failed Tests\n\n"
-        for test in tests:
-            if not test["passed"]:
-                md += f"- **{test['name']}:** {test.get('message', 'No message')}\n"
-
-    return md
+    if failure_count:
+        out.write("## ⚠️ Failed Tests\n\n")
+        for name, message in failures:
+            out.write(f"- **{name}:** {message}\n")
+        if failure_count > len(failures):
+            out.write(f"- ... and {failure_count - len(failures)} more\n")
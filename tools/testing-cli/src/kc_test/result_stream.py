@@ -0,0 +1,167 @@
+"""Incremental reading of large test result files"""
+
+import json
+from typing import Any, Callable, Dict, Iterator, TextIO, Tuple
+
+# Characters read from the input per refill
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Scanner:
+    """Pulls JSON values off a text stream one at a time, keeping only a small buffer"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer never grows with the input
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume `char`, the next non-whitespace character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of input'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value ending exactly at the buffer end may be a truncated number
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+
+
+def iter_results_json(stream: TextIO, fields: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the `tests` array of a results object, collecting the other fields
+
+    Args:
+        stream: Text stream holding one JSON object
+        fields: Filled with every top-level field except `tests` (complete
+            once the iterator is exhausted)
+
+    Yields:
+        Test records
+    """
+    scanner = _Scanner(stream)
+    scanner.expect("{")
+
+    while scanner.peek() not in ("}", ""):
+        if scanner.peek() == ",":
+            scanner.expect(",")
+        key = scanner.value()
+        scanner.expect(":")
+
+        if key == "tests" and scanner.peek() == "[":
+            scanner.expect("[")
+            while scanner.peek() != "]":
+                if scanner.peek() == ",":
+                    scanner.expect(",")
+                yield scanner.value()
+            scanner.expect("]")
+        else:
+            fields[key] = scanner.value()
+
+    scanner.expect("}")
+
+
+def iter_results_ndjson(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Stream test records from NDJSON, one per line"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _is_ndjson(path: str) -> bool:
+    if path.endswith((".ndjson", ".jsonl")):
+        return True
+    with open(path) as f:
+        first_line = f.readline(CHUNK_SIZE)
+    # NDJSON starts with a complete test record; a results object spans lines or
+    # is a summary (test results, or a load/soak run without tests)
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return False
+    return isinstance(record, dict) and "passed" in record and "tests" not in record
+
+
+def open_results(path: str) -> Tuple[Dict[str, Any], Callable[[], Iterator[Dict[str, Any]]]]:
+    """
+    Read a results file (JSON results/report, or NDJSON test records) in constant memory
+
+    A first pass aggregates the summary (counts and durations) and picks up
+    the non-test fields; the returned factory streams the tests again for the
+    report writers.
+
+    Args:
+        path: Results file
+
+    Returns:
+        Summary fields in the shape reporters expect, and a function returning
+        a fresh iterator over the test records
+    """
+    ndjson = _is_ndjson(path)
+
+    def tests(fields: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        with open(path) as f:
+            if ndjson:
+                yield from iter_results_ndjson(f)
+            else:
+                yield from iter_results_json(f, fields)
+
+    fields: Dict[str, Any] = {}
+    counts = {"total": 0, "passed": 0, "failed": 0}
+    duration = 0.0
+    for test in tests(fields):
+        counts["total"] += 1
+        counts["passed" if test.get("passed") else "failed"] += 1
+        duration += test.get("duration", 0) or 0
+
+    # Reports written by `--format json` nest the summary and URLs
+    results = {
+        **fields.get("summary", {}),
+        **fields.get("configuration", {}),
+        **{k: v for k, v in fields.items() if k not in ("summary", "configuration")},
+    }
+    for key, value in counts.items():
+        results.setdefault(key, value)
+    results.setdefault("duration", duration)
+
+    return results, lambda: tests({})
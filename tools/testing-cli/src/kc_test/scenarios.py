@@ -0,0 +1,354 @@
+"""Declarative YAML test scenarios
+
+A scenario file describes requests, where their tokens come from and what the
+response must look like:
+
+    kong_url: http://localhost:8000
+    keycloak_url: http://localhost:8080
+    realm: kong-realm
+
+    tokens:
+      user: {username: testuser, password: user123}
+      admin: {username: admin, password: admin123}
+
+    scenarios:
+      - name: public
+        request: {method: GET, path: /api/public}
+        expect: {status: 200, body: {contains: public}}
+
+      - name: "{path} as {token}"
+        matrix:
+          path: [/api/protected, /api/admin]
+          token: [user, admin]
+        request: {method: GET, path: "{path}"}
+        token: "{token}"
+        expect: {status: [200, 403]}
+
+The file is compiled once into a flat execution plan (matrix entries expanded,
+URLs resolved, expectations normalized), which can then be split into shards
+and executed with bounded concurrency.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+import yaml
+
+from .keycloak_client import get_token
+from .result_store import ResultStore
+
+# Built-in suites shipped with the package
+SUITES_DIR = Path(__file__).parent / "suites"
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 5
+
+# Matrix variable reference inside a scenario string
+_VARIABLE = re.compile(r"\{(\w+)\}")
+
+_local = threading.local()
+
+
+def load_scenarios(source: str) -> Dict[str, Any]:
+    """
+    Load a scenario file
+
+    Args:
+        source: Path to a YAML file, or the name of a built-in suite
+
+    Returns:
+        Parsed scenario specification
+    """
+    path = Path(source)
+    if not path.exists():
+        path = SUITES_DIR / f"{source}.yaml"
+        if not path.exists():
+            raise ValueError(f"Unknown test suite: {source}")
+
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _render(value: Any, variables: Dict[str, Any]) -> Any:
+    """
+    Substitute matrix variables into strings nested anywhere in value
+
+    Only {name} references to defined variables are replaced, so other
+    braces (JSON bodies, expected payloads) are left as they are.
+    """
+    if isinstance(value, str):
+        return _VARIABLE.sub(
+            lambda m: str(variables[m.group(1)]) if m.group(1) in variables else m.group(0), value
+        )
+    if isinstance(value, dict):
+        return {k: _render(v, variables) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, variables) for v in value]
+    return value
+
+
+def _expand(scenario: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expand a scenario's matrix into one scenario per combination"""
+    matrix = scenario.get("matrix")
+    if not matrix:
+        return [scenario]
+
+    base = {k: v for k, v in scenario.items() if k != "matrix"}
+    keys = list(matrix)
+    return [
+        _render(base, dict(zip(keys, combination)))
+        for combination in itertools.product(*(matrix[k] for k in keys))
+    ]
+
+
+def compile_plan(
+    spec: Dict[str, Any],
+    kong_url: Optional[str] = None,
+    keycloak_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compile a scenario specification into an execution plan
+
+    Args:
+        spec: Parsed scenario specification
+        kong_url: Override the file's Kong URL
+        keycloak_url: Override the file's Keycloak URL
+
+    Returns:
+        Execution plan with resolved steps and token sources
+    """
+    kong_url = (kong_url or spec.get("kong_url") or "http://localhost:8000").rstrip("/")
+    keycloak_url = keycloak_url or spec.get("keycloak_url") or "http://localhost:8080"
+    realm = spec.get("realm", "kong-realm")
+    tokens = spec.get("tokens", {})
+
+    steps: List[Dict[str, Any]] = []
+    seen = set()
+
+    for scenario in spec.get("scenarios", []):
+        for expanded in _expand(scenario):
+            request = expanded.get("request", {})
+            expect = expanded.get("expect", {})
+            name = expanded.get("name") or f"{request.get('method', 'GET')} {request['path']}"
+
+            if name in seen:
+                raise ValueError(f"Duplicate scenario name: {name}")
+            seen.add(name)
+
+            token = expanded.get("token")
+            if token is not None and token not in tokens:
+                raise ValueError(f"Scenario '{name}' uses undefined token source '{token}'")
+
+            status = expect.get("status", 200)
+            steps.append(
+                {
+                    "name": name,
+                    "method": request.get("method", "GET").upper(),
+                    "url": f"{kong_url}/{request['path'].lstrip('/')}",
+                    "headers": request.get("headers", {}),
+                    "json": request.get("json"),
+                    "token": token,
+                    "expect_status": set(status) if isinstance(status, list) else {status},
+                    "expect_body": expect.get("body", {}),
+                }
+            )
+
+    return {
+        "kong_url": kong_url,
+        "keycloak_url": keycloak_url,
+        "realm": realm,
+        "tokens": tokens,
+        "timeout": spec.get("timeout", DEFAULT_TIMEOUT),
+        "steps": steps,
+    }
+
+
+def shard_plan(plan: Dict[str, Any], shard_index: int, shard_count: int) -> Dict[str, Any]:
+    """
+    Select the steps belonging to one shard
+
+    Steps are assigned by hashing their name, so every CI job computes the same
+    split independently of scenario order.
+
+    Args:
+        plan: Execution plan
+        shard_index: Zero-based shard index
+        shard_count: Total number of shards
+
+    Returns:
+        Execution plan restricted to the shard
+    """
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index}/{shard_count}")
+
+    def shard_of(step):
+        digest = hashlib.sha1(step["name"].encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % shard_count
+
+    steps = [step for step in plan["steps"] if shard_of(step) == shard_index]
+    return {**plan, "steps": steps}
+
+
+def _resolve_token(source: Any, plan: Dict[str, Any]) -> str:
+    """Obtain an access token from a token source definition"""
+    if isinstance(source, str):
+        return source
+    if "token" in source:
+        return source["token"]
+    if "env" in source:
+        return os.environ[source["env"]]
+
+    token_data = get_token(
+        source.get("keycloak_url", plan["keycloak_url"]),
+        source.get("realm", plan["realm"]),
+        source["username"],
+        source["password"],
+        source.get("client_id", "kong-client"),
+        timeout=plan["timeout"],
+    )
+    return token_data["access_token"]
+
+
+def _session() -> requests.Session:
+    """Per-thread session so each worker reuses its connections (see run_plan)"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _lookup(data: Any, path: str) -> Any:
+    """Follow a dotted path through nested dicts/lists"""
+    for part in path.split("."):
+        if isinstance(data, list):
+            data = data[int(part)]
+        else:
+            data = data[part]
+    return data
+
+
+def _check_body(response: requests.Response, expect_body: Dict[str, Any]) -> Optional[str]:
+    """Return a failure message if the body does not match, otherwise None"""
+    if "contains" in expect_body and expect_body["contains"] not in response.text:
+        return f"body does not contain {expect_body['contains']!r}"
+
+    if "json" in expect_body:
+        try:
+            payload = response.json()
+        except ValueError:
+            return "body is not JSON"
+
+        for path, expected in expect_body["json"].items():
+            try:
+                actual = _lookup(payload, path)
+            except (KeyError, IndexError, ValueError, TypeError):
+                return f"missing {path}"
+            if actual != expected:
+                return f"{path} is {actual!r}, expected {expected!r}"
+
+    return None
+
+
+def _run_step(step: Dict[str, Any], tokens: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Execute one step and evaluate its expectations"""
+    headers = dict(step["headers"])
+    start = time.time()
+
+    if step["token"] is not None:
+        token = tokens[step["token"]]
+        if isinstance(token, Exception):
+            return {
+                "name": step["name"],
+                "passed": False,
+                "duration": 0.0,
+                "message": f"Token source '{step['token']}' failed: {token}",
+            }
+        headers["Authorization"] = f"Bearer {token}"
+
+    try:
+        response = _session().request(
+            step["method"], step["url"], headers=headers, json=step["json"], timeout=timeout
+        )
+        failure = None
+        if response.status_code not in step["expect_status"]:
+            expected = ", ".join(str(s) for s in sorted(step["expect_status"]))
+            failure = f"status {response.status_code}, expected {expected}"
+        else:
+            failure = _check_body(response, step["expect_body"])
+
+        passed = failure is None
+        message = f"{step['method']} {step['url']} returned {response.status_code}"
+        if failure:
+            message = f"{message}: {failure}"
+    except Exception as e:
+        passed = False
+        message = f"{step['method']} {step['url']} failed: {e}"
+
+    return {
+        "name": step["name"],
+        "passed": passed,
+        "duration": time.time() - start,
+        "message": message,
+    }
+
+
+def run_plan(
+    plan: Dict[str, Any], concurrency: int = DEFAULT_CONCURRENCY, env: str = "dev"
+) -> Dict[str, Any]:
+    """
+    Execute a compiled plan with bounded concurrency
+
+    Each token source used by the plan is resolved once up front.
+
+    Args:
+        plan: Execution plan (optionally sharded)
+        concurrency: Maximum number of requests in flight
+        env: Environment name
+
+    Returns:
+        Test results in the same shape as the comprehensive suite
+    """
+    start_time = time.time()
+    steps = plan["steps"]
+    needed = sorted({step["token"] for step in steps if step["token"] is not None})
+
+    def resolve(name):
+        try:
+            return _resolve_token(plan["tokens"][name], plan)
+        except Exception as e:
+            return e
+
+    # Each worker opens its session up front so all of them can be closed
+    # once the pool is done, rather than leaking with the finished threads
+    sessions: List[requests.Session] = []
+
+    def open_session():
+        _local.session = requests.Session()
+        sessions.append(_local.session)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1), initializer=open_session) as pool:
+            tokens = dict(zip(needed, pool.map(resolve, needed)))
+            results = ResultStore.from_records(
+                pool.map(lambda step: _run_step(step, tokens, plan["timeout"]), steps)
+            )
+    finally:
+        for session in sessions:
+            session.close()
+
+    return {
+        "tests": results,
+        **results.counts(),
+        "duration": time.time() - start_time,
+        "environment": env,
+        "keycloak_url": plan["keycloak_url"],
+        "kong_url": plan["kong_url"],
+    }
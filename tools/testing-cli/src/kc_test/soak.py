@@ -0,0 +1,362 @@
+"""Long-running soak tests that follow the real token lifecycle"""
+
+import json
+import re
+import subprocess
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from .histogram import LatencyHistogram
+from .keycloak_client import decode_token
+from .load import TokenProvider, drive_virtual_users
+from .result_store import percentile
+
+# A 401 this close (seconds) to its token's expiry or issue time counts as a refresh race
+REFRESH_RACE_WINDOW = 5
+
+# A bucket with at least this many 401s is reported as a burst
+BURST_THRESHOLD = 5
+
+_SIZE_UNITS = {
+    "b": 1,
+    "kb": 1000,
+    "kib": 1024,
+    "mb": 1000**2,
+    "mib": 1024**2,
+    "gb": 1000**3,
+    "gib": 1024**3,
+}
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration such as "90", "45m" or "6h" into seconds
+
+    Args:
+        value: Number of seconds, optionally suffixed with s, m or h
+
+    Returns:
+        Seconds
+    """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([smh]?)\s*", value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a human-readable size ("12.5 MiB", "800kB") into bytes
+
+    Args:
+        value: Size string
+
+    Returns:
+        Size in bytes (0 if unparseable)
+    """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", value)
+    if not match:
+        return 0
+    return int(float(match.group(1)) * _SIZE_UNITS.get(match.group(2).lower() or "b", 1))
+
+
+def container_stats(containers: List[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Sample memory and process counts of docker containers
+
+    Args:
+        containers: Container names (e.g. kong, backend)
+
+    Returns:
+        Memory bytes and PIDs keyed by container name (empty if docker is unavailable)
+    """
+    if not containers:
+        return {}
+
+    try:
+        output = subprocess.run(
+            ["docker", "stats", "--no-stream", "--format", "{{json .}}", *containers],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        ).stdout
+    except Exception:
+        return {}
+
+    stats = {}
+    for line in output.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        stats[entry.get("Name", "")] = {
+            "memory_bytes": parse_size(entry.get("MemUsage", "0").split("/")[0]),
+            "pids": int(entry.get("PIDs", 0) or 0),
+        }
+    return stats
+
+
+def linear_slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares slope of ys over xs (0.0 for fewer than two points)"""
+    if len(xs) < 2:
+        return 0.0
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def analyze_series(series: List[Dict[str, Any]], bursts_threshold: int = BURST_THRESHOLD):
+    """
+    Summarize drift and growth over a soak series
+
+    Slopes are per hour so runs of different lengths compare directly.
+
+    Args:
+        series: Bucket rows produced by run_soak
+        bursts_threshold: Minimum 401s in a bucket to report it as a burst
+
+    Returns:
+        Latency drift, Kong/container growth rates and 401 bursts
+    """
+    hours = [row["t"] / 3600 for row in series]
+
+    def slope(values):
+        points = [(h, v) for h, v in zip(hours, values) if v is not None]
+        return linear_slope([p[0] for p in points], [p[1] for p in points])
+
+    analysis: Dict[str, Any] = {
+        "latency_p50_drift_ms_per_hour": slope([r["latency"]["p50"] * 1000 for r in series]),
+        "latency_p95_drift_ms_per_hour": slope([r["latency"]["p95"] * 1000 for r in series]),
+        "throughput_drift_per_hour": slope([r["throughput"] for r in series]),
+    }
+
+    kong_rows = [r["kong"] for r in series]
+    if any(kong_rows):
+
+        def figures(kong):
+            return {
+                "connections_active": kong["connections"].get("active", 0),
+                "lua_vm_bytes": kong["lua_vm_bytes"],
+                "shared_dict_bytes": sum(d["allocated"] for d in kong["shared_dicts"].values()),
+            }
+
+        rows = [figures(k) if k else {} for k in kong_rows]
+        for key in ["connections_active", "lua_vm_bytes", "shared_dict_bytes"]:
+            analysis[f"kong_{key}_per_hour"] = slope([row.get(key) for row in rows])
+
+    containers = sorted({name for r in series for name in r["containers"]})
+    analysis["containers"] = {
+        name: {
+            "memory_bytes_per_hour": slope(
+                [r["containers"].get(name, {}).get("memory_bytes") for r in series]
+            ),
+            "pids_per_hour": slope([r["containers"].get(name, {}).get("pids") for r in series]),
+        }
+        for name in containers
+    }
+
+    analysis["unauthorized_bursts"] = [
+        {
+            "t": r["t"],
+            "unauthorized": r["unauthorized"],
+            "near_refresh": r["unauthorized_near_refresh"],
+            "refresh_race": r["unauthorized_near_refresh"] * 2 >= r["unauthorized"],
+        }
+        for r in series
+        if r["unauthorized"] >= bursts_threshold
+    ]
+
+    return analysis
+
+
+def run_soak(
+    kong_url: str,
+    endpoint: str,
+    virtual_users: int,
+    duration: float,
+    token_provider: Optional[TokenProvider],
+    bucket_seconds: float = 60.0,
+    method: str = "GET",
+    kong_admin_url: Optional[str] = None,
+    containers: Optional[List[str]] = None,
+    output: Optional[str] = None,
+    on_bucket: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Keep traffic going for a long time and record a time-bucketed series
+
+    Virtual users fetch their token from `token_provider` on every request, so
+    a UserPool refreshes each one as it approaches expiry, exactly as real
+    clients would. Per bucket the series records throughput, latency
+    percentiles, 401s (and how many hit a token right at expiry or issue), token
+    refreshes, Kong /status figures and container memory.
+
+    Args:
+        kong_url: Kong gateway URL
+        endpoint: API endpoint path
+        virtual_users: Number of concurrent virtual users
+        duration: Run time in seconds
+        token_provider: Supplies each virtual user's access token per request
+        bucket_seconds: Width of each series bucket
+        method: HTTP method
+        kong_admin_url: Kong admin API to sample (optional)
+        containers: Docker containers to sample memory from (optional)
+        output: NDJSON file receiving each bucket as soon as it closes
+        on_bucket: Called with each closed bucket row
+
+    Returns:
+        Run configuration, overall latency (percentiles from a histogram of
+        every sample), the series and its drift/growth analysis
+    """
+    url = f"{kong_url}/{endpoint.lstrip('/')}"
+    lock = threading.Lock()
+    buckets: Dict[int, Dict[str, Any]] = {}
+    last_token: Dict[int, str] = {}
+    token_times: Dict[str, tuple] = {}
+    series: List[Dict[str, Any]] = []
+    infra: Dict[int, Dict[str, Any]] = {}
+    closed = [0]  # first bucket index still open
+    histogram = LatencyHistogram()
+    status_codes: Counter = Counter()
+    stop = threading.Event()
+    sink = open(output, "w") if output else None
+
+    def near_refresh(token: str) -> bool:
+        times = token_times.get(token)
+        if times is None:
+            try:
+                claims = decode_token(token)
+                times = (claims.get("iat", 0), claims.get("exp", 0))
+            except Exception:
+                times = (0, 0)
+            if len(token_times) > 10000:
+                token_times.clear()
+            token_times[token] = times
+        now = time.time()
+        return now - times[0] < REFRESH_RACE_WINDOW or times[1] - now < REFRESH_RACE_WINDOW
+
+    def record(index, offset, latency, status, token):
+        race = status == 401 and token is not None and near_refresh(token)
+
+        with lock:
+            # Stragglers from an already closed bucket count towards the oldest open one
+            bucket_index = max(int(offset // bucket_seconds), closed[0])
+            bucket = buckets.setdefault(
+                bucket_index,
+                {"latencies": [], "statuses": Counter(), "near_refresh": 0, "refreshes": 0},
+            )
+            bucket["latencies"].append(latency)
+            bucket["statuses"][status] += 1
+            bucket["near_refresh"] += race
+            if token is not None and last_token.get(index) != token:
+                if index in last_token:
+                    bucket["refreshes"] += 1
+                last_token[index] = token
+
+    def sample_kong() -> Optional[Dict[str, Any]]:
+        from .kong_stats import scrape_status
+
+        try:
+            return scrape_status(kong_admin_url) if kong_admin_url else None
+        except Exception:
+            return None
+
+    def sample_infra() -> Dict[str, Any]:
+        return {
+            "kong": sample_kong(),
+            "containers": container_stats(containers or []),
+        }
+
+    def close_bucket(bucket_index: int, infra: Dict[str, Any]):
+        with lock:
+            closed[0] = bucket_index + 1
+            bucket = buckets.pop(bucket_index, None)
+        if bucket is None:
+            return
+
+        t = bucket_index * bucket_seconds
+        width = min(bucket_seconds, time.monotonic() - start - t)
+        latencies = sorted(bucket["latencies"])
+        statuses = bucket["statuses"]
+        for latency in latencies:
+            histogram.record(latency)
+        status_codes.update(statuses)
+        row = {
+            "t": t,
+            "requests": len(latencies),
+            "throughput": len(latencies) / width if width > 0 else 0.0,
+            "errors": sum(n for s, n in statuses.items() if s == 0 or s >= 400),
+            "unauthorized": statuses.get(401, 0),
+            "unauthorized_near_refresh": bucket["near_refresh"],
+            "refreshes": bucket["refreshes"],
+            "latency": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "status_codes": {str(s): n for s, n in sorted(statuses.items())},
+            **infra,
+        }
+
+        series.append(row)
+        if sink:
+            sink.write(json.dumps(row) + "\n")
+            sink.flush()
+        if on_bucket:
+            on_bucket(row)
+
+    def sampler():
+        # Infrastructure is sampled at each bucket boundary, but a bucket is only
+        # closed one boundary later so in-flight requests can still land in it
+        bucket_index = 0
+        while not stop.wait(max(start + (bucket_index + 1) * bucket_seconds - time.monotonic(), 0)):
+            infra[bucket_index] = sample_infra()
+            if bucket_index > 0:
+                close_bucket(bucket_index - 1, infra.pop(bucket_index - 1))
+            bucket_index += 1
+
+    start = time.monotonic()
+    sampler_thread = threading.Thread(target=sampler, daemon=True)
+    sampler_thread.start()
+
+    try:
+        elapsed = drive_virtual_users(
+            url, method, virtual_users, duration, token_provider, record, stop=stop
+        )
+    finally:
+        stop.set()
+        sampler_thread.join()
+        # Close whatever the sampler had not closed yet (the last, partial buckets)
+        for bucket_index in sorted(buckets):
+            close_bucket(bucket_index, infra.pop(bucket_index, None) or sample_infra())
+        if sink:
+            sink.close()
+
+    return {
+        "url": url,
+        "method": method,
+        "virtual_users": virtual_users,
+        "duration": elapsed,
+        "bucket_seconds": bucket_seconds,
+        "requests": histogram.count,
+        "errors": sum(n for s, n in status_codes.items() if s == 0 or s >= 400),
+        "throughput": histogram.count / elapsed if elapsed else 0.0,
+        "latency": {
+            "mean": histogram.mean(),
+            "p50": histogram.percentile(50),
+            "p90": histogram.percentile(90),
+            "p95": histogram.percentile(95),
+            "p99": histogram.percentile(99),
+            "max": histogram.max or 0.0,
+        },
+        "status_codes": {str(s): n for s, n in sorted(status_codes.items())},
+        "histogram": histogram.to_dict(),
+        "series": series,
+        "analysis": analyze_series(series),
+    }
@@ -0,0 +1,264 @@
+"""Batch decoding and signature verification of captured tokens"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+# Anything that looks like a compact JWS, so raw access-log lines work as input
+TOKEN_PATTERN = re.compile(r"eyJ[\w-]+\.eyJ[\w-]+\.[\w-]*")
+
+# Tokens handed to a worker per task
+BATCH_SIZE = 500
+
+# Minimum seconds between JWKS refetches triggered by unknown kids
+JWKS_REFETCH_INTERVAL = 60
+
+# Distinct tokens remembered for dedupe; older ones are forgotten (least recently seen first)
+DEDUPE_WINDOW = 100_000
+
+
+def jwks_url(keycloak_url: str, realm: str) -> str:
+    """JWKS endpoint of a Keycloak realm"""
+    return f"{keycloak_url}/realms/{realm}/protocol/openid-connect/certs"
+
+
+def fetch_jwks(url: str, timeout: float = 10) -> Dict[str, Any]:
+    """
+    Fetch a JWKS document
+
+    Args:
+        url: JWKS URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        JWKS document
+    """
+    response = requests.get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise Exception(f"JWKS request failed: {response.status_code} {response.text}")
+    return response.json()
+
+
+class KeyCache:
+    """
+    Verification keys by kid, parsed once
+
+    An unknown kid (e.g. after a key rotation) refetches the JWKS, at most
+    once per JWKS_REFETCH_INTERVAL.
+    """
+
+    def __init__(self, jwks: Optional[Dict[str, Any]] = None, url: Optional[str] = None):
+        """
+        Initialize key cache
+
+        Args:
+            jwks: JWKS document to start from (fetched from url if omitted)
+            url: JWKS URL for the initial fetch and refetches
+        """
+        self.url = url
+        self.jwks = jwks or (fetch_jwks(url) if url else {"keys": []})
+        self._keys: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._fetched_at = time.monotonic()
+        self._load(self.jwks)
+
+    def _load(self, jwks: Dict[str, Any]):
+        from jose import jwk
+
+        for key in jwks.get("keys", []):
+            if key.get("use", "sig") != "sig" or key.get("kid") in self._keys:
+                continue
+            try:
+                self._keys[key.get("kid")] = jwk.construct(key, key.get("alg", "RS256"))
+            except Exception:
+                continue
+
+    def get(self, kid: Optional[str]):
+        """
+        Verification key for a kid
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            Key, or None if the JWKS does not contain it
+        """
+        key = self._keys.get(kid)
+        if key is not None or not self.url:
+            return key
+
+        with self._lock:
+            if kid not in self._keys and (
+                time.monotonic() - self._fetched_at >= JWKS_REFETCH_INTERVAL
+            ):
+                self._fetched_at = time.monotonic()
+                try:
+                    self.jwks = fetch_jwks(self.url)
+                    self._load(self.jwks)
+                except Exception:
+                    pass
+        return self._keys.get(kid)
+
+
+def _segment(segment: str) -> Dict[str, Any]:
+    return json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+
+
+def inspect_token(token: str, keys: Optional[KeyCache] = None) -> Dict[str, Any]:
+    """
+    Decode a token and optionally check its signature
+
+    Args:
+        token: Encoded JWT
+        keys: Verification keys (skip verification if None)
+
+    Returns:
+        Header fields, claims, expiry and signature status ("valid",
+        "invalid", "unknown_kid"), or an error for malformed tokens
+    """
+    parts = token.split(".")
+    try:
+        if len(parts) != 3:
+            raise ValueError("Invalid JWT token format")
+        header = _segment(parts[0])
+        claims = _segment(parts[1])
+    except ValueError as e:
+        return {"error": str(e)}
+
+    record: Dict[str, Any] = {
+        "kid": header.get("kid"),
+        "alg": header.get("alg"),
+        "claims": claims,
+        "expired": claims.get("exp", 0) < time.time(),
+    }
+
+    if keys is not None:
+        from jose import jws
+
+        key = keys.get(header.get("kid"))
+        if header.get("alg", "none").lower() == "none":
+            record["signature"] = "invalid"
+        elif key is None:
+            record["signature"] = "unknown_kid"
+        else:
+            try:
+                jws.verify(token, key, algorithms=[header.get("alg", "RS256")])
+                record["signature"] = "valid"
+            except Exception:
+                record["signature"] = "invalid"
+
+    return record
+
+
+def extract_tokens(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Pull tokens out of input lines
+
+    Lines may hold a bare token or any text containing one (an access-log
+    line, an Authorization header); lines without a token are skipped.
+
+    Args:
+        lines: Input lines
+
+    Yields:
+        (1-based line number, token)
+    """
+    for number, line in enumerate(lines, 1):
+        match = TOKEN_PATTERN.search(line)
+        if match:
+            yield number, match.group(0)
+
+
+_worker_keys: Optional[KeyCache] = None
+
+
+def _init_worker(jwks: Optional[Dict[str, Any]], url: Optional[str]):
+    global _worker_keys
+    _worker_keys = KeyCache(jwks, url) if jwks is not None else None
+
+
+def _inspect_batch(batch: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    return [{"line": number, **inspect_token(token, _worker_keys)} for number, token in batch]
+
+
+def decode_stream(
+    lines: Iterable[str],
+    keys: Optional[KeyCache] = None,
+    workers: int = 1,
+    dedupe: bool = True,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Decode (and verify) every token in a stream of lines, in input order
+
+    Input is read lazily and at most a few batches per worker are in flight,
+    so memory stays flat on inputs of any size. Repeated tokens are decoded
+    once and only counted, as long as they recur within the last
+    DEDUPE_WINDOW distinct tokens; a token seen longer ago is decoded again.
+
+    Args:
+        lines: Input lines (e.g. sys.stdin)
+        keys: Verification keys (skip verification if None)
+        workers: Decoding processes (1 decodes in this process)
+        dedupe: Skip tokens seen recently (see DEDUPE_WINDOW)
+        stats: Dict updated with tokens/unique/duplicates counts
+
+    Yields:
+        One record per (unique) token, with its input line number
+    """
+    stats = stats if stats is not None else {}
+    stats.update(tokens=0, unique=0, duplicates=0)
+    seen: "OrderedDict[bytes, None]" = OrderedDict()
+
+    def batches() -> Iterator[List[Tuple[int, str]]]:
+        batch: List[Tuple[int, str]] = []
+        for number, token in extract_tokens(lines):
+            stats["tokens"] += 1
+            if dedupe:
+                digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+                if digest in seen:
+                    seen.move_to_end(digest)
+                    stats["duplicates"] += 1
+                    continue
+                seen[digest] = None
+                if len(seen) > DEDUPE_WINDOW:
+                    seen.popitem(last=False)
+            stats["unique"] += 1
+            batch.append((number, token))
+            if len(batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    if workers <= 1:
+        for batch in batches():
+            for number, token in batch:
+                yield {"line": number, **inspect_token(token, keys)}
+        return
+
+    jwks = keys.jwks if keys is not None else None
+    url = keys.url if keys is not None else None
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(jwks, url)) as pool:
+        pending = deque()
+        for batch in batches():
+            pending.append(pool.submit(_inspect_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def default_workers(verify: bool) -> int:
+    """Decoding alone is cheaper than shipping tokens to other processes"""
+    return (os.cpu_count() or 1) if verify else 1
@@ -0,0 +1,318 @@
+"""Locally signed test tokens shaped like kong-realm access tokens"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from jose import jwk, jwt
+
+ALGORITHM = "RS256"
+DEFAULT_TTL = 300
+DEFAULT_KEY_SIZE = 2048
+
+# Tokens signed per task when minting in parallel
+MINT_CHUNK = 200
+
+
+def generate_key(key_size: int = DEFAULT_KEY_SIZE) -> str:
+    """
+    Generate an RSA private key
+
+    Args:
+        key_size: Modulus size in bits
+
+    Returns:
+        PEM-encoded private key
+    """
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa
+
+        key = crypto_rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+        return key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+    except ImportError:
+        import rsa
+
+        _, private_key = rsa.newkeys(key_size)
+        return private_key.save_pkcs1().decode()
+
+
+def load_or_create_key(path: str, key_size: int = DEFAULT_KEY_SIZE) -> str:
+    """
+    Read a signing key, generating and saving one if the file does not exist
+
+    Reusing the key file keeps tokens minted in separate runs verifiable
+    against the same JWKS.
+
+    Args:
+        path: PEM file
+        key_size: Modulus size in bits for a new key
+
+    Returns:
+        PEM-encoded private key
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read()
+
+    pem = generate_key(key_size)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(pem)
+    return pem
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def public_jwk(private_pem: str) -> Dict[str, Any]:
+    """
+    Public JWK for a private key, with its RFC 7638 thumbprint as kid
+
+    Args:
+        private_pem: PEM-encoded private key
+
+    Returns:
+        JWK dict (kty, n, e, alg, use, kid)
+    """
+    public = jwk.construct(private_pem, ALGORITHM).public_key().to_dict()
+    members = {"e": public["e"], "kty": public["kty"], "n": public["n"]}
+    thumbprint = hashlib.sha256(json.dumps(members, separators=(",", ":")).encode()).digest()
+    return {**members, "alg": ALGORITHM, "use": "sig", "kid": _b64(thumbprint)}
+
+
+def public_pem(private_pem: str) -> str:
+    """PEM-encoded public key (e.g. for a Kong jwt consumer credential)"""
+    pem = jwk.construct(private_pem, ALGORITHM).public_key().to_pem()
+    return pem.decode() if isinstance(pem, bytes) else pem
+
+
+class TokenMinter:
+    """Signs access tokens with the claims kong-realm puts in its own"""
+
+    def __init__(
+        self,
+        private_pem: str,
+        issuer: str,
+        client_id: str = "kong-client",
+        ttl: int = DEFAULT_TTL,
+    ):
+        """
+        Initialize token minter
+
+        Args:
+            private_pem: PEM-encoded RSA private key
+            issuer: iss claim, e.g. http://localhost:8080/realms/kong-realm
+            client_id: azp claim
+            ttl: Token lifetime in seconds
+        """
+        self.issuer = issuer
+        self.client_id = client_id
+        self.ttl = ttl
+        self.jwk = public_jwk(private_pem)
+        # Parse the key once; jwt.encode would otherwise do it for every token
+        self._key = jwk.construct(private_pem, ALGORITHM)
+        self._headers = {"kid": self.jwk["kid"], "typ": "JWT"}
+
+    def claims(
+        self,
+        username: str,
+        roles: Optional[List[str]] = None,
+        email: Optional[str] = None,
+        now: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the claims of an access token
+
+        Args:
+            username: preferred_username claim
+            roles: realm_roles claim
+            email: email claim (defaults to <username>@example.com)
+            now: Issue time (defaults to the current time)
+
+        Returns:
+            Claims dict
+        """
+        now = int(time.time()) if now is None else now
+        return {
+            "exp": now + self.ttl,
+            "iat": now,
+            "jti": str(uuid.uuid4()),
+            "iss": self.issuer,
+            "aud": "account",
+            # Stable per user, like a Keycloak user ID
+            "sub": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{self.issuer}/{username}")),
+            "typ": "Bearer",
+            "azp": self.client_id,
+            "scope": "openid profile email",
+            "realm_roles": list(roles or []),
+            "preferred_username": username,
+            "email": email or f"{username}@example.com",
+        }
+
+    def mint(
+        self,
+        username: str,
+        roles: Optional[List[str]] = None,
+        email: Optional[str] = None,
+        extra_claims: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Sign an access token for a user
+
+        Args:
+            username: preferred_username claim
+            roles: realm_roles claim
+            email: email claim
+            extra_claims: Claims added or overridden on top of the defaults
+
+        Returns:
+            Encoded JWT
+        """
+        claims = self.claims(username, roles, email)
+        if extra_claims:
+            claims.update(extra_claims)
+        return jwt.encode(claims, self._key, algorithm=ALGORITHM, headers=self._headers)
+
+    def jwks(self) -> Dict[str, Any]:
+        """JWKS document containing the verification key"""
+        return {"keys": [self.jwk]}
+
+
+def _mint_chunk(
+    private_pem: str,
+    issuer: str,
+    client_id: str,
+    ttl: int,
+    usernames: List[str],
+    roles: List[str],
+) -> List[str]:
+    minter = TokenMinter(private_pem, issuer, client_id, ttl)
+    return [minter.mint(username, roles) for username in usernames]
+
+
+def mint_bulk(
+    private_pem: str,
+    issuer: str,
+    usernames: List[str],
+    roles: Optional[List[str]] = None,
+    client_id: str = "kong-client",
+    ttl: int = DEFAULT_TTL,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Sign one token per username, spreading the RSA work over processes
+
+    Args:
+        private_pem: PEM-encoded RSA private key
+        issuer: iss claim
+        usernames: Users to mint tokens for
+        roles: realm_roles given to every token
+        client_id: azp claim
+        ttl: Token lifetime in seconds
+        workers: Signing processes (defaults to the CPU count)
+
+    Returns:
+        Tokens in the order of usernames
+    """
+    roles = list(roles or [])
+    workers = workers or os.cpu_count() or 1
+    chunks = [usernames[i : i + MINT_CHUNK] for i in range(0, len(usernames), MINT_CHUNK)]
+
+    if workers == 1 or len(chunks) <= 1:
+        return _mint_chunk(private_pem, issuer, client_id, ttl, usernames, roles)
+
+    tokens: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_mint_chunk, private_pem, issuer, client_id, ttl, chunk, roles)
+            for chunk in chunks
+        ]
+        for future in futures:
+            tokens.extend(future.result())
+    return tokens
+
+
+def read_tokens(path: str) -> List[str]:
+    """
+    Read tokens from a file, one per line
+
+    Args:
+        path: Token file (blank lines and # comments are ignored)
+
+    Returns:
+        Tokens
+    """
+    with open(path) as f:
+        tokens = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not tokens:
+        raise Exception(f"No tokens in {path}")
+    return tokens
+
+
+def jwks_server(
+    jwks: Dict[str, Any],
+    issuer: str,
+    host: str = "127.0.0.1",
+    port: int = 8099,
+) -> ThreadingHTTPServer:
+    """
+    HTTP server publishing a JWKS at Keycloak's paths
+
+    Serves the keys at /protocol/openid-connect/certs and a discovery document
+    at /.well-known/openid-configuration, both relative to the issuer path,
+    plus /jwks.json as a short alias.
+
+    Args:
+        jwks: JWKS document
+        issuer: Issuer the tokens carry
+        host: Bind address
+        port: Bind port
+
+    Returns:
+        Server (call serve_forever to run it)
+    """
+    realm_path = urlparse(issuer).path.rstrip("/")
+    base_url = f"http://{host}:{port}{realm_path}"
+    certs = json.dumps(jwks).encode()
+    discovery = json.dumps(
+        {
+            "issuer": issuer,
+            "jwks_uri": f"{base_url}/protocol/openid-connect/certs",
+            "id_token_signing_alg_values_supported": [ALGORITHM],
+        }
+    ).encode()
+    routes = {
+        f"{realm_path}/protocol/openid-connect/certs": certs,
+        f"{realm_path}/.well-known/openid-configuration": discovery,
+        "/jwks.json": certs,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = routes.get(self.path.split("?", 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -0,0 +1,241 @@
+"""Token footprint profiling against the realm's protocol mapper configuration"""
+
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .keycloak_client import decode_token
+
+DEFAULT_REALM_FILE = "infrastructure/keycloak/config/realms/kong-realm.json"
+
+# Claims Kong and backend-demo read from the access token (backend-demo's
+# api/auth.py get_user_info and api/routes.py)
+REQUIRED_CLAIMS = (
+    "sub",
+    "iss",
+    "exp",
+    "iat",
+    "realm_roles",
+    "preferred_username",
+    "email",
+    "given_name",
+    "family_name",
+    "email_verified",
+)
+
+# Claims Keycloak adds through its default client scopes rather than realm-file mappers
+DEFAULT_SCOPE_CLAIMS = {
+    "realm_access": "roles (client scope)",
+    "resource_access": "roles (client scope)",
+    "allowed-origins": "web-origins (client scope)",
+    "name": "profile (client scope)",
+    "given_name": "profile (client scope)",
+    "family_name": "profile (client scope)",
+    "email_verified": "email (client scope)",
+    "acr": "acr (client scope)",
+    "scope": "token scope",
+    "sid": "session",
+    "session_state": "session",
+}
+
+
+def realm_mappers(realm_file: str, client_id: str = "kong-client") -> List[Dict[str, Any]]:
+    """
+    Read a client's protocol mappers from a realm export
+
+    Args:
+        realm_file: Realm JSON (e.g. kong-realm.json)
+        client_id: Client whose mappers to read
+
+    Returns:
+        Mapper name, claim name and which tokens (access/id/userinfo) carry it
+    """
+    with open(realm_file) as f:
+        realm = json.load(f)
+
+    mappers = []
+    for client in realm.get("clients", []):
+        if client.get("clientId") != client_id:
+            continue
+        for mapper in client.get("protocolMappers", []):
+            config = mapper.get("config", {})
+            if "claim.name" not in config:
+                continue
+            mappers.append(
+                {
+                    "name": mapper.get("name"),
+                    "claim": config["claim.name"],
+                    "access": config.get("access.token.claim") == "true",
+                    "id": config.get("id.token.claim") == "true",
+                    "userinfo": config.get("userinfo.token.claim") == "true",
+                }
+            )
+    return mappers
+
+
+def _encoded_length(claims: Dict[str, Any]) -> int:
+    """Unpadded base64url length of claims serialized as compact JSON"""
+    return math.ceil(len(json.dumps(claims, separators=(",", ":")).encode()) * 4 / 3)
+
+
+def claim_sizes(claims: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Bytes each claim adds to the encoded token
+
+    Measured as the difference in base64url payload length with and without
+    the claim, using the compact JSON Keycloak emits.
+
+    Args:
+        claims: Decoded claims
+
+    Returns:
+        Encoded bytes per claim
+    """
+    full = _encoded_length(claims)
+    return {
+        name: full - _encoded_length({k: v for k, v in claims.items() if k != name})
+        for name in claims
+    }
+
+
+def time_decode(token: str, iterations: int = 1000) -> float:
+    """
+    Mean time to decode a token's payload, as backend-demo does per request
+
+    Args:
+        token: Encoded JWT
+        iterations: Decodes to average over
+
+    Returns:
+        Seconds per decode
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_token(token)
+    return (time.perf_counter() - start) / iterations
+
+
+def profile_tokens(
+    tokens: Dict[str, str],
+    mappers: Optional[List[Dict[str, Any]]] = None,
+    required_claims: tuple = REQUIRED_CLAIMS,
+    iterations: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Profile the size and decode cost of tokens
+
+    Args:
+        tokens: Access token per username
+        mappers: Client protocol mappers (from realm_mappers)
+        required_claims: Claims that must stay in the access token
+        iterations: Decodes per token when timing
+
+    Returns:
+        Per-token sizes and decode time, per-claim byte contribution with its
+        source, and mappers that could move out of the access token
+    """
+    by_claim = {m["claim"]: m for m in mappers or []}
+    per_token = []
+    claim_bytes: Dict[str, List[int]] = {}
+
+    for username, token in tokens.items():
+        header, payload, signature = token.split(".")
+        claims = decode_token(token)
+        for name, size in claim_sizes(claims).items():
+            claim_bytes.setdefault(name, []).append(size)
+
+        per_token.append(
+            {
+                "username": username,
+                "encoded_bytes": len(token),
+                "header_bytes": len(header),
+                "payload_bytes": len(payload),
+                "signature_bytes": len(signature),
+                "authorization_header_bytes": len("Authorization: Bearer ") + len(token),
+                "claims": len(claims),
+                "decode_us": time_decode(token, iterations) * 1e6,
+            }
+        )
+
+    mean_encoded = sum(t["encoded_bytes"] for t in per_token) / len(per_token) if tokens else 0
+
+    claims_report = []
+    for name, sizes in claim_bytes.items():
+        mapper = by_claim.get(name)
+        mean_bytes = sum(sizes) / len(sizes)
+        movable = bool(mapper) and mapper["access"] and name not in required_claims
+        claims_report.append(
+            {
+                "claim": name,
+                "source": (
+                    f"{mapper['name']} (mapper)"
+                    if mapper
+                    else DEFAULT_SCOPE_CLAIMS.get(name, "standard")
+                ),
+                "mean_bytes": mean_bytes,
+                "share": mean_bytes / mean_encoded if mean_encoded else 0.0,
+                "in_id_token": mapper["id"] if mapper else None,
+                "in_userinfo": mapper["userinfo"] if mapper else None,
+                "movable": movable,
+            }
+        )
+    claims_report.sort(key=lambda c: c["mean_bytes"], reverse=True)
+
+    recommendations = []
+    for claim in claims_report:
+        if not claim["movable"]:
+            continue
+        mapper = by_claim[claim["claim"]]
+        also = [t for t, on in (("ID token", mapper["id"]), ("userinfo", mapper["userinfo"])) if on]
+        where = f"already in {' and '.join(also)}" if also else "enable it for userinfo"
+        recommendations.append(
+            f"{mapper['name']}: set access.token.claim=false ({where}), "
+            f"saves ~{claim['mean_bytes']:.0f} bytes per request"
+        )
+
+    for claim in claims_report:
+        if claim["claim"] in ("realm_access", "resource_access") and "realm_roles" in by_claim:
+            recommendations.append(
+                f"{claim['claim']} duplicates realm_roles: remove the 'roles' client scope "
+                f"from the client, saves ~{claim['mean_bytes']:.0f} bytes per request"
+            )
+
+    return {
+        "tokens": per_token,
+        "claims": claims_report,
+        "summary": {
+            "mean_encoded_bytes": mean_encoded,
+            "max_encoded_bytes": max((t["encoded_bytes"] for t in per_token), default=0),
+            "mean_decode_us": (
+                sum(t["decode_us"] for t in per_token) / len(per_token) if per_token else 0.0
+            ),
+            "movable_bytes": sum(c["mean_bytes"] for c in claims_report if c["movable"]),
+        },
+        "recommendations": recommendations,
+    }
+
+
+def find_realm_file(path: Optional[str] = None) -> Optional[str]:
+    """
+    Locate the realm export, searching upwards from the working directory
+
+    Args:
+        path: Explicit path (returned as is)
+
+    Returns:
+        Path to the realm file, or None if not found
+    """
+    if path:
+        return path
+
+    directory = os.getcwd()
+    while True:
+        candidate = os.path.join(directory, DEFAULT_REALM_FILE)
+        if os.path.exists(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
@@ -0,0 +1,275 @@
+"""Multi-gateway topologies: run suites and load against every Kong instance at once"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from .compare import compare_endpoint
+from .histogram import LatencyHistogram
+from .history import endpoint_rows
+
+# Settings a gateway inherits from the top level of the topology file
+GATEWAY_DEFAULTS = {
+    "keycloak_url": "http://localhost:8080",
+    "admin_url": None,
+    "realm": "kong-realm",
+    "client_id": "kong-client",
+    "username": "testuser",
+    "password": "user123",
+    "public_path": "/api/public",
+    "protected_path": "/api/protected",
+}
+
+
+def load_topology(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the gateways of a topology file
+
+    The file lists gateways under `gateways`, each with a unique `name` and
+    its `kong_url`; any GATEWAY_DEFAULTS key may be set per gateway or once
+    at the top level for all of them.
+
+    Args:
+        path: Topology YAML file
+
+    Returns:
+        Gateways with every setting filled in
+    """
+    with open(path) as f:
+        document = yaml.safe_load(f) or {}
+
+    shared = {**GATEWAY_DEFAULTS, **{k: v for k, v in document.items() if k in GATEWAY_DEFAULTS}}
+    gateways = []
+    for index, entry in enumerate(document.get("gateways") or []):
+        if not isinstance(entry, dict) or not entry.get("kong_url"):
+            raise Exception(f"{path}: gateway {index + 1} needs a kong_url")
+        unknown = set(entry) - set(GATEWAY_DEFAULTS) - {"name", "kong_url"}
+        if unknown:
+            raise Exception(f"{path}: unknown gateway setting(s): {', '.join(sorted(unknown))}")
+        gateway = {**shared, "name": entry.get("name") or entry["kong_url"], **entry}
+        gateway["kong_url"] = gateway["kong_url"].rstrip("/")
+        gateways.append(gateway)
+
+    if not gateways:
+        raise Exception(f"{path}: no gateways defined")
+    names = [g["name"] for g in gateways]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise Exception(f"{path}: duplicate gateway name(s): {', '.join(duplicates)}")
+    return gateways
+
+
+def run_matrix(
+    gateways: List[Dict[str, Any]],
+    run: Callable[[Dict[str, Any]], Dict[str, Any]],
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run a function against every gateway concurrently
+
+    Args:
+        gateways: Gateways from load_topology
+        run: Called with each gateway, returns its results
+        on_result: Called with each gateway's name and results as it finishes
+
+    Returns:
+        Results per gateway name, in topology order; a gateway whose run
+        raised gets {"error": message}
+    """
+
+    def guarded(gateway):
+        try:
+            result = run(gateway)
+        except Exception as e:
+            result = {"error": str(e)}
+        if on_result:
+            on_result(gateway["name"], result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=len(gateways)) as pool:
+        futures = {g["name"]: pool.submit(guarded, g) for g in gateways}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def suite_matrix(
+    gateways: List[Dict[str, Any]],
+    env: str = "dev",
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the comprehensive suite against every gateway concurrently
+
+    Args:
+        gateways: Gateways from load_topology
+        env: Environment name
+        on_result: Called with each gateway's results as it finishes
+
+    Returns:
+        Suite results per gateway and passed/failed/total over all of them
+    """
+    from .api_tester import run_comprehensive_suite
+
+    def run(gateway):
+        return run_comprehensive_suite(
+            gateway["keycloak_url"],
+            gateway["kong_url"],
+            env,
+            kong_admin_url=gateway["admin_url"],
+            realm=gateway["realm"],
+            username=gateway["username"],
+            password=gateway["password"],
+            client_id=gateway["client_id"],
+            public_path=gateway["public_path"],
+            protected_path=gateway["protected_path"],
+        )
+
+    start = time.time()
+    results = run_matrix(gateways, run, on_result)
+    completed = [r for r in results.values() if "error" not in r]
+
+    return {
+        "environment": env,
+        "gateways": results,
+        "aggregate": {
+            "passed": sum(r["passed"] for r in completed),
+            "failed": sum(r["failed"] for r in completed),
+            "total": sum(r["total"] for r in completed),
+            "errors": len(results) - len(completed),
+            "duration": time.time() - start,
+        },
+    }
+
+
+def _gateway_token(gateway: Dict[str, Any]) -> Optional[str]:
+    """Log the gateway's test user into its realm, or None without credentials"""
+    from .keycloak_client import get_token
+
+    if not gateway.get("username") or not gateway.get("password"):
+        return None
+    return get_token(
+        gateway["keycloak_url"],
+        gateway["realm"],
+        gateway["username"],
+        gateway["password"],
+        gateway["client_id"],
+        timeout=10,
+    )["access_token"]
+
+
+def aggregate_load(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine load results of gateways that ran side by side
+
+    Args:
+        runs: run_load results
+
+    Returns:
+        Summed requests, errors, throughput and status codes, and percentiles
+        over the merged latency histogram
+    """
+    histogram = LatencyHistogram()
+    status_codes: Dict[str, int] = {}
+    for run in runs:
+        histogram.merge(LatencyHistogram.from_dict(run["histogram"]))
+        for status, count in run["status_codes"].items():
+            status_codes[status] = status_codes.get(status, 0) + count
+
+    return {
+        "requests": sum(run["requests"] for run in runs),
+        "errors": sum(run["errors"] for run in runs),
+        "throughput": sum(run["throughput"] for run in runs),
+        "latency": {
+            "mean": histogram.mean(),
+            **{f"p{q}": histogram.percentile(q) for q in (50, 90, 95, 99)},
+            "max": histogram.max if histogram.count else 0.0,
+        },
+        "status_codes": dict(sorted(status_codes.items())),
+        "histogram": histogram.to_dict(),
+    }
+
+
+def load_matrix(
+    gateways: List[Dict[str, Any]],
+    virtual_users: int = 10,
+    duration: float = 30.0,
+    method: str = "GET",
+    endpoint: Optional[str] = None,
+    protocol: Optional[str] = None,
+    verify: bool = True,
+    solo: bool = False,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Drive every gateway with its own virtual users at the same time
+
+    Each gateway's test user logs into its realm first, so all gateways
+    start loading together. With `solo`, every gateway is first loaded on
+    its own, one after the other; comparing that run with the concurrent
+    one (percentile change and Mann-Whitney test, as in report compare)
+    shows how much the gateways slow each other down through shared
+    Keycloak, backend or host resources.
+
+    Args:
+        gateways: Gateways from load_topology
+        virtual_users: Concurrent virtual users per gateway
+        duration: Run time in seconds (per solo run as well)
+        method: HTTP method
+        endpoint: Path to load on every gateway (default: each gateway's
+            protected_path)
+        protocol: httpx protocol mode (see load.PROTOCOLS)
+        verify: Verify TLS certificates (protocol modes only)
+        solo: Also load each gateway alone first
+        on_result: Called with each gateway's concurrent results as it finishes
+
+    Returns:
+        Run configuration, run_load results per gateway (with `solo` and
+        `interference` when requested) and the aggregate over all gateways
+    """
+    from .load import run_load
+
+    tokens = run_matrix(gateways, lambda g: {"token": _gateway_token(g)})
+    for name, result in tokens.items():
+        if "error" in result:
+            raise Exception(f"{name}: token acquisition failed: {result['error']}")
+
+    def run(gateway):
+        token = tokens[gateway["name"]]["token"]
+        return run_load(
+            gateway["kong_url"],
+            endpoint or gateway["protected_path"],
+            virtual_users,
+            duration,
+            (lambda vu: token) if token else None,
+            method,
+            protocol=protocol,
+            verify=verify,
+        )
+
+    solo_runs = {}
+    if solo:
+        for gateway in gateways:
+            try:
+                solo_runs[gateway["name"]] = run(gateway)
+            except Exception as e:
+                solo_runs[gateway["name"]] = {"error": str(e)}
+
+    results = run_matrix(gateways, run, on_result)
+
+    for name, result in results.items():
+        alone = solo_runs.get(name)
+        if alone is None or "error" in alone or "error" in result:
+            continue
+        result["solo"] = alone
+        result["interference"] = compare_endpoint(endpoint_rows(alone)[0], endpoint_rows(result)[0])
+
+    completed = [r for r in results.values() if "error" not in r]
+    return {
+        "method": method,
+        "virtual_users": virtual_users,
+        "duration": duration,
+        "protocol": protocol,
+        "gateways": results,
+        "aggregate": aggregate_load(completed),
+    }
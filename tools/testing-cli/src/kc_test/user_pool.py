@@ -0,0 +1,202 @@
+"""Pool of synthetic users whose tokens are spread across load-test traffic"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .keycloak_client import (
+    KeycloakAdmin,
+    PartialImportUnavailable,
+    TOKEN_REFRESH_MARGIN,
+    get_token,
+    refresh_token,
+)
+from .provisioning import create_batch, import_batch
+
+DEFAULT_POOL_PREFIX = "kc-load-"
+DEFAULT_POOL_PASSWORD = "load-test-123"
+
+
+class UserPool:
+    """
+    Synthetic users and their cached tokens
+
+    Tokens are minted up front at a bounded rate, so a burst of logins never
+    trips the realm's brute-force detection, and are refreshed per user when
+    they approach expiry.
+    """
+
+    def __init__(
+        self,
+        keycloak_url: str,
+        realm: str,
+        size: int,
+        prefix: str = DEFAULT_POOL_PREFIX,
+        password: str = DEFAULT_POOL_PASSWORD,
+        client_id: str = "kong-client",
+    ):
+        """
+        Initialize user pool
+
+        Args:
+            keycloak_url: Keycloak base URL
+            realm: Realm the users live in
+            size: Number of users
+            prefix: Username prefix (users are <prefix>00000, <prefix>00001, ...)
+            password: Password shared by all pool users
+            client_id: Client used to mint tokens
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1 (got {size})")
+
+        self.keycloak_url = keycloak_url
+        self.realm = realm
+        self.prefix = prefix
+        self.password = password
+        self.client_id = client_id
+        self.usernames = [f"{prefix}{i:05d}" for i in range(size)]
+        self.tokens: Dict[str, Dict[str, Any]] = {}
+        self._user_locks = {username: threading.Lock() for username in self.usernames}
+        self._round_robin = itertools.cycle(range(size))
+        self._round_robin_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    def provision(
+        self,
+        admin: KeycloakAdmin,
+        roles: Optional[List[str]] = None,
+        batch_size: int = 500,
+    ) -> Dict[str, int]:
+        """
+        Create the pool users, reusing any that already exist
+
+        Args:
+            admin: Keycloak admin client
+            roles: Realm roles to give every pool user
+            batch_size: Users per partialImport/create batch
+
+        Returns:
+            Created/skipped/failed counts
+        """
+        counts = {"created": 0, "skipped": 0, "failed": 0}
+        use_import = True
+
+        for batch in itertools.batched(self.usernames, batch_size):
+            users = [{"username": u, "password": self.password} for u in batch]
+            result = None
+            if use_import:
+                try:
+                    result = import_batch(admin, self.realm, users)
+                except PartialImportUnavailable:
+                    use_import = False
+            if result is None:
+                result = create_batch(admin, self.realm, users)
+            for key, value in result.items():
+                counts[key] += value
+
+        if roles:
+            errors = admin.assign_roles(self.realm, {u: roles for u in self.usernames})
+            counts["failed"] += len(errors)
+
+        return counts
+
+    def _store(self, username: str, token_data: Dict[str, Any]):
+        """Cache a token response with its absolute expiry"""
+        self.tokens[username] = {
+            **token_data,
+            "expires_at": time.monotonic() + token_data.get("expires_in", 300),
+        }
+
+    def _login(self, username: str):
+        """Mint a fresh token for a pool user"""
+        self._store(
+            username,
+            get_token(self.keycloak_url, self.realm, username, self.password, self.client_id),
+        )
+
+    def mint_tokens(self, rate: float = 10.0, concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Log every pool user in, pacing logins to at most `rate` per second
+
+        Args:
+            rate: Maximum logins per second
+            concurrency: Logins in flight
+
+        Returns:
+            Minted and failed counts with elapsed time
+        """
+        start = time.monotonic()
+        errors: Dict[str, str] = {}
+
+        def mint(index: int, username: str):
+            # Schedule each login on a fixed grid so bursts never exceed the rate
+            delay = start + index / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._login(username)
+            except Exception as e:
+                errors[username] = str(e)
+
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            list(pool.map(mint, range(len(self.usernames)), self.usernames))
+
+        return {
+            "minted": len(self.usernames) - len(errors),
+            "failed": len(errors),
+            "errors": errors,
+            "elapsed": time.monotonic() - start,
+        }
+
+    def access_token(self, username: str) -> str:
+        """
+        Get a valid access token for a pool user, refreshing it near expiry
+
+        Args:
+            username: Pool username
+
+        Returns:
+            Access token
+        """
+        token = self.tokens.get(username)
+        if token and time.monotonic() < token["expires_at"] - TOKEN_REFRESH_MARGIN:
+            return token["access_token"]
+
+        with self._user_locks[username]:
+            token = self.tokens.get(username)
+            if token and time.monotonic() < token["expires_at"] - TOKEN_REFRESH_MARGIN:
+                return token["access_token"]
+
+            if token and token.get("refresh_token"):
+                try:
+                    self._store(
+                        username,
+                        refresh_token(
+                            self.keycloak_url, self.realm, token["refresh_token"], self.client_id
+                        ),
+                    )
+                    return self.tokens[username]["access_token"]
+                except Exception:
+                    pass
+
+            self._login(username)
+            return self.tokens[username]["access_token"]
+
+    def next_token(self) -> str:
+        """Hand out tokens round-robin across the pool"""
+        if not self.tokens:
+            raise Exception(
+                f"No tokens in pool of {len(self)} users: mint_tokens() first, "
+                "or check why every pool login failed"
+            )
+        with self._round_robin_lock:
+            index = next(self._round_robin)
+        return self.access_token(self.usernames[index])
+
+    def token_for(self, virtual_user: int) -> str:
+        """Give each virtual user a stable pool account"""
+        return self.access_token(self.usernames[virtual_user % len(self.usernames)])
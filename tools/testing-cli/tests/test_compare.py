@@ -0,0 +1,91 @@
+"""Tests for the Mann-Whitney U test over latency histograms"""
+
+import math
+import random
+
+import pytest
+
+from kc_test.compare import mann_whitney
+from kc_test.histogram import LatencyHistogram
+
+
+def histogram(values):
+    h = LatencyHistogram()
+    for value in values:
+        h.record(value)
+    return h
+
+
+def reference(baseline, candidate):
+    """Textbook Mann-Whitney on bucket indices: midranks and tie-corrected variance"""
+    labelled = sorted([(i, 0) for i in baseline] + [(i, 1) for i in candidate])
+    ranks = {}
+    position = 0
+    while position < len(labelled):
+        end = position
+        while end < len(labelled) and labelled[end][0] == labelled[position][0]:
+            end += 1
+        ranks[labelled[position][0]] = (position + 1 + end) / 2
+        position = end
+
+    n1, n2 = len(baseline), len(candidate)
+    u = sum(ranks[i] for i in candidate) - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    ties = sum(t**3 - t for t in (labelled.count((i, 0)) + labelled.count((i, 1)) for i in ranks))
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return u / (n1 * n2), z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def test_identical_distributions_are_not_significant():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(-4, 0.3) for _ in range(500)]
+
+    probability, z, p_value = mann_whitney(histogram(values), histogram(values))
+
+    assert probability == pytest.approx(0.5)
+    assert z == pytest.approx(0.0)
+    assert p_value == pytest.approx(1.0)
+
+
+def test_shifted_distribution_is_significant():
+    rng = random.Random(2)
+    baseline = [rng.lognormvariate(-4, 0.2) for _ in range(200)]
+    candidate = [value * 1.5 for value in baseline]
+
+    probability, z, p_value = mann_whitney(histogram(baseline), histogram(candidate))
+
+    assert probability > 0.9
+    assert z > 0
+    assert p_value < 1e-6
+
+    # Swapping the sides flips the direction, not the significance
+    reverse = mann_whitney(histogram(candidate), histogram(baseline))
+    assert reverse[0] == pytest.approx(1 - probability)
+    assert reverse[2] == pytest.approx(p_value)
+
+
+def test_ties_match_the_tie_corrected_reference():
+    # Few distinct latencies, so nearly every sample is tied with others
+    rng = random.Random(3)
+    levels = [0.010, 0.011, 0.012, 0.020]
+    baseline = [rng.choice(levels[:3]) for _ in range(60)]
+    candidate = [rng.choice(levels[1:]) for _ in range(40)]
+    h1, h2 = histogram(baseline), histogram(candidate)
+
+    expected = reference([h1._index(v) for v in baseline], [h2._index(v) for v in candidate])
+
+    assert mann_whitney(h1, h2) == pytest.approx(expected)
+
+
+def test_all_samples_tied_has_no_variance():
+    assert mann_whitney(histogram([0.01] * 10), histogram([0.01] * 5)) == (0.5, 0.0, 1.0)
+
+
+def test_empty_side_is_not_significant():
+    assert mann_whitney(LatencyHistogram(), histogram([0.01])) == (0.5, 0.0, 1.0)
+
+
+def test_different_bucket_layouts_are_rejected():
+    with pytest.raises(ValueError):
+        mann_whitney(histogram([0.01]), LatencyHistogram(growth=1.1))
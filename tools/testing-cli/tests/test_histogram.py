@@ -0,0 +1,112 @@
+"""Tests for log-bucketed latency histograms and nearest-rank percentiles"""
+
+import math
+import random
+
+import pytest
+
+from kc_test.histogram import HISTOGRAM_GROWTH, LatencyHistogram
+from kc_test.result_store import percentile
+
+
+def samples(seed, n=5000):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(-4, 0.8) for _ in range(n)]
+
+
+@pytest.mark.parametrize("p", [1, 50, 90, 95, 99, 99.9])
+def test_percentile_within_one_bucket_of_exact(p):
+    values = samples(1)
+    h = LatencyHistogram()
+    for value in values:
+        h.record(value)
+
+    exact = percentile(sorted(values), p)
+
+    # The estimate is the midpoint of the bucket holding the exact value
+    assert abs(h.percentile(p) - exact) <= exact * (HISTOGRAM_GROWTH - 1)
+
+
+def test_percentile_is_clamped_to_observed_range():
+    h = LatencyHistogram()
+    h.record(0.0101, 3)
+
+    assert h.percentile(0) == h.percentile(100) == 0.0101
+
+
+def test_empty_histogram():
+    h = LatencyHistogram()
+
+    assert h.percentile(50) == 0.0
+    assert h.mean() == 0.0
+    assert h.bins(10) == []
+
+
+def test_exact_aggregates():
+    values = samples(2, 100)
+    h = LatencyHistogram()
+    for value in values:
+        h.record(value)
+
+    assert h.count == 100
+    assert h.mean() == pytest.approx(sum(values) / 100)
+    assert (h.min, h.max) == (min(values), max(values))
+
+
+def test_merge_equals_recording_everything():
+    first, second = samples(3, 300), samples(4, 200)
+    merged, together = LatencyHistogram(), LatencyHistogram()
+    other = LatencyHistogram()
+    for value in first:
+        merged.record(value)
+        together.record(value)
+    for value in second:
+        other.record(value)
+        together.record(value)
+
+    merged.merge(other)
+
+    assert merged.counts == together.counts
+    assert merged.count == together.count
+    assert merged.sum == pytest.approx(together.sum)
+    assert (merged.min, merged.max) == (together.min, together.max)
+
+
+def test_merge_rejects_other_layout():
+    with pytest.raises(ValueError):
+        LatencyHistogram().merge(LatencyHistogram(growth=1.1))
+
+
+def test_dict_round_trip():
+    h = LatencyHistogram()
+    for value in samples(5, 50):
+        h.record(value)
+
+    restored = LatencyHistogram.from_dict(h.to_dict())
+
+    assert restored.to_dict() == h.to_dict()
+    assert restored.percentile(95) == h.percentile(95)
+
+
+def test_bins_keep_every_sample():
+    h = LatencyHistogram()
+    for value in samples(6, 1000):
+        h.record(value)
+
+    bins = h.bins(20)
+
+    assert len(bins) <= 20
+    assert sum(count for _, _, count in bins) == 1000
+    assert all(math.isclose(a[1], b[0]) for a, b in zip(bins, bins[1:]))
+
+
+@pytest.mark.parametrize(
+    "p, expected",
+    [(0, 1.0), (20, 1.0), (21, 2.0), (50, 3.0), (100, 5.0)],
+)
+def test_nearest_rank_percentile(p, expected):
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], p) == expected
+
+
+def test_nearest_rank_percentile_of_nothing():
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,95 @@
+"""Tests for Kong admin API parsing and per-interval rates"""
+
+import pytest
+
+from kc_test import kong_stats
+from kc_test.kong_stats import parse_prometheus, rates, scrape_metrics
+
+METRICS = """\
+# HELP kong_nginx_connections_total Number of connections by subsystem
+# TYPE kong_nginx_connections_total gauge
+kong_nginx_connections_total{node_id="a",subsystem="http",state="active"} 3
+kong_nginx_connections_total{node_id="a",subsystem="http",state="reading"} 1
+kong_nginx_connections_total{node_id="b",subsystem="http",state="active"} 2
+kong_memory_lua_shared_dict_bytes{node_id="a",shared_dict="kong",kong_subsystem="http"} 40960
+kong_memory_lua_shared_dict_bytes{node_id="a",shared_dict="kong_db_cache",kong_subsystem="http"} 1e6
+kong_http_requests_total{service="s1",route="r1",code="200"} 5
+kong_http_requests_total{service="s2",route="r2",code="401"} 2
+kong_datastore_reachable NaN
+kong_request_latency_ms_bucket{service="s1",route="r1",le="5"} 4
+kong_request_latency_ms_bucket{service="s2",route="r2",le="5"} 1
+kong_request_latency_ms_bucket{service="s1",route="r1",le="+Inf"} 5
+kong_request_latency_ms_bucket{service="s2",route="r2",le="+Inf"} 2
+"""
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+def test_parse_prometheus():
+    samples = parse_prometheus(
+        '# HELP x\nx{path="/a \\"b\\"",code="200"} 1.5\nbare 2\nbroken{ value\n'
+    )
+
+    assert samples == [("x", {"path": '/a \\"b\\"', "code": "200"}, 1.5), ("bare", {}, 2.0)]
+
+
+def test_metrics_keep_state_and_shared_dict_labels(monkeypatch):
+    monkeypatch.setattr(kong_stats.requests, "get", lambda url, timeout: FakeResponse(METRICS))
+
+    metrics = scrape_metrics("http://kong:8001")
+
+    assert metrics["totals"] == {
+        'kong_nginx_connections_total{state="active"}': 5.0,
+        'kong_nginx_connections_total{state="reading"}': 1.0,
+        'kong_memory_lua_shared_dict_bytes{shared_dict="kong"}': 40960.0,
+        'kong_memory_lua_shared_dict_bytes{shared_dict="kong_db_cache"}': 1e6,
+        "kong_http_requests_total": 7.0,
+    }
+    assert metrics["histograms"] == {"kong_request_latency_ms": {"5": 5.0, "+Inf": 7.0}}
+
+
+def test_metrics_without_plugin(monkeypatch):
+    monkeypatch.setattr(kong_stats.requests, "get", lambda url, timeout: FakeResponse("", 404))
+
+    assert scrape_metrics("http://kong:8001") is None
+
+
+def sample(time, total_requests, buckets):
+    return {
+        "time": time,
+        "status": {"total_requests": total_requests},
+        "metrics": {"histograms": {"kong_request_latency_ms": buckets}},
+    }
+
+
+def test_rates_over_interval():
+    before = sample(0.0, 100, {"5": 10.0, "50": 10.0, "+Inf": 10.0})
+    after = sample(2.0, 300, {"5": 60.0, "50": 108.0, "+Inf": 110.0})
+
+    result = rates(before, after)
+
+    assert result["requests_per_second"] == pytest.approx(100.0)
+    # 100 requests in the interval: 50 under 5ms, 48 under 50ms, 2 beyond
+    assert result["kong_request_latency_ms"] == {"p50": 5.0, "p95": 50.0, "p99": None}
+
+
+def test_rates_skip_reset_counters():
+    before = sample(0.0, 500, {"5": 80.0, "+Inf": 90.0})
+    after = sample(1.0, 20, {"5": 10.0, "+Inf": 12.0})
+
+    result = rates(before, after)
+
+    assert result["requests_per_second"] == 0.0
+    assert "kong_request_latency_ms" not in result
+
+
+def test_first_poll_has_no_rates():
+    assert rates(None, sample(0.0, 10, {})) == {}